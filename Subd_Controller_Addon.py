@@ -8,43 +8,1102 @@ bl_info = {
     "category": "Object",
 }
 
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+
 import bpy
-from bpy.props import IntProperty, StringProperty, PointerProperty
+import numpy as np
+from bpy.app.handlers import persistent
+from bpy.props import BoolProperty, CollectionProperty, EnumProperty, FloatProperty, IntProperty, StringProperty, PointerProperty
 
-# Modified function to get objects from a target name
-def get_objects_from_target(target_name):
-    objects_to_process = []
-    
-    # Strip whitespace
+logger = logging.getLogger(__name__)
+
+# Split a comma separated target string into clean target names
+def parse_target_names(targets_str):
+    return [name.strip() for name in targets_str.split(',') if name.strip()]
+
+# Look up a target name, collections take priority over objects
+def find_target(target_name):
     target_name = target_name.strip()
-    
-    # Check if it's a collection
     if target_name in bpy.data.collections:
-        # Get all mesh objects in the collection and its child collections
-        objects_to_process.extend(get_collection_objects(bpy.data.collections[target_name]))
+        return bpy.data.collections[target_name]
+    if target_name in bpy.data.objects:
+        return bpy.data.objects[target_name]
+    return None
+
+# Whether the modifiers of an object can be changed, linked objects and system overrides can't
+def is_editable(obj):
+    override = obj.override_library
+    if override is not None:
+        return not override.is_system_override
+    return obj.library is None
+
+# Local library overrides by the uid of the linked object they override
+def gather_library_overrides():
+    overrides = {}
+    for obj in bpy.data.objects:
+        override = obj.override_library
+        if override is not None and override.reference is not None:
+            overrides[override.reference.session_uid] = obj
+    return overrides
+
+# Objects that geometry nodes or particles instance from the given instancers
+def gather_instanced_objects(instancer_uids):
+    instanced = {}
+    for instance in bpy.context.evaluated_depsgraph_get().object_instances:
+        if not instance.is_instance or instance.parent is None:
+            continue
+        if instance.parent.original.session_uid in instancer_uids:
+            obj = instance.object.original
+            instanced.setdefault(obj.session_uid, obj)
+    return instanced
+
+# Walk a collection or object target without using the index
+def resolve_target(target, overrides=None, follow_geometry=False):
+    """Return (mesh objects, collection uids, object uids, locked objects) for a target ID.
     
-    # Or if it's an object
-    elif target_name in bpy.data.objects:
-        obj = bpy.data.objects[target_name]
-        if obj.type == 'MESH':
-            objects_to_process.append(obj)
+    Collection instances are followed into their collection, which is only
+    walked once however often it is instanced. Linked objects are replaced
+    by their library override when there is one, the ones that still can't
+    be edited are returned as locked instead of the mesh objects.
+    """
+    visited = {}
+    collection_uids = set()
+    object_uids = set()
+    instances = []
+    
+    def visit(objs):
+        for obj in objs:
+            uid = obj.session_uid
+            if uid in visited:
+                continue
+            visited[uid] = obj
+            if obj.instance_type == 'COLLECTION' and obj.instance_collection is not None:
+                # Changing the instanced collection tags the empty
+                object_uids.add(uid)
+                instances.append(obj.instance_collection)
+    
+    if isinstance(target, bpy.types.Collection):
+        collections = [target]
+    else:
+        # The object itself plus all of its children
+        family = [target, *target.children_recursive]
+        object_uids.update(obj.session_uid for obj in family)
+        visit(family)
+        collections = []
+    
+    collections[0:0] = instances
+    instances.clear()
+    while collections:
+        collection = collections.pop(0)
+        if collection.session_uid in collection_uids:
+            continue
+        collection_uids.add(collection.session_uid)
+        visit(collection.objects)
+        collections[0:0] = [*collection.children, *instances]
+        instances.clear()
+    
+    if follow_geometry:
+        instancers = {uid for uid, obj in visited.items()
+                      if obj.particle_systems or any(mod.type == 'NODES' for mod in obj.modifiers)}
+        object_uids.update(instancers)
+        for uid, obj in gather_instanced_objects(instancers).items():
+            visited.setdefault(uid, obj)
+    
+    objects = {}
+    locked = {}
+    for uid, obj in visited.items():
+        if obj.type != 'MESH':
+            continue
+        if not is_editable(obj) and overrides is not None:
+            obj = overrides.get(uid, obj)
+        if is_editable(obj):
+            objects.setdefault(obj.session_uid, obj)
+        else:
+            locked.setdefault(obj.session_uid, obj)
+    
+    return tuple(objects.values()), collection_uids, object_uids, tuple(locked.values())
+
+# Describe locked objects by library, for reports
+def describe_locked(locked):
+    sources = {}
+    for obj in locked:
+        # Editable objects are only locked through their linked mesh
+        library = obj.data.library if is_editable(obj) else obj.library
+        if library is not None:
+            source = library.name
+        elif obj.override_library is not None:
+            source = "system overrides"
+        else:
+            source = "unknown"
+        sources[source] = sources.get(source, 0) + 1
+    return ", ".join(f"{count} from {source}" for source, count in sources.items())
+
+# Group objects by their mesh datablock, shared meshes list every object that uses them
+def group_by_mesh(objects):
+    groups = {}
+    for obj in objects:
+        groups.setdefault(obj.data.session_uid, (obj.data, []))[1].append(obj)
+    return groups
+
+# Names and attributes of every mesh object, for pattern and rule targets
+class NameIndex:
+    """Per-object name, face count, material and custom property keys.
+    
+    Built with one pass over bpy.data.objects on first use, then kept up to
+    date from the depsgraph handler. Every change is logged, so a cached
+    rule result only tests the objects that changed since it was built.
+    """
+    
+    # Changes kept before cached rules fall back to a full pass
+    LOG_LIMIT = 4096
+    
+    def __init__(self):
+        self.clear()
+    
+    def clear(self):
+        self._entries = None
+        self._mesh_users = {}
+        self._log = []
+        self._log_start = 0
+        self._rules = {}
+        self._data_count = None
+    
+    @property
+    def sequence(self):
+        return self._log_start + len(self._log)
+    
+    @staticmethod
+    def _entry(obj):
+        materials = frozenset(slot.material.session_uid for slot in obj.material_slots if slot.material is not None)
+        return (obj, obj.name, len(obj.data.polygons), materials, frozenset(obj.keys()))
+    
+    def _ensure(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        for obj in bpy.data.objects:
+            # Linked objects can't be changed, their overrides are indexed instead
+            if obj.type == 'MESH' and is_editable(obj):
+                self._entries[obj.session_uid] = self._entry(obj)
+                self._mesh_users.setdefault(obj.data.session_uid, set()).add(obj.session_uid)
+        self._data_count = len(bpy.data.objects)
+    
+    def _changed(self, uid):
+        self._log.append(uid)
+        if len(self._log) > self.LOG_LIMIT:
+            self._log_start += len(self._log)
+            self._log = []
+    
+    def _update(self, obj):
+        uid = obj.session_uid
+        if obj.type != 'MESH' or not is_editable(obj):
+            if self._entries.pop(uid, None) is not None:
+                self._changed(uid)
+            return
+        entry = self._entry(obj)
+        old = self._entries.get(uid)
+        if old is not None and old[1:] == entry[1:]:
+            return
+        self._entries[uid] = entry
+        self._mesh_users.setdefault(obj.data.session_uid, set()).add(uid)
+        self._changed(uid)
+    
+    def get(self, key, matcher):
+        """Return the objects whose entry matches, the same tuple while no match changed"""
+        self._ensure()
+        sequence = self.sequence
+        cached = self._rules.get(key)
+        if cached is not None and cached[0] == sequence:
+            return cached[2]
         
-        # Also process all children meshes
-        for child in obj.children_recursive:
-            if child.type == 'MESH':
-                objects_to_process.append(child)
+        if cached is None or cached[0] < self._log_start:
+            matches = {uid: entry[0] for uid, entry in self._entries.items() if matcher(entry)}
+        else:
+            # Only test the objects that changed since the last call
+            matches = cached[1]
+            changed = False
+            for uid in set(self._log[cached[0] - self._log_start:]):
+                entry = self._entries.get(uid)
+                hit = entry is not None and matcher(entry)
+                if hit != (uid in matches):
+                    changed = True
+                    if hit:
+                        matches[uid] = entry[0]
+                    else:
+                        del matches[uid]
+            if not changed:
+                self._rules[key] = (sequence, matches, cached[2])
+                return cached[2]
+        
+        result = tuple(matches.values())
+        self._rules[key] = (sequence, matches, result)
+        return result
     
-    return objects_to_process
+    def handle_depsgraph_update(self, depsgraph):
+        if self._entries is None:
+            return
+        
+        for update in depsgraph.updates:
+            id_block = getattr(update.id, "original", update.id)
+            if isinstance(id_block, bpy.types.Object):
+                self._update(id_block)
+            elif isinstance(id_block, bpy.types.Collection):
+                # Renamed or relinked, logged so collection scoped patterns look again
+                self._changed(id_block.session_uid)
+            elif isinstance(id_block, bpy.types.Mesh) and update.is_updated_geometry:
+                for uid in self._mesh_users.get(id_block.session_uid, ()):
+                    entry = self._entries.get(uid)
+                    if entry is not None:
+                        self._update(entry[0])
+        
+        # Something was deleted, drop the entries of removed objects
+        data_count = len(bpy.data.objects)
+        if data_count < self._data_count:
+            for uid, entry in list(self._entries.items()):
+                try:
+                    entry[0].name
+                except ReferenceError:
+                    del self._entries[uid]
+                    self._changed(uid)
+        self._data_count = data_count
+
+name_index = NameIndex()
+
+# Compile the name matcher of a glob or regex pattern, None if it doesn't compile
+@lru_cache(maxsize=256)
+def compile_name_pattern(pattern, syntax):
+    try:
+        if syntax == 'GLOB':
+            return re.compile(fnmatch.translate(pattern)).match
+        return re.compile(pattern).search
+    except re.error:
+        return None
+
+# Compile a pattern or rule entry, cached per rule
+@lru_cache(maxsize=256)
+def compile_target_rule(target_type, pattern, syntax, rule_type, faces, material_uid, property_name, property_value):
+    """Return (key, collection matchers, name matcher, entry matcher) or None for an empty or invalid rule.
     
-# Helper function to get all objects in a collection (unchanged)
-def get_collection_objects(collection):
-    objects = []
-    for obj in collection.objects:
-        if obj.type == 'MESH':
-            objects.append(obj)
-    for child in collection.children:
-        objects.extend(get_collection_objects(child))
-    return objects
+    Glob patterns can start with collection names separated by '/', the
+    objects are then taken from the matching collections, each further
+    segment matching child collections of the ones before. Regex patterns
+    always match object names, a '/' in them is part of the expression.
+    """
+    if target_type == 'PATTERN':
+        segments = pattern.split("/") if syntax == 'GLOB' else [pattern]
+        matchers = [compile_name_pattern(segment, syntax) for segment in segments]
+        if not pattern or None in matchers:
+            return None
+        name_match = matchers[-1] if segments[-1] else (lambda name: True)
+        return ('PATTERN', syntax, pattern), tuple(matchers[:-1]), name_match, lambda entry: name_match(entry[1]) is not None
+    
+    if rule_type == 'FACES':
+        matcher = lambda entry: entry[2] > faces
+    elif rule_type == 'MATERIAL':
+        if material_uid is None:
+            return None
+        matcher = lambda entry: material_uid in entry[3]
+    else:
+        if not property_name:
+            return None
+        if property_value:
+            matcher = lambda entry: property_name in entry[4] and str(entry[0].get(property_name)) == property_value
+        else:
+            matcher = lambda entry: property_name in entry[4]
+    key = ('RULE', rule_type, faces, material_uid, property_name, property_value)
+    return key, (), None, matcher
+
+# Compile the rule of a pattern or rule target entry
+def compile_item_rule(item):
+    material = item.rule_material
+    return compile_target_rule(
+        item.target_type, item.pattern, item.pattern_syntax, item.rule_type, item.rule_faces,
+        None if material is None else material.session_uid, item.rule_property, item.rule_value,
+    )
+
+# Collections matching a chain of name matchers, each level below the one before
+def find_collections(matchers):
+    collections = [c for c in bpy.data.collections if matchers[0](c.name) is not None]
+    for matcher in matchers[1:]:
+        collections = [child for c in collections for child in c.children if matcher(child.name) is not None]
+    return collections
+
+# Cache of resolved targets shared by the operators and the panel
+class TargetIndex:
+    """Maps target IDs to their deduplicated mesh objects.
+    
+    Entries are built on first use and dropped again from the depsgraph
+    handler when one of the collections or objects they depend on changes.
+    """
+    
+    def __init__(self):
+        self.clear()
+    
+    def clear(self):
+        self._entries = {}
+        self._collection_deps = {}
+        self._object_deps = {}
+        self._combined = {}
+        self._controllers = {}
+        self._patterns = {}
+        self._pattern_collections = {}
+        self._overrides = None
+        self._data_counts = None
+    
+    @staticmethod
+    def key(target):
+        kind = 'COLLECTION' if isinstance(target, bpy.types.Collection) else 'OBJECT'
+        return (kind, target.session_uid)
+    
+    def get(self, target):
+        key = self.key(target)
+        entry = self._entries.get(key)
+        
+        if entry is not None and debug_verify_index_enabled():
+            rebuilt = self._resolve(target)
+            if {o.session_uid for o in rebuilt[0]} != {o.session_uid for o in entry[0]}:
+                logger.warning("Stale index entry for '%s', rebuilding", target.name)
+                self._drop(key)
+                entry = None
+        
+        if entry is None:
+            entry = self._resolve(target)
+            self._store(key, entry)
+        
+        return entry[0]
+    
+    def get_locked(self, target):
+        """Return the objects of a target that are linked and can't be changed"""
+        self.get(target)
+        return self._entries[self.key(target)][3]
+    
+    def editable_object(self, obj):
+        """Return the object targets change in place of obj, its override when it is linked, or None"""
+        if is_editable(obj):
+            return obj
+        if self._overrides is None:
+            self._overrides = gather_library_overrides()
+        override = self._overrides.get(obj.session_uid)
+        return override if override is not None and is_editable(override) else None
+    
+    def _resolve(self, target):
+        if self._overrides is None:
+            self._overrides = gather_library_overrides()
+        return resolve_target(target, self._overrides, follow_geometry_instances_enabled())
+    
+    def get_item(self, item):
+        """Return the mesh objects of any target list entry, None for an empty or invalid one"""
+        if item.target_type in {'COLLECTION', 'OBJECT'}:
+            target = item.target
+            return None if target is None else self.get(target)
+        
+        rule = compile_item_rule(item)
+        if rule is None:
+            return None
+        key, collection_matchers, name_match, matcher = rule
+        if not collection_matchers:
+            return name_index.get(key, matcher)
+        
+        # Filter the members of the matching collections, kept while they resolve the same.
+        # Renames only show up in the name index sequence once the index exists
+        name_index._ensure()
+        sequence = name_index.sequence
+        resolved = tuple(self.get(collection) for collection in self._find_collections(key, collection_matchers, sequence))
+        cached = self._patterns.get(key)
+        if (cached is not None and cached[2] == sequence and len(cached[0]) == len(resolved)
+                and all(a is b for a, b in zip(cached[0], resolved))):
+            return cached[1]
+        
+        objects = {}
+        for collection_objects in resolved:
+            for obj in collection_objects:
+                if name_match(obj.name) is not None:
+                    objects.setdefault(obj.session_uid, obj)
+        result = tuple(objects.values())
+        if cached is not None and cached[1] == result:
+            result = cached[1]
+        self._patterns[key] = (resolved, result, sequence)
+        return result
+    
+    def _find_collections(self, key, matchers, sequence):
+        # Collections only change names and children with a logged update, added or removed ones change the count
+        state = (sequence, len(bpy.data.collections))
+        cached = self._pattern_collections.get(key)
+        if cached is not None and cached[0] == state:
+            return cached[1]
+        collections = find_collections(matchers)
+        self._pattern_collections[key] = (state, collections)
+        return collections
+    
+    def get_many(self, targets_str):
+        """Return the deduplicated objects of a comma separated target string.
+        
+        The combined tuple is kept until one of its targets is resolved again,
+        so repeated calls with the same string return the same tuple.
+        """
+        targets = [find_target(name) for name in parse_target_names(targets_str)]
+        resolved = tuple(self.get(target) for target in targets if target is not None)
+        
+        cached = self._combined.get(targets_str)
+        if (cached is not None and len(cached[0]) == len(resolved)
+                and all(a is b for a, b in zip(cached[0], resolved))):
+            return cached[1]
+        
+        objects = {}
+        for target_objects in resolved:
+            for obj in target_objects:
+                objects.setdefault(obj.session_uid, obj)
+        combined = tuple(objects.values())
+        self._combined[targets_str] = (resolved, combined)
+        return combined
+    
+    def get_controller(self, props):
+        """Return (objects, offsets) for a controller's target list.
+        
+        Exclude entries remove their objects from the result. An object
+        listed by several include entries takes the level offset of the
+        first one. offsets is None when no entry has an offset. The result
+        is kept until the list changes or one of its targets is resolved again.
+        """
+        entries = []
+        for item in props.targets:
+            objects = self.get_item(item)
+            if objects is not None:
+                entries.append((item.mode, item.level_offset, objects))
+        
+        key = props.id_data.session_uid
+        cached = self._controllers.get(key)
+        if (cached is not None and len(cached[0]) == len(entries)
+                and all(a[0] == b[0] and a[1] == b[1] and a[2] is b[2] for a, b in zip(cached[0], entries))):
+            return cached[1]
+        
+        # Linked objects the include entries would have changed
+        locked = {}
+        for item in props.targets:
+            if item.mode == 'INCLUDE' and item.target is not None:
+                for obj in self.get_locked(item.target):
+                    locked.setdefault(obj.session_uid, obj)
+        
+        excluded = set()
+        for mode, offset, target_objects in entries:
+            if mode == 'EXCLUDE':
+                excluded.update(obj.session_uid for obj in target_objects)
+        
+        objects = {}
+        offsets = {}
+        for mode, offset, target_objects in entries:
+            if mode != 'INCLUDE':
+                continue
+            for obj in target_objects:
+                uid = obj.session_uid
+                if uid not in excluded and uid not in objects:
+                    objects[uid] = obj
+                    offsets[uid] = offset
+        
+        result = (tuple(objects.values()), tuple(offsets.values()) if any(offsets.values()) else None)
+        self._controllers[key] = (entries, result, tuple(locked.values()))
+        return result
+    
+    def get_controller_locked(self, props):
+        """Return the linked objects of a controller's targets that can't be changed"""
+        self.get_controller(props)
+        return self._controllers[props.id_data.session_uid][2]
+    
+    def count_controller_visits(self, props):
+        """Number of objects the include entries resolve to before deduplication"""
+        return sum(len(self.get_item(item) or ()) for item in props.targets if item.mode == 'INCLUDE')
+    
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        for uid in entry[1]:
+            self._collection_deps.setdefault(uid, set()).add(key)
+        for uid in entry[2]:
+            self._object_deps.setdefault(uid, set()).add(key)
+        if self._data_counts is None:
+            self._data_counts = (len(bpy.data.objects), len(bpy.data.collections))
+    
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for deps, uids in ((self._collection_deps, entry[1]), (self._object_deps, entry[2])):
+            for uid in uids:
+                keys = deps.get(uid)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del deps[uid]
+    
+    def _drop_removed(self):
+        # Something was deleted, drop every entry still holding a removed object
+        for key, entry in list(self._entries.items()):
+            try:
+                for obj in entry[0]:
+                    obj.name
+            except ReferenceError:
+                self._drop(key)
+    
+    def handle_depsgraph_update(self, depsgraph):
+        if not self._entries:
+            return
+        
+        stale = set()
+        for update in depsgraph.updates:
+            id_block = getattr(update.id, "original", update.id)
+            if isinstance(id_block, bpy.types.Collection):
+                stale.update(self._collection_deps.get(id_block.session_uid, ()))
+            elif isinstance(id_block, bpy.types.Object):
+                # Re-parenting tags the child, so check its (new) parent as well
+                stale.update(self._object_deps.get(id_block.session_uid, ()))
+                if id_block.parent is not None:
+                    stale.update(self._object_deps.get(id_block.parent.session_uid, ()))
+        
+        for key in stale:
+            self._drop(key)
+        
+        data_counts = (len(bpy.data.objects), len(bpy.data.collections))
+        if data_counts != self._data_counts:
+            # New or removed objects can be library overrides
+            self._overrides = None
+        if self._data_counts is not None and data_counts != self._data_counts:
+            if data_counts[0] < self._data_counts[0] or data_counts[1] < self._data_counts[1]:
+                self._drop_removed()
+        self._data_counts = data_counts
+
+target_index = TargetIndex()
+
+# Check an object for a subdivision modifier
+def has_subsurf(obj):
+    return any(mod.type == 'SUBSURF' for mod in obj.modifiers)
+
+# Precomputed statistics so the panel never has to scan the scene
+class TargetStatistics:
+    """Per-target mesh and subdivision counts.
+    
+    Counts are built from the target index once and then adjusted from the
+    depsgraph handler whenever a member object gains or loses a SUBSURF
+    modifier. An entry is rebuilt when the index resolved its target again.
+    """
+    
+    def __init__(self):
+        self.clear()
+    
+    def clear(self):
+        self._stats = {}
+        self._members = {}
+        self._has_subd = {}
+        self._base_counts = {}
+        self._count_users = {}
+        self._stale_counts = {}
+        self._sharing = {}
+    
+    def get(self, target):
+        """Return (mesh count, subdivision count, root has subdivision or None)"""
+        root_uid = None
+        if isinstance(target, bpy.types.Object) and target.type == 'MESH':
+            # A linked root is resolved to its override, or left out when it is locked
+            root = target_index.editable_object(target)
+            root_uid = None if root is None else root.session_uid
+        return self._get(TargetIndex.key(target), target_index.get(target), root_uid)
+    
+    def mesh_sharing(self, props):
+        """Return (modifier owners, distinct meshes) of a controller's targets"""
+        objects = target_index.get_controller(props)[0]
+        key = props.id_data.session_uid
+        cached = self._sharing.get(key)
+        if cached is not None and cached[0] is objects:
+            return cached[1]
+        result = (len(objects), len(group_by_mesh(objects)))
+        self._sharing[key] = (objects, result)
+        return result
+    
+    def get_item(self, item):
+        """Return the statistics of any target list entry, None for an empty or invalid one"""
+        if item.target_type in {'COLLECTION', 'OBJECT'}:
+            target = item.target
+            return None if target is None else self.get(target)
+        objects = target_index.get_item(item)
+        if objects is None:
+            return None
+        return self._get(compile_item_rule(item)[0], objects, None)
+    
+    def _get(self, key, objects, root_uid):
+        stats = self._stats.get(key)
+        
+        # The index returns a new tuple whenever it had to resolve the target again
+        if stats is None or stats[3] is not objects:
+            self._drop(key)
+            subd_count = 0
+            for obj in objects:
+                uid = obj.session_uid
+                self._members.setdefault(uid, set()).add(key)
+                flag = self._has_subd[uid] = has_subsurf(obj)
+                subd_count += flag
+            stats = self._stats[key] = [len(objects), subd_count, root_uid, objects]
+        
+        root_has_subd = None if stats[2] is None else self._has_subd.get(stats[2])
+        return stats[0], stats[1], root_has_subd
+    
+    def _drop(self, key):
+        stats = self._stats.pop(key, None)
+        if stats is None:
+            return
+        for obj in stats[3]:
+            try:
+                keys = self._members.get(obj.session_uid)
+            except ReferenceError:
+                continue
+            if keys is not None:
+                keys.discard(key)
+    
+    def base_counts(self, props):
+        """Return (objects, offsets, counts) for a controller, counts holds one column per
+        object with the base vertex, edge, corner and face count and whether it has subdivision"""
+        objects, offsets = get_controller_objects(props)
+        
+        key = props.id_data.session_uid
+        cached = self._base_counts.get(key)
+        stale = self._stale_counts.pop(key, None)
+        if cached is not None and cached[0] is objects:
+            if not stale:
+                return objects, offsets, cached[1]
+            counts = self._update_counts(cached, stale)
+            if counts is not None:
+                self._base_counts[key] = (objects, counts, *cached[2:])
+                return objects, offsets, counts
+        
+        # The object set changed, gather every column again
+        if cached is not None:
+            for uid in (*cached[2], *cached[3]):
+                users = self._count_users.get(uid)
+                if users is not None:
+                    users.discard(key)
+        counts = gather_base_counts(objects)
+        columns = {}
+        mesh_columns = {}
+        for column, obj in enumerate(objects):
+            columns[obj.session_uid] = column
+            mesh_columns.setdefault(obj.data.session_uid, []).append(column)
+        for uid in (*columns, *mesh_columns):
+            self._count_users.setdefault(uid, set()).add(key)
+        self._base_counts[key] = (objects, counts, columns, mesh_columns)
+        return objects, offsets, counts
+    
+    @staticmethod
+    def _update_counts(cached, stale):
+        """Return a copy of the counts with the columns of the changed objects and meshes
+        gathered again, None when an object switched meshes or was removed"""
+        objects, counts, columns, mesh_columns = cached
+        changed = set()
+        for uid in stale:
+            column = columns.get(uid)
+            if column is not None:
+                changed.add(column)
+            changed.update(mesh_columns.get(uid, ()))
+        
+        counts = counts.copy()
+        try:
+            for column in changed:
+                obj = objects[column]
+                mesh = obj.data
+                if column not in mesh_columns.get(mesh.session_uid, ()):
+                    return None
+                counts[:, column] = (len(mesh.vertices), len(mesh.edges), len(mesh.loops),
+                                     len(mesh.polygons), has_subsurf(obj))
+        except ReferenceError:
+            return None
+        return counts
+    
+    def handle_depsgraph_update(self, depsgraph):
+        for update in depsgraph.updates:
+            # Adding or removing modifiers tags the object's geometry
+            if not update.is_updated_geometry:
+                continue
+            id_block = getattr(update.id, "original", update.id)
+            if not isinstance(id_block, (bpy.types.Mesh, bpy.types.Object)):
+                continue
+            
+            # Only controllers using this mesh or object gather their base counts again
+            uid = id_block.session_uid
+            for key in self._count_users.get(uid, ()):
+                self._stale_counts.setdefault(key, set()).add(uid)
+            if isinstance(id_block, bpy.types.Mesh):
+                continue
+            
+            keys = self._members.get(uid)
+            if not keys:
+                continue
+            
+            flag = has_subsurf(id_block)
+            if flag == self._has_subd.get(uid):
+                continue
+            self._has_subd[uid] = flag
+            for key in keys:
+                stats = self._stats.get(key)
+                if stats is not None:
+                    stats[1] += 1 if flag else -1
+
+target_statistics = TargetStatistics()
+
+# Depth of every collection below the scene collection, the shallowest link wins
+def collection_depths(scene):
+    depths = {}
+    level = [scene.collection]
+    depth = 0
+    while level:
+        next_level = []
+        for collection in level:
+            if collection.session_uid not in depths:
+                depths[collection.session_uid] = depth
+                next_level.extend(collection.children)
+        level = next_level
+        depth += 1
+    return depths
+
+# Object -> controller ownership of one scene
+class SceneOwnership:
+    """Claims of every controller in a scene and the winner per object.
+
+    A claim is ranked by controller priority, then object entries before
+    collection entries, then deeper collections before shallower ones and
+    patterns or rules, then the controller name. Only controllers whose inputs changed are claimed
+    again, and only the objects they touch are re-ranked.
+    """
+
+    def __init__(self):
+        self.controllers = None
+        self.depths = None
+        self._inputs = {}
+        self._claimed = {}
+        self._claims = {}
+        self._owners = {}
+        self._owned = {}
+        self._shadowed = {}
+
+    def refresh(self, scene):
+        if self.controllers is None:
+            self.controllers = {obj.session_uid: obj for obj in iter_controllers(scene)}
+        if self.depths is None:
+            self.depths = collection_depths(scene)
+
+        for uid in [uid for uid in self._inputs if uid not in self.controllers]:
+            self._claim(uid, None, None)
+        for uid, controller in self.controllers.items():
+            props = controller.subdivision_control
+            inputs = self._gather_inputs(props)
+            if not self._same_inputs(self._inputs.get(uid), inputs):
+                self._claim(uid, controller, inputs)
+
+    def _gather_inputs(self, props):
+        entries = []
+        for index, item in enumerate(props.targets):
+            objects = target_index.get_item(item)
+            if objects is None:
+                continue
+            
+            # Patterns and rules can match anything, so they rank below every collection
+            if item.target_type == 'COLLECTION':
+                rank = (0, self.depths.get(item.collection.session_uid, 0))
+            elif item.target_type == 'OBJECT':
+                rank = (1, 0)
+            else:
+                rank = (0, -1)
+            entries.append((index, item.mode, item.level_offset, rank, objects))
+        return (props.priority, props.id_data.name), entries
+
+    @staticmethod
+    def _same_inputs(old, new):
+        if old is None or old[0] != new[0] or len(old[1]) != len(new[1]):
+            return False
+        return all(a[:4] == b[:4] and a[4] is b[4] for a, b in zip(old[1], new[1]))
+
+    def _claim(self, uid, controller, inputs):
+        old = self._claimed.pop(uid, {})
+        new = {}
+        if controller is None:
+            self._inputs.pop(uid, None)
+            self._owned.pop(uid, None)
+            self._shadowed.pop(uid, None)
+        else:
+            self._inputs[uid] = inputs
+            (priority, name), entries = inputs
+            excluded = set()
+            for index, mode, offset, rank, objects in entries:
+                if mode == 'EXCLUDE':
+                    excluded.update(obj.session_uid for obj in objects)
+
+            # Same offset rule as the target index, the best rank of all entries
+            for index, mode, offset, rank, objects in entries:
+                if mode != 'INCLUDE':
+                    continue
+                key = (-priority, -rank[0], -rank[1], name)
+                for obj in objects:
+                    obj_uid = obj.session_uid
+                    if obj_uid in excluded:
+                        continue
+                    claim = new.get(obj_uid)
+                    if claim is None:
+                        new[obj_uid] = (key, offset, obj)
+                    elif key < claim[0]:
+                        new[obj_uid] = (key, claim[1], obj)
+            self._claimed[uid] = new
+
+        dirty = {uid}
+        for obj_uid in old.keys() - new.keys():
+            claims = self._claims[obj_uid]
+            del claims[uid]
+            if not claims:
+                del self._claims[obj_uid]
+        for obj_uid, claim in new.items():
+            self._claims.setdefault(obj_uid, {})[uid] = claim[0]
+
+        for obj_uid in old.keys() | new.keys():
+            claims = self._claims.get(obj_uid)
+            owner = min(claims, key=claims.get) if claims else None
+            previous = self._owners.get(obj_uid)
+            if owner != previous:
+                dirty.update((owner, previous))
+                if owner is None:
+                    del self._owners[obj_uid]
+                else:
+                    self._owners[obj_uid] = owner
+
+        # Shadowed counts change with the owners of any claimed object
+        for dirty_uid in dirty:
+            self._owned.pop(dirty_uid, None)
+        self._shadowed.clear()
+
+    def get_owned(self, uid):
+        """Return (objects, offsets) a controller owns, in the order of its target list"""
+        owned = self._owned.get(uid)
+        if owned is None:
+            objects = []
+            offsets = []
+            for obj_uid, (key, offset, obj) in self._claimed.get(uid, {}).items():
+                if self._owners.get(obj_uid) == uid:
+                    objects.append(obj)
+                    offsets.append(offset)
+            owned = self._owned[uid] = (tuple(objects), tuple(offsets) if any(offsets) else None)
+        return owned
+
+    def get_shadowed(self, uid):
+        """Return {target list index: [(controller name, object count)]} for a controller"""
+        shadowed = self._shadowed.get(uid)
+        if shadowed is None:
+            shadowed = self._shadowed[uid] = {}
+            inputs = self._inputs.get(uid)
+            for index, mode, offset, rank, objects in inputs[1] if inputs else ():
+                if mode != 'INCLUDE':
+                    continue
+                counts = {}
+                for obj in objects:
+                    owner = self._owners.get(obj.session_uid)
+                    if owner is not None and owner != uid:
+                        counts[owner] = counts.get(owner, 0) + 1
+                if counts:
+                    shadowed[index] = [(self.controllers[owner].name, count) for owner, count in counts.items()]
+        return shadowed
+
+# Scene level registry of controllers and the objects they own
+class ControllerRegistry:
+    """Keeps one SceneOwnership per scene up to date.
+
+    Claims are refreshed lazily: the controller list is found again when
+    objects are added, removed or renamed, collection depths when the
+    collection hierarchy changes, everything else is caught by comparing
+    each controller's resolved targets with the ones it claimed last time.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._scenes = {}
+        self._object_count = None
+
+    def get(self, scene):
+        ownership = self._scenes.get(scene.session_uid)
+        if ownership is None:
+            ownership = self._scenes[scene.session_uid] = SceneOwnership()
+        ownership.refresh(scene)
+        if self._object_count is None:
+            self._object_count = len(bpy.data.objects)
+        return ownership
+
+    def get_controller(self, props, scene):
+        """Return (objects, offsets) a controller owns, all of its targets outside the scene"""
+        ownership = self.get(scene)
+        uid = props.id_data.session_uid
+        if uid not in ownership.controllers:
+            return target_index.get_controller(props)
+        return ownership.get_owned(uid)
+
+    def handle_depsgraph_update(self, depsgraph):
+        if not self._scenes:
+            return
+
+        controllers_changed = False
+        depths_changed = False
+        for update in depsgraph.updates:
+            id_block = getattr(update.id, "original", update.id)
+            if isinstance(id_block, bpy.types.Collection):
+                depths_changed = True
+            elif isinstance(id_block, bpy.types.Object):
+                # Renaming can turn an object into a controller or back
+                is_controller = "SubdController" in id_block.name
+                known = any(id_block.session_uid in ownership.controllers
+                            for ownership in self._scenes.values() if ownership.controllers is not None)
+                controllers_changed |= is_controller != known
+            elif isinstance(id_block, bpy.types.Scene):
+                depths_changed = True
+
+        object_count = len(bpy.data.objects)
+        controllers_changed |= object_count != self._object_count
+        self._object_count = object_count
+
+        for ownership in self._scenes.values():
+            if controllers_changed:
+                ownership.controllers = None
+            if depths_changed:
+                ownership.depths = None
+
+controller_registry = ControllerRegistry()
+
+# Get the addon preferences, None when running from the text editor
+def get_addon_preferences():
+    addon = bpy.context.preferences.addons.get(__name__)
+    return addon.preferences if addon else None
+
+def debug_verify_index_enabled():
+    prefs = get_addon_preferences()
+    return prefs is not None and prefs.debug_verify_index
+
+# Whether targets include what geometry nodes and particles instance
+def follow_geometry_instances_enabled():
+    prefs = get_addon_preferences()
+    return prefs is not None and prefs.follow_geometry_instances
+
+# Number of operations kept for the Performance section
+PROFILE_HISTORY = 8
+
+# Timings and counters of one controller operation
+class OperationProfile:
+    """Wall time per phase plus object counters for one operator run"""
+    
+    def __init__(self, operation, controller):
+        self.operation = operation
+        self.controller = controller
+        self.started = time.time()
+        self.total = 0.0
+        self.phases = {}
+        self.counts = {}
+        self._start = time.perf_counter()
+    
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+    
+    def count(self, **counts):
+        for name, value in counts.items():
+            self.counts[name] = self.counts.get(name, 0) + value
+    
+    def as_dict(self):
+        return {
+            "operation": self.operation,
+            "controller": self.controller,
+            "started": self.started,
+            "total": self.total,
+            "phases": self.phases,
+            "counts": self.counts,
+        }
+
+# Keeps the last profiles for the panel and writes the optional log file
+class Profiler:
+    
+    def __init__(self):
+        self.history = deque(maxlen=PROFILE_HISTORY)
+    
+    def begin(self, operation, controller=None):
+        return OperationProfile(operation, controller.name if controller else None)
+    
+    def finish(self, profile, context=None):
+        prefs = get_addon_preferences()
+        
+        # Force the evaluation now so its cost shows up in the profile
+        if prefs is not None and prefs.profile_depsgraph and context is not None:
+            with profile.phase("depsgraph"):
+                context.view_layer.update()
+        
+        profile.total = time.perf_counter() - profile._start
+        self.history.appendleft(profile)
+        
+        if prefs is not None and prefs.profile_log_path:
+            try:
+                with open(bpy.path.abspath(prefs.profile_log_path), "a") as log:
+                    log.write(json.dumps(profile.as_dict()) + "\n")
+            except OSError as error:
+                logger.warning("Could not write the profile log: %s", error)
+
+profiler = Profiler()
+
+# Get the mesh objects of a target name through the index
+def get_objects_from_target(target_name):
+    target = find_target(target_name)
+    if target is None:
+        return []
+    return list(target_index.get(target))
+
+# Get the deduplicated mesh objects of a comma separated target string
+def get_objects_from_targets(targets_str):
+    return target_index.get_many(targets_str)
+
+# Get the objects a controller owns in the scene and their level offsets
+def get_controller_objects(props, scene=None):
+    return controller_registry.get_controller(props, scene or bpy.context.scene)
+
+# Add a collection or object to a controller's target list, unless it's already there
+def add_target_item(props, target, mode='INCLUDE'):
+    for item in props.targets:
+        if item.target == target and item.mode == mode:
+            return None
+    
+    item = props.targets.add()
+    if isinstance(target, bpy.types.Collection):
+        item.target_type = 'COLLECTION'
+        item.collection = target
+    else:
+        item.target_type = 'OBJECT'
+        item.object = target
+    item.mode = mode
+    return item
+
+# Move the old comma separated targets into the target list
+def migrate_target_string(props):
+    """Return the number of migrated names, names that can't be found stay in the string"""
+    unresolved = []
+    migrated = 0
+    for name in parse_target_names(props.subdivision_object):
+        target = find_target(name)
+        if target is None:
+            unresolved.append(name)
+            continue
+        add_target_item(props, target)
+        migrated += 1
+    props.subdivision_object = convert_listtostring(unresolved)
+    return migrated
     
 # Function to count objects in a collection with subdivision (unchanged)
 def count_collection_objects(collection):
@@ -61,350 +1120,3195 @@ def count_collection_objects(collection):
         subd_count += s
     return count, subd_count
     
-def get_selected_outliner_items():
-    # Find Outliner area
-    area = next((a for a in bpy.context.window.screen.areas if a.type == 'OUTLINER'), None)
-    if not area:
-        print("No Outliner area found.")
-        return
+# Get the first subdivision modifier of an object
+def get_subsurf(obj):
+    for mod in obj.modifiers:
+        if mod.type == 'SUBSURF':
+            return mod
+    return None
 
-    region = next((r for r in area.regions if r.type == 'WINDOW'), None)
-    if not region:
-        print("No Outliner region found.")
+# The modifier settings a controller pushes to its targets
+def controller_subsurf_settings(props):
+    return {
+        "levels": props.subdivision_levels,
+        "render_levels": props.subdivision_render_levels,
+        "show_only_control_edges": props.show_only_control_edges,
+    }
+
+# Pair every object with its settings, applying the per-entry level offsets
+def controller_assignments(props, objects, offsets, settings=None):
+    if settings is None:
+        settings = controller_subsurf_settings(props)
+    if offsets is None:
+        return cap_dense_assignments(props, [(obj, settings) for obj in objects])
+    
+    by_offset = {0: settings}
+    assignments = []
+    for obj, offset in zip(objects, offsets):
+        offset_settings = by_offset.get(offset)
+        if offset_settings is None:
+            offset_settings = by_offset[offset] = dict(settings, **{
+                attr: min(max(settings[attr] + offset, 0), 6)
+                for attr in ("levels", "render_levels") if attr in settings
+            })
+        assignments.append((obj, offset_settings))
+    return cap_dense_assignments(props, assignments)
+
+# Keep the viewport level of dense meshes at 0 when the controller caps them
+def cap_dense_assignments(props, assignments):
+    if props is None or not props.cap_dense_meshes:
+        return assignments
+    limit = dense_face_limit()
+    capped = {}
+    result = []
+    for obj, settings in assignments:
+        if settings.get("levels", 0) > 0 and len(obj.data.polygons) > limit:
+            key = id(settings)
+            if key not in capped:
+                capped[key] = dict(settings, levels=0)
+            settings = capped[key]
+        result.append((obj, settings))
+    return result
+
+# Write settings to a modifier, only values that differ are assigned
+def write_modifier_settings(mod, settings):
+    changed = False
+    for attr, value in settings.items():
+        if getattr(mod, attr) != value:
+            setattr(mod, attr, value)
+            changed = True
+    return changed
+
+# Write (object, settings) pairs to the first subdivision modifier of each object
+def write_subsurf_settings(assignments):
+    """Return (changed, skipped, missing) object counts"""
+    changed = 0
+    skipped = 0
+    missing = 0
+    for obj, settings in assignments:
+        mod = get_subsurf(obj)
+        if mod is None:
+            missing += 1
+        elif write_modifier_settings(mod, settings):
+            changed += 1
+        else:
+            skipped += 1
+    return changed, skipped, missing
+
+# Read modifier settings of many objects into flat columns
+def capture_subsurf_state(objects, fields, with_missing=False):
+    """Return {"objects": names, "modifiers": names, "fields": {field: int array}}.
+
+    Only objects with a subdivision modifier are captured, unless
+    with_missing is set, then objects without one get an empty modifier
+    name and zeros. Objects and modifiers are referenced by name so the
+    state stays valid in a later session, bool and int settings are stored
+    as ints.
+    """
+    names = []
+    modifiers = []
+    columns = {field: [] for field in fields}
+    for obj in objects:
+        mod = get_subsurf(obj)
+        if mod is None:
+            if with_missing:
+                names.append(obj.name)
+                modifiers.append("")
+                for field in fields:
+                    columns[field].append(0)
+            continue
+        names.append(obj.name)
+        modifiers.append(mod.name)
+        for field in fields:
+            columns[field].append(getattr(mod, field))
+    return {
+        "objects": names,
+        "modifiers": modifiers,
+        "fields": {field: np.array(values, dtype=np.int32) for field, values in columns.items()},
+    }
+
+# Keep a captured state in an ID property, names are joined so the whole state is a few properties
+def store_subsurf_state(id_block, key, state):
+    id_block[key] = {
+        "objects": "\n".join(state["objects"]),
+        "modifiers": "\n".join(state["modifiers"]),
+        "fields": {field: values.tolist() for field, values in state["fields"].items()},
+    }
+
+def load_subsurf_state(id_block, key):
+    stored = id_block[key]
+    objects = stored["objects"]
+    return {
+        "objects": objects.split("\n") if objects else [],
+        "modifiers": stored["modifiers"].split("\n") if objects else [],
+        "fields": {field: np.array(values, dtype=np.int32) for field, values in stored["fields"].items()},
+    }
+
+# Write a captured state back, only values that differ are assigned
+def restore_subsurf_state(state, recreate=False):
+    """Return (changed, missing) object counts, missing objects or modifiers were removed or renamed.
+    
+    With recreate, modifiers that were deleted since the capture are added
+    again and objects captured without one lose the ones added since.
+    """
+    properties = bpy.types.SubsurfModifier.bl_rna.properties
+    casts = {field: bool if properties[field].type == 'BOOLEAN' else int for field in state["fields"]}
+    columns = [(field, casts[field], values.tolist()) for field, values in state["fields"].items()]
+    
+    changed = 0
+    missing = 0
+    for row, (name, mod_name) in enumerate(zip(state["objects"], state["modifiers"])):
+        obj = bpy.data.objects.get(name)
+        if obj is None:
+            missing += 1
+            continue
+        if not mod_name:
+            if recreate:
+                changed += remove_subsurf_modifiers([obj]) > 0
+            continue
+        
+        mod = obj.modifiers.get(mod_name)
+        if mod is None or mod.type != 'SUBSURF':
+            mod = get_subsurf(obj)
+        created = False
+        if mod is None:
+            if not recreate:
+                missing += 1
+                continue
+            mod = obj.modifiers.new(name=mod_name, type='SUBSURF')
+            created = True
+        written = write_modifier_settings(mod, {field: cast(values[row]) for field, cast, values in columns})
+        changed += written or created
+    return changed, missing
+
+# Compare a captured state with the current modifiers of the same objects
+def diff_subsurf_state(state):
+    """Return {"fields": {field: differing objects}, "objects": differing objects,
+    "presence": objects that gained or lost the modifier, "missing": objects that are gone}"""
+    objects = [bpy.data.objects.get(name) for name in state["objects"]]
+    found = np.fromiter((obj is not None for obj in objects), dtype=bool, count=len(objects))
+    current = capture_subsurf_state([obj for obj in objects if obj is not None], state["fields"], with_missing=True)
+    
+    captured_present = np.array([bool(name) for name in state["modifiers"]], dtype=bool)[found]
+    current_present = np.array([bool(name) for name in current["modifiers"]], dtype=bool)
+    compared = captured_present & current_present
+    
+    differs = np.zeros(len(current_present), dtype=bool)
+    fields = {}
+    for field, values in state["fields"].items():
+        field_differs = (values[found] != current["fields"][field]) & compared
+        fields[field] = int(field_differs.sum())
+        differs |= field_differs
+    presence = captured_present != current_present
+    return {
+        "fields": fields,
+        "objects": int((differs | presence).sum()),
+        "presence": int(presence.sum()),
+        "missing": int((~found).sum()),
+    }
+
+# Write a captured state to a JSON file, or a numpy .npz blob when the path ends in .npz
+def write_state_file(path, state):
+    if path.lower().endswith(".npz"):
+        np.savez_compressed(
+            path,
+            objects=np.array(state["objects"], dtype=str),
+            modifiers=np.array(state["modifiers"], dtype=str),
+            **{"field_" + field: values for field, values in state["fields"].items()}
+        )
         return
+    with open(path, "w") as f:
+        json.dump({
+            "version": 1,
+            "objects": state["objects"],
+            "modifiers": state["modifiers"],
+            "fields": {field: values.tolist() for field, values in state["fields"].items()},
+        }, f)
 
-    allselection = []
-    with bpy.context.temp_override(
-        window=bpy.context.window,
-        area=area,
-        region=region
-    ):
-        ids = bpy.context.selected_ids
+def read_state_file(path):
+    if path.lower().endswith(".npz"):
+        with np.load(path) as data:
+            state = {
+                "objects": data["objects"].tolist(),
+                "modifiers": data["modifiers"].tolist(),
+                "fields": {name[len("field_"):]: data[name].astype(np.int32) for name in data.files if name.startswith("field_")},
+            }
+    else:
+        with open(path) as f:
+            data = json.load(f)
+        state = {
+            "objects": data["objects"],
+            "modifiers": data["modifiers"],
+            "fields": {field: np.array(values, dtype=np.int32) for field, values in data["fields"].items()},
+        }
+    
+    # A truncated or edited file would otherwise fail halfway through a restore
+    count = len(state["objects"])
+    if len(state["modifiers"]) != count:
+        raise ValueError(f"{len(state['modifiers'])} modifiers for {count} objects")
+    for field, values in state["fields"].items():
+        if values.shape != (count,):
+            raise ValueError(f"field '{field}' has {values.size} values for {count} objects")
+    return state
 
-        collections = [item.name for item in ids if isinstance(item, bpy.types.Collection)]
-        objects = [item.name for item in ids if isinstance(item, bpy.types.Object)]
+# Add a subdivision modifier to every object of the (object, settings) pairs that doesn't have one yet
+def add_subsurf_modifiers(assignments):
+    """Return (added, skipped) object counts"""
+    added = 0
+    skipped = 0
+    for obj, settings in assignments:
+        if get_subsurf(obj) is None:
+            mod = obj.modifiers.new(name="Subdivision", type='SUBSURF')
+            write_modifier_settings(mod, settings)
+            added += 1
+        else:
+            skipped += 1
+    return added, skipped
 
-        print("Selected Collections:")
-        for col in collections:
-            print("  -", col)
+# Set smooth or flat shading on a whole mesh, returns False if nothing had to change
+def set_mesh_smooth(mesh, smooth):
+    face_count = len(mesh.polygons)
+    if face_count == 0:
+        return False
+    
+    # Since Blender 4.1 flat faces are stored in the "sharp_face" attribute
+    sharp_face = mesh.attributes.get("sharp_face")
+    if smooth:
+        if sharp_face is None:
+            return False
+        values = np.empty(face_count, dtype=bool)
+        sharp_face.data.foreach_get("value", values)
+        mesh.attributes.remove(sharp_face)
+        if not values.any():
+            return False
+    else:
+        if sharp_face is None:
+            sharp_face = mesh.attributes.new("sharp_face", 'BOOLEAN', 'FACE')
+        else:
+            values = np.empty(face_count, dtype=bool)
+            sharp_face.data.foreach_get("value", values)
+            if values.all():
+                return False
+        sharp_face.data.foreach_set("value", np.ones(face_count, dtype=bool))
+    
+    mesh.update()
+    return True
 
-        print("Selected Objects:")
-        for obj in objects:
-            print("  -", obj)
+# Collect the editable meshes of the given objects, shared meshes only once
+def collect_meshes(objects):
+    """Return (mesh object count, meshes, objects whose mesh is linked)"""
+    objects = [obj for obj in objects if obj.type == 'MESH']
+    meshes = []
+    locked = []
+    for mesh, owners in group_by_mesh(objects).values():
+        # Linked meshes can't be edited, even through an overridden object
+        if mesh.library is None:
+            meshes.append(mesh)
+        else:
+            locked.extend(owners)
+    return len(objects), meshes, locked
 
-        # ✅ Correct way to add to list
-        allselection.extend(collections)
-        allselection.extend(objects)
+# Shade the meshes of the given objects, shared meshes are only processed once
+def shade_objects(objects, smooth):
+    """Return (mesh objects, meshes changed, meshes skipped, objects whose mesh is linked)"""
+    count, meshes, locked = collect_meshes(objects)
+    changed = sum(1 for mesh in meshes if set_mesh_smooth(mesh, smooth))
+    return count, changed, len(meshes) - changed, locked
 
-    return allselection
+# Remove every subdivision modifier from the given objects
+def remove_subsurf_modifiers(objects):
+    deleted = 0
+    for obj in objects:
+        for mod in [mod for mod in obj.modifiers if mod.type == 'SUBSURF']:
+            obj.modifiers.remove(mod)
+            deleted += 1
+    return deleted
 
-def convert_listtostring(list):
-    slist = [str(element) for element in list]
-    slist = ", ".join(list)
+# Get the world space bounding box corners of many objects at once
+def gather_world_corners(objects):
+    """Return an (n, 8, 3) array with the corners of each object"""
+    all_objects = bpy.data.objects
+    count = len(all_objects)
     
-    return slist
+    # Read every object in one go and pick the rows of the requested objects
+    uids = np.empty(count, dtype=np.int32)
+    all_objects.foreach_get("session_uid", uids)
+    order = np.argsort(uids)
+    wanted = np.fromiter((obj.session_uid for obj in objects), dtype=np.int32, count=len(objects))
+    rows = order[np.searchsorted(uids, wanted, sorter=order)]
+    
+    matrices = np.empty(count * 16, dtype=np.float32)
+    all_objects.foreach_get("matrix_world", matrices)
+    corners = np.empty(count * 24, dtype=np.float32)
+    all_objects.foreach_get("bound_box", corners)
+    
+    # Matrices come out column major, so the rotation part is already transposed
+    matrices = matrices.reshape(count, 4, 4)[rows]
+    corners = corners.reshape(count, 8, 3)[rows]
+    return corners @ matrices[:, :3, :3] + matrices[:, 3, None, :3]
 
-# Property group for subdivision control properties
-class SubdivisionControlProperties(bpy.types.PropertyGroup):
-    subdivision_levels: IntProperty(
-        name="Viewport",
-        description="Subdivision level for viewport display",
-        min=0,
-        max=6,
-        default=1
-    )
-    subdivision_render_levels: IntProperty(
-        name="Render",
-        description="Subdivision level for rendering",
-        min=0,
-        max=6,
-        default=2
-    )
-    subdivision_object: StringProperty(
-        name="",
-        description="Collections or objects to control subdivision for (comma separated)",
-        default=""
-    )
-    show_only_control_edges: bpy.props.BoolProperty(
-        name="Optimize Display",
-        description="Display only control edges in the viewport",
-        default=False
+# Get world space bounding box centers and diagonals for many objects at once
+def gather_world_bounds(objects):
+    """Return (centers, diagonals) arrays with one row per object"""
+    world = gather_world_corners(objects)
+    low = world.min(axis=1)
+    high = world.max(axis=1)
+    return (low + high) * 0.5, np.linalg.norm(high - low, axis=1)
+
+# Approximate on-screen size in pixels of bounding spheres seen from a camera
+def projected_pixel_sizes(scene, camera, centers, diagonals):
+    render = scene.render
+    scale = render.resolution_percentage / 100
+    width = max(render.resolution_x, render.resolution_y) * scale
+    
+    if camera.data.type == 'ORTHO':
+        return diagonals / camera.data.ortho_scale * width
+    
+    # Distance instead of depth so objects behind the camera still get a level for reflections
+    position = np.array(camera.matrix_world.translation, dtype=np.float32)
+    distance = np.linalg.norm(centers - position, axis=1)
+    distance = np.maximum(distance, camera.data.clip_start)
+    return diagonals / distance * (camera.data.lens / camera.data.sensor_width) * width
+
+# Pick a subdivision level per object from its pixel size
+def lod_levels(pixel_sizes, props):
+    low = max(props.lod_min_pixels, 1.0)
+    high = max(props.lod_max_pixels, low * 2)
+    
+    # Every level doubles the edge resolution, so interpolate in log space
+    t = np.log2(np.maximum(pixel_sizes, 1e-6) / low) / np.log2(high / low)
+    t = np.clip(t, 0.0, 1.0)
+    return np.rint(props.lod_min_level + t * (props.lod_max_level - props.lod_min_level)).astype(np.int32)
+
+# Work out screen size based settings for the objects of a controller
+def lod_assignments(scene, props, objects, offsets=None):
+    """Return a list of (object, settings) pairs, None without a scene camera"""
+    camera = scene.camera
+    if camera is None:
+        return None
+    if not objects:
+        return []
+    
+    centers, diagonals = gather_world_bounds(objects)
+    render_levels = lod_levels(projected_pixel_sizes(scene, camera, centers, diagonals), props)
+    if offsets is not None:
+        render_levels = np.clip(render_levels + np.asarray(offsets), 0, 6)
+    
+    # Keep the controller's viewport to render offset
+    offset = props.subdivision_render_levels - props.subdivision_levels
+    viewport_levels = np.clip(render_levels - offset, 0, 6)
+    
+    only_control_edges = props.show_only_control_edges
+    return cap_dense_assignments(props, [
+        (obj, {"levels": viewport, "render_levels": render, "show_only_control_edges": only_control_edges})
+        for obj, viewport, render in zip(objects, viewport_levels.tolist(), render_levels.tolist())
+    ])
+
+# Write screen size based levels to the objects of a controller
+def apply_lod(scene, props, objects, offsets=None):
+    """Return (changed, skipped, missing) object counts, None without a scene camera"""
+    assignments = lod_assignments(scene, props, objects, offsets)
+    if assignments is None:
+        return None
+    return write_subsurf_settings(assignments)
+
+# Test bounding boxes against the frustum of a world to clip space matrix
+def outside_frustum(corners, matrix, margin=0.0):
+    """Return a bool array, True where all corners are outside the same clip plane"""
+    matrix = np.array(matrix, dtype=np.float32)
+    clip = corners @ matrix[:3, :3].T + matrix[:3, 3]
+    x, y, z = clip[..., 0], clip[..., 1], clip[..., 2]
+    w = corners @ matrix[3, :3] + matrix[3, 3]
+
+    # The planes are linear in world space, so testing the corners is enough
+    side = w * (1.0 + margin)
+    return (
+        (x > side).all(axis=1) | (x < -side).all(axis=1)
+        | (y > side).all(axis=1) | (y < -side).all(axis=1)
+        | (z < -w).all(axis=1) | (z > w).all(axis=1)
     )
 
-# Operator to create a subdivision controller
-class OBJECT_OT_create_subdivision_controller(bpy.types.Operator):
-    """Create a subdivision controller object for selected objects"""
-    bl_idname = "object.create_subdivision_controller"
-    bl_label = "Create Subdivision Controller"
-    bl_description = "Create a controller object to manage subdivision levels"
+# Test bounding boxes for being hidden behind solid occluder boxes
+def occluded_by_boxes(corners, eye, occluders):
+    """Return a bool array, True where an occluder hides the whole box from the eye.
+
+    occluders is a list of (matrix_world, local min, local max). A box counts
+    as hidden when the rays to all of its corners pass through the same
+    occluder and the box is farther from the eye than any part of it.
+    """
+    hidden = np.zeros(len(corners), dtype=bool)
+    if not len(corners):
+        return hidden
+
+    eye = np.asarray(eye, dtype=np.float64)
+    nearest = np.linalg.norm(corners - eye, axis=2).min(axis=1)
+    for matrix, low, high in occluders:
+        matrix = np.array(matrix, dtype=np.float64)
+        box = np.array([(x, y, z) for x in (low[0], high[0]) for y in (low[1], high[1]) for z in (low[2], high[2])])
+        farthest = np.linalg.norm(box @ matrix[:3, :3].T + matrix[:3, 3] - eye, axis=1).max()
+        candidates = ~hidden & (nearest > farthest)
+        if not candidates.any():
+            continue
+
+        # Slab test of the eye to corner segments in the occluder's local space
+        inverse = np.linalg.inv(matrix)
+        local_eye = inverse[:3, :3] @ eye + inverse[:3, 3]
+        local = corners[candidates] @ inverse[:3, :3].T + inverse[:3, 3]
+        direction = local - local_eye
+        direction[np.abs(direction) < 1e-12] = 1e-12
+        t1 = (np.asarray(low) - local_eye) / direction
+        t2 = (np.asarray(high) - local_eye) / direction
+        t_near = np.minimum(t1, t2).max(axis=2)
+        t_far = np.maximum(t1, t2).min(axis=2)
+        hits = (t_far >= np.maximum(t_near, 0.0)) & (t_near <= 1.0)
+        hidden[np.flatnonzero(candidates)[hits.all(axis=1)]] = True
+    return hidden
+
+# Approximate memory use of an evaluated mesh in bytes per element
+BYTES_PER_VERTEX = 24   # position and normal
+BYTES_PER_EDGE = 8
+BYTES_PER_CORNER = 16   # vertex, edge and UV
+BYTES_PER_FACE = 8
+
+# Read base mesh sizes, meshes shared by several objects are only read once
+def gather_base_counts(objects):
+    """Return a (5, n) array of vertices, edges, corners, faces and has-subdivision"""
+    sizes = {}
+    rows = []
+    for obj in objects:
+        mesh = obj.data
+        size = sizes.get(mesh.session_uid)
+        if size is None:
+            size = sizes[mesh.session_uid] = (len(mesh.vertices), len(mesh.edges), len(mesh.loops), len(mesh.polygons))
+        rows.append((*size, has_subsurf(obj)))
+    return np.array(rows, dtype=np.float64).reshape(-1, 5).T
+
+# Predict evaluated sizes from base counts without evaluating any modifier
+def estimate_subdivided_counts(counts, levels):
+    """Return (vertices, faces, bytes) arrays for Catmull-Clark at the given levels"""
+    vertices, edges, corners, faces = counts[:4]
+    levels = np.broadcast_to(levels, vertices.shape)
+    
+    # Every step turns each face corner into a quad
+    for level in range(1, int(levels.max(initial=0)) + 1):
+        step = levels >= level
+        vertices, edges, corners, faces = (
+            np.where(step, vertices + edges + faces, vertices),
+            np.where(step, 2 * edges + corners, edges),
+            np.where(step, 4 * corners, corners),
+            np.where(step, corners, faces),
+        )
+    
+    memory = (vertices * BYTES_PER_VERTEX + edges * BYTES_PER_EDGE
+              + corners * BYTES_PER_CORNER + faces * BYTES_PER_FACE)
+    return vertices, faces, memory
+
+# Per-object controller levels with entry offsets, zero for objects without subdivision
+def controller_levels(level, counts, offsets):
+    if offsets is None:
+        levels = np.full(counts.shape[1], level)
+    else:
+        levels = np.clip(level + np.asarray(offsets), 0, 6)
+    return np.where(counts[4] > 0, levels, 0)
+
+# Pick per-object levels that keep the total under a budget
+def fit_levels_to_budget(counts, max_levels, budget, use_memory):
+    """Return levels <= max_levels whose estimated total stays under the budget.
+    
+    Every object keeps the highest level whose own cost is under a shared
+    cap, and the cap is found by bisection. This lowers the heaviest objects
+    first, like a greedy solver, but stays vectorized.
+    """
+    max_levels = np.asarray(max_levels, dtype=np.int32)
+    costs = np.empty((7, max_levels.size))
+    for level in range(7):
+        vertices, faces, memory = estimate_subdivided_counts(counts, level)
+        costs[level] = memory if use_memory else faces
+    
+    columns = np.arange(max_levels.size)
+    allowed = np.arange(7)[:, None] <= max_levels
+    
+    def levels_for_cap(cap):
+        fits = allowed & (costs <= cap)
+        fits[0] = True
+        return 6 - np.argmax(fits[::-1], axis=0)
+    
+    levels = max_levels.copy()
+    if costs[levels, columns].sum() <= budget:
+        return levels
+    
+    candidates = np.unique(costs[allowed])
+    low, high = 0, len(candidates) - 1
+    best = np.zeros_like(max_levels)
+    while low <= high:
+        middle = (low + high) // 2
+        levels = levels_for_cap(candidates[middle])
+        if costs[levels, columns].sum() <= budget:
+            best = levels
+            low = middle + 1
+        else:
+            high = middle - 1
+    return best
+
+# Readable numbers for the panel
+def format_count(value):
+    for unit, size in (("B", 1e9), ("M", 1e6), ("K", 1e3)):
+        if value >= size:
+            return f"{value / size:.1f}{unit}"
+    return f"{int(value)}"
+
+def format_memory(value):
+    for unit, size in (("GB", 1024 ** 3), ("MB", 1024 ** 2)):
+        if value >= size:
+            return f"{value / size:.1f} {unit}"
+    return f"{value / 1024:.1f} KB"
+
+# Modifiers that get much slower when they run on subdivided geometry
+EXPENSIVE_MODIFIERS = {'BOOLEAN', 'DISPLACE', 'REMESH', 'SOLIDIFY', 'NODES'}
+
+# Base face count above which subdivision is flagged when the preferences aren't available
+DENSE_MESH_FACES = 100000
+
+def dense_face_limit():
+    prefs = get_addon_preferences()
+    return prefs.dense_mesh_faces if prefs is not None else DENSE_MESH_FACES
+
+# Order fixes are applied in, extra subdivisions are removed before the rest is moved
+STACK_FIX_ORDER = ('MULTIPLE', 'ORDER', 'DENSE')
+
+# Find modifier stack cost problems of many objects
+def analyze_modifier_stacks(objects, dense_faces):
+    """Return a list of (object, kind, multiplier, detail) findings, heaviest first.
+    
+    kind is 'ORDER' for subdivision before expensive modifiers, 'MULTIPLE'
+    for more than one subdivision modifier and 'DENSE' for subdivision of
+    a mesh that already has more than dense_faces faces. multiplier is the
+    estimated vertex count the affected modifiers see relative to what
+    they would see after the fix, from the base counts. The first
+    subdivision is the one the controller writes to, so its level is the
+    baseline for stacked subdivisions.
+    """
+    counts = gather_base_counts(objects)
+    rows = []
+    levels = []
+    baseline = []
+    findings = []
+    
+    for index, obj in enumerate(objects):
+        stack = [(mod.type, mod.levels if mod.type == 'SUBSURF' else 0, mod.name) for mod in obj.modifiers]
+        subsurfs = [position for position, (kind, level, name) in enumerate(stack) if kind == 'SUBSURF']
+        if not subsurfs:
+            continue
+        
+        # Expensive modifiers below a subdivision run on the subdivided mesh
+        expensive = [name for kind, level, name in stack[subsurfs[0] + 1:] if kind in EXPENSIVE_MODIFIERS]
+        if expensive:
+            last = max(position for position, (kind, level, name) in enumerate(stack) if kind in EXPENSIVE_MODIFIERS)
+            before = sum(stack[position][1] for position in subsurfs if position < last)
+            rows.append(index)
+            levels.append(before)
+            baseline.append(0)
+            findings.append((obj, 'ORDER', f"{stack[subsurfs[0]][2]} before {', '.join(expensive)}"))
+        
+        if len(subsurfs) > 1:
+            total = sum(stack[position][1] for position in subsurfs)
+            rows.append(index)
+            levels.append(total)
+            baseline.append(stack[subsurfs[0]][1])
+            findings.append((obj, 'MULTIPLE', f"{len(subsurfs)} subdivision modifiers, {total} levels in total"))
+        
+        first_level = stack[subsurfs[0]][1]
+        if counts[3, index] > dense_faces and first_level > 0:
+            rows.append(index)
+            levels.append(first_level)
+            baseline.append(0)
+            findings.append((obj, 'DENSE', f"{format_count(counts[3, index])} base faces at level {first_level}"))
+    
+    if not findings:
+        return []
+    
+    # Estimate every finding in one vectorized pass
+    subset = counts[:, rows]
+    vertices = estimate_subdivided_counts(subset, np.array(levels))[0]
+    fixed = estimate_subdivided_counts(subset, np.array(baseline))[0]
+    multipliers = (vertices / np.maximum(fixed, 1)).tolist()
+    
+    findings = [(obj, kind, multiplier, detail) for (obj, kind, detail), multiplier in zip(findings, multipliers)]
+    findings.sort(key=lambda finding: finding[2], reverse=True)
+    return findings
+
+# Move subdivision modifiers below the last expensive modifier, return the number of moves
+def move_subsurf_after_expensive(obj):
+    modifiers = obj.modifiers
+    moved = 0
+    while True:
+        kinds = [mod.type for mod in modifiers]
+        last = max((position for position, kind in enumerate(kinds) if kind in EXPENSIVE_MODIFIERS), default=-1)
+        first = next((position for position, kind in enumerate(kinds) if kind == 'SUBSURF' and position < last), None)
+        if first is None:
+            return moved
+        modifiers.move(first, last)
+        moved += 1
+
+# Keep only the first subdivision modifier, the one the controller writes to, return the number removed
+def remove_extra_subsurf_modifiers(obj):
+    subsurfs = [mod for mod in obj.modifiers if mod.type == 'SUBSURF']
+    for mod in subsurfs[1:]:
+        obj.modifiers.remove(mod)
+    return max(len(subsurfs) - 1, 0)
+
+# Keep dense meshes at their base resolution in the viewport, return True if anything changed
+def lower_dense_subsurf(obj):
+    changed = False
+    for mod in obj.modifiers:
+        if mod.type == 'SUBSURF' and mod.levels > 0:
+            mod.levels = 0
+            changed = True
+    return changed
+
+# Fix for every kind of finding
+STACK_FIXES = {
+    'ORDER': move_subsurf_after_expensive,
+    'MULTIPLE': remove_extra_subsurf_modifiers,
+    'DENSE': lower_dense_subsurf,
+}
+
+# Last analysis per controller, cleared when the stacks were fixed
+stack_analysis = {}
+
+# Modifier properties driven by the controller in driver mode
+DRIVER_BINDINGS = (
+    ("levels", "subdivision_levels"),
+    ("render_levels", "subdivision_render_levels"),
+    ("show_only_control_edges", "show_only_control_edges"),
+)
+
+# Check whether a driver reads its value from the given controller
+def driver_targets_controller(fcurve, controller):
+    driver = fcurve.driver
+    return (len(driver.variables) == 1
+            and driver.variables[0].type == 'SINGLE_PROP'
+            and driver.variables[0].targets[0].id == controller)
+
+# Constant added by a driver F-Curve's generator modifier
+def driver_offset(fcurve):
+    for fmod in fcurve.modifiers:
+        if fmod.type == 'GENERATOR':
+            return fmod.coefficients[0]
+    return 0.0
+
+# Drive the first subdivision modifier of an object from a controller
+def bind_subsurf_drivers(obj, controller, offset=0):
+    """Return True if a driver was added, retargeted or had its offset changed"""
+    mod = get_subsurf(obj)
+    if mod is None:
+        return False
+    
+    drivers = obj.animation_data.drivers if obj.animation_data else None
+    changed = False
+    for attr, source in DRIVER_BINDINGS:
+        data_path = f'modifiers["{bpy.utils.escape_identifier(mod.name)}"].{attr}'
+        attr_offset = offset if attr != "show_only_control_edges" else 0
+        fcurve = drivers.find(data_path) if drivers else None
+        if (fcurve is not None and driver_targets_controller(fcurve, controller)
+                and fcurve.driver.variables[0].targets[0].data_path == f"subdivision_control.{source}"
+                and driver_offset(fcurve) == attr_offset):
+            continue
+        if fcurve is not None:
+            obj.driver_remove(data_path)
+        
+        # An averaged single variable is evaluated in C, no Python expression involved
+        fcurve = mod.driver_add(attr)
+        driver = fcurve.driver
+        driver.type = 'AVERAGE'
+        var = driver.variables.new()
+        var.name = "controller"
+        var.type = 'SINGLE_PROP'
+        var.targets[0].id = controller
+        var.targets[0].data_path = f"subdivision_control.{source}"
+        
+        # Entry level offsets go into the generator, which is evaluated in C as well
+        if attr_offset:
+            generator = next((fmod for fmod in fcurve.modifiers if fmod.type == 'GENERATOR'), None)
+            if generator is None:
+                generator = fcurve.modifiers.new('GENERATOR')
+            generator.mode = 'POLYNOMIAL'
+            generator.poly_order = 1
+            generator.coefficients = (attr_offset, 1.0)
+        
+        drivers = obj.animation_data.drivers
+        changed = True
+    return changed
+
+# Remove the drivers a controller put on an object's subdivision modifiers
+def unbind_subsurf_drivers(obj, controller):
+    """Return True if any driver was removed"""
+    if obj.animation_data is None:
+        return False
+    
+    attrs = {attr for attr, source in DRIVER_BINDINGS}
+    stale = [
+        fcurve.data_path for fcurve in obj.animation_data.drivers
+        if fcurve.data_path.startswith("modifiers[")
+        and fcurve.data_path.rsplit(".", 1)[-1] in attrs
+        and driver_targets_controller(fcurve, controller)
+    ]
+    for data_path in stale:
+        obj.driver_remove(data_path)
+    return bool(stale)
+
+# Find every object that has drivers pointing at a controller
+def get_driver_bound_objects(controller):
+    return [
+        obj for obj in bpy.data.objects
+        if obj.animation_data is not None
+        and any(driver_targets_controller(fcurve, controller) for fcurve in obj.animation_data.drivers)
+    ]
+
+# Items processed between two clock checks in chunked operators
+CHUNK_STEP = 64
+
+# Find every subdivision controller in a scene
+def iter_controllers(scene):
+    return (obj for obj in scene.objects if "SubdController" in obj.name)
+
+def get_selected_outliner_items():
+    # Find Outliner area
+    area = next((a for a in bpy.context.window.screen.areas if a.type == 'OUTLINER'), None)
+    if not area:
+        logger.debug("No Outliner area found.")
+        return []
+
+    region = next((r for r in area.regions if r.type == 'WINDOW'), None)
+    if not region:
+        logger.debug("No Outliner region found.")
+        return []
+
+    allselection = []
+    with bpy.context.temp_override(
+        window=bpy.context.window,
+        area=area,
+        region=region
+    ):
+        ids = bpy.context.selected_ids
+
+        collections = [item for item in ids if isinstance(item, bpy.types.Collection)]
+        objects = [item for item in ids if isinstance(item, bpy.types.Object)]
+
+        logger.debug("Selected collections: %s", [col.name for col in collections])
+        logger.debug("Selected objects: %s", [obj.name for obj in objects])
+
+        # ✅ Correct way to add to list
+        allselection.extend(collections)
+        allselection.extend(objects)
+
+    return allselection
+
+def convert_listtostring(list):
+    slist = [str(element) for element in list]
+    slist = ", ".join(list)
+    
+    return slist
+
+# Seconds a live link change has to settle before it is pushed
+LIVE_LINK_DELAY = 0.15
+
+# Controller name -> time of its last live link change
+live_link_pending = {}
+
+# Property update callback, only records the change, the timer does the work
+def schedule_live_update(props, context):
+    if not props.live_link:
+        return
+    live_link_pending[props.id_data.name] = time.perf_counter()
+    if not bpy.app.timers.is_registered(flush_live_updates):
+        bpy.app.timers.register(flush_live_updates, first_interval=LIVE_LINK_DELAY)
+
+# Push coalesced live link changes once the user stopped dragging
+def flush_live_updates():
+    if not live_link_pending:
+        return None
+    
+    # Wait until the last change has settled
+    waited = time.perf_counter() - max(live_link_pending.values())
+    if waited < LIVE_LINK_DELAY:
+        return LIVE_LINK_DELAY - waited
+    
+    names = list(live_link_pending)
+    live_link_pending.clear()
+    
+    changed = 0
+    for name in names:
+        control_obj = bpy.data.objects.get(name)
+        if control_obj is None:
+            continue
+        props = control_obj.subdivision_control
+        if not props.live_link or not props.targets:
+            continue
+        
+        # Cached target set, no scene walk unless the targets changed
+        profile = profiler.begin("Live Link", control_obj)
+        with profile.phase("resolve"):
+            objects, offsets = get_controller_objects(props)
+            if props.use_lod:
+                assignments = lod_assignments(bpy.context.scene, props, objects, offsets) or []
+            else:
+                assignments = controller_assignments(props, objects, offsets)
+        with profile.phase("write"):
+            result = write_subsurf_settings(assignments)
+        profile.count(visited=len(objects), modified=result[0], skipped=result[1] + result[2])
+        profiler.finish(profile)
+        changed += result[0]
+    
+    if changed:
+        try:
+            bpy.ops.ed.undo_push(message="Subdivision Live Link")
+        except RuntimeError:
+            pass
+    return None
+
+# Seconds between two viewport culling checks
+CULLING_INTERVAL = 0.1
+
+# Find the 3D view culling follows, the largest one in the first window that has one
+def find_culling_view():
+    """Return the SpaceView3D or None"""
+    wm = bpy.context.window_manager
+    for window in wm.windows:
+        areas = [area for area in window.screen.areas if area.type == 'VIEW_3D']
+        if areas:
+            return max(areas, key=lambda area: area.width * area.height).spaces.active
+    return None
+
+# World to clip space matrix and eye position (None when orthographic) of a culling source
+def culling_frustum(scene, props, space):
+    if props.culling_source == 'VIEW':
+        if space is None:
+            return None
+        region_3d = space.region_3d
+        eye = region_3d.view_matrix.inverted().translation if region_3d.is_perspective else None
+        return region_3d.perspective_matrix, eye
+
+    camera = scene.camera
+    if camera is None:
+        return None
+    render = scene.render
+    projection = camera.calc_matrix_camera(
+        bpy.context.evaluated_depsgraph_get(),
+        x=render.resolution_x, y=render.resolution_y,
+        scale_x=render.pixel_aspect_x, scale_y=render.pixel_aspect_y,
+    )
+    eye = camera.matrix_world.translation if camera.data.type == 'PERSP' else None
+    return projection @ camera.matrix_world.inverted(), eye
+
+# Comparable snapshot of a culling frustum
+def frustum_key(frustum):
+    if frustum is None:
+        return None
+    matrix, eye = frustum
+    return tuple(map(tuple, matrix)), None if eye is None else tuple(eye)
+
+# Local bounding boxes of the meshes in an occluder collection
+def gather_occluders(collection):
+    occluders = []
+    for obj in collection.all_objects:
+        if obj.type == 'MESH':
+            corners = np.array(obj.bound_box)
+            occluders.append((obj.matrix_world, corners.min(axis=0), corners.max(axis=0)))
+    return occluders
+
+# The settings a culled or restored object gets
+def culled_assignments(props, objects):
+    if props.culling_action == 'DISABLE':
+        settings = {"show_viewport": False}
+    else:
+        settings = {"levels": 0, "show_viewport": True}
+    return [(obj, settings) for obj in objects]
+
+# Whether an object's modifier is in the culled state, for the first check after a load
+def looks_culled(obj, props):
+    mod = get_subsurf(obj)
+    if mod is None:
+        return False
+    if props.culling_action == 'DISABLE':
+        return not mod.show_viewport
+    return mod.levels == 0
+
+def restored_assignments(scene, props, objects, offsets):
+    assignments = None
+    if props.use_lod:
+        assignments = lod_assignments(scene, props, objects, offsets)
+    if assignments is None:
+        assignments = controller_assignments(props, objects, offsets)
+    return [(obj, dict(settings, show_viewport=True)) for obj, settings in assignments]
+
+# Viewport subdivision culling of every controller
+class ViewCuller:
+    """Drops viewport subdivision of targets that can't be seen.
+
+    Bounding boxes are read again only after a transform or geometry change.
+    When just the view moved, only objects whose culled state flipped are
+    written. After any other edit the culled settings are asserted again,
+    so operators that wrote the controller levels don't leave stale state.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._state = {}
+        self._corners = {}
+        self._visible = {}
+        self._last_tick = None
+        self.transform_generation = 0
+        self.edit_generation = 0
+
+    def culled_count(self, uid):
+        """Return (culled, total) for a controller, None when it isn't culling"""
+        state = self._state.get(uid)
+        if state is None:
+            return None
+        return int(state[1].sum()), len(state[1])
+
+    def update(self, scene):
+        """Cull the targets of every controller, return False when none is culling"""
+        ownership = controller_registry.get(scene)
+        active = [uid for uid, controller in ownership.controllers.items() if controller.subdivision_control.use_culling]
+        for uid in [uid for uid in self._state if uid not in active]:
+            self._restore(scene, ownership.controllers.get(uid), uid)
+        if not active:
+            self._last_tick = None
+            return False
+
+        space = find_culling_view()
+        view_layer = bpy.context.view_layer
+
+        # Nothing moved and nothing was edited since the last check
+        views = [culling_frustum(scene, ownership.controllers[uid].subdivision_control, space) for uid in active]
+        tick = (self.edit_generation, active, [frustum_key(view) for view in views])
+        if tick == self._last_tick:
+            return True
+        self._last_tick = tick
+
+        occluders = {}
+        for uid, frustum in zip(active, views):
+            if frustum is None:
+                continue
+            props = ownership.controllers[uid].subdivision_control
+            objects, offsets = ownership.get_owned(uid)
+
+            matrix, eye = frustum
+            corners = self._get_corners(uid, objects)
+            mask = outside_frustum(corners, matrix, props.culling_margin)
+            if props.culling_hidden:
+                mask |= ~self._get_visible(uid, objects, view_layer, space)
+            occluder_collection = props.culling_occluders
+            if eye is not None and occluder_collection is not None and not mask.all():
+                if occluder_collection.session_uid not in occluders:
+                    occluders[occluder_collection.session_uid] = gather_occluders(occluder_collection)
+                mask |= occluded_by_boxes(corners, eye, occluders[occluder_collection.session_uid])
+
+            self._apply(scene, uid, props, objects, offsets, mask)
+        return True
+
+    def restore_all(self, scene):
+        controllers = controller_registry.get(scene).controllers
+        for uid in list(self._state):
+            self._restore(scene, controllers.get(uid), uid)
+
+    def _get_corners(self, uid, objects):
+        cached = self._corners.get(uid)
+        if cached is not None and cached[0] == self.transform_generation and cached[1] is objects:
+            return cached[2]
+        corners = gather_world_corners(objects)
+        self._corners[uid] = (self.transform_generation, objects, corners)
+        return corners
+
+    def _get_visible(self, uid, objects, view_layer, space):
+        key = (self.edit_generation, view_layer.name, space and space.as_pointer())
+        cached = self._visible.get(uid)
+        if cached is not None and cached[0] == key and cached[1] is objects:
+            return cached[2]
+        visible = np.fromiter((obj.visible_get(view_layer=view_layer, viewport=space) for obj in objects),
+                              dtype=bool, count=len(objects))
+        self._visible[uid] = (key, objects, visible)
+        return visible
+
+    def _apply(self, scene, uid, props, objects, offsets, mask):
+        previous = self._state.get(uid)
+        signature = (props.culling_action, self.edit_generation)
+
+        # Which objects are culled right now
+        if previous is None:
+            # First check after enabling, a load or an undo, read it from the modifiers
+            was_culled = np.fromiter((looks_culled(obj, props) for obj in objects), dtype=bool, count=len(objects))
+        elif previous[0] is objects:
+            was_culled = previous[2]
+        else:
+            # Targets deleted since the last check are skipped, they have no modifier to give back
+            previous_culled = {}
+            for obj, culled in zip(previous[0], previous[2].tolist()):
+                try:
+                    if culled:
+                        previous_culled[obj.session_uid] = obj
+                except ReferenceError:
+                    pass
+            remaining = {obj.session_uid for obj in objects}
+            was_culled = np.fromiter((obj.session_uid in previous_culled for obj in objects), dtype=bool, count=len(objects))
+            # Objects that left the targets get their modifier back
+            dropped = [obj for obj_uid, obj in previous_culled.items() if obj_uid not in remaining]
+            write_subsurf_settings((obj, {"show_viewport": True}) for obj in dropped)
+
+        # After an edit the culled settings are asserted again, otherwise only the flipped ones are written
+        if previous is None or previous[3] != signature:
+            culled = np.flatnonzero(mask)
+        else:
+            culled = np.flatnonzero(mask & ~was_culled)
+        restored = np.flatnonzero(~mask & was_culled)
+
+        assignments = culled_assignments(props, [objects[i] for i in culled.tolist()])
+        if len(restored):
+            assignments += self._restored(scene, props, objects, offsets, restored)
+        write_subsurf_settings(assignments)
+        self._state[uid] = (objects, offsets, mask, signature)
+
+    @staticmethod
+    def _restored(scene, props, objects, offsets, indices):
+        indices = indices.tolist()
+        subset_offsets = None if offsets is None else [offsets[i] for i in indices]
+        return restored_assignments(scene, props, [objects[i] for i in indices], subset_offsets)
+
+    def _restore(self, scene, controller, uid):
+        objects, offsets, mask, signature = self._state.pop(uid)
+        self._corners.pop(uid, None)
+        self._visible.pop(uid, None)
+        try:
+            if controller is None:
+                culled = [obj for obj, was_culled in zip(objects, mask.tolist()) if was_culled]
+                write_subsurf_settings((obj, {"show_viewport": True}) for obj in culled)
+            else:
+                write_subsurf_settings(self._restored(scene, controller.subdivision_control, objects, offsets, np.flatnonzero(mask)))
+        except ReferenceError:
+            pass
+
+    def handle_depsgraph_update(self, depsgraph):
+        if not self._state:
+            return
+        self.edit_generation += 1
+        for update in depsgraph.updates:
+            if update.is_updated_transform or (update.is_updated_geometry and isinstance(update.id, bpy.types.Mesh)):
+                self.transform_generation += 1
+                break
+
+view_culler = ViewCuller()
+
+# Timer that keeps the culled targets in line with the view
+def update_view_culling():
+    if not view_culler.update(bpy.context.scene):
+        return None
+    return CULLING_INTERVAL
+
+def start_view_culling():
+    if not bpy.app.timers.is_registered(update_view_culling):
+        bpy.app.timers.register(update_view_culling, first_interval=0.0)
+
+# Property update callback for the culling settings
+def culling_changed(props, context):
+    start_view_culling()
+
+# Modifier settings the render override changes and restores
+RENDER_STATE_FIELDS = ("render_levels", "show_render")
+
+# Scene ID property holding the settings from before the render override
+RENDER_STATE_KEY = "subd_controller_render_state"
+
+# Render profile pushed onto the targets for the duration of a render
+class RenderSwap:
+    """Swaps the render override of every controller in and out around renders.
+    
+    The first apply resolves the targets once and records their current
+    settings in a scene ID property, so the restore is exact even when it
+    happens in a later session after a crash. The override stays applied
+    until the render job completes or is cancelled, applying again for the
+    next frame of a sequence reuses the cached assignments.
+    """
+    
+    def __init__(self):
+        self.assignments = None
+    
+    def apply(self, scene):
+        if self.assignments is None:
+            ownership = controller_registry.get(scene)
+            assignments = []
+            for uid, controller in ownership.controllers.items():
+                props = controller.subdivision_control
+                if props.use_render_override:
+                    objects, offsets = ownership.get_owned(uid)
+                    assignments.extend(controller_assignments(props, objects, offsets, render_override_settings(props)))
+            if not assignments:
+                return
+            
+            # Keep the first recorded state if an earlier restore never happened
+            if RENDER_STATE_KEY not in scene:
+                state = capture_subsurf_state([obj for obj, settings in assignments], RENDER_STATE_FIELDS)
+                store_subsurf_state(scene, RENDER_STATE_KEY, state)
+            self.assignments = assignments
+        
+        profile = profiler.begin("Render Override")
+        with profile.phase("write"):
+            changed, skipped, missing = write_subsurf_settings(self.assignments)
+        profile.count(visited=len(self.assignments), modified=changed, skipped=skipped + missing)
+        profiler.finish(profile)
+    
+    def restore(self, scene):
+        self.assignments = None
+        if RENDER_STATE_KEY not in scene:
+            return
+        
+        profile = profiler.begin("Render Restore")
+        with profile.phase("write"):
+            changed, missing = restore_subsurf_state(load_subsurf_state(scene, RENDER_STATE_KEY))
+        del scene[RENDER_STATE_KEY]
+        profile.count(modified=changed, skipped=missing)
+        profiler.finish(profile)
+        if missing:
+            logger.warning("Could not restore %d objects after rendering, they were removed or renamed", missing)
+
+render_swap = RenderSwap()
+
+# The modifier settings the render override pushes
+def render_override_settings(props):
+    return {"render_levels": props.render_override_levels, "show_render": True}
+
+# Bump when the cache layout or key changes, older caches are then rebuilt
+MESH_CACHE_VERSION = 2
+
+MESH_CACHE_MANIFEST = "manifest.json"
+
+# ID property naming the cache key a built mesh came from
+MESH_CACHE_KEY_PROP = "subd_cache_key"
+
+# Scene ID property holding the original meshes while the cache is swapped in
+MESH_CACHE_STATE_KEY = "subd_controller_mesh_cache_state"
+
+# Modifier properties that don't change the render result
+MESH_CACHE_SKIP_PROPS = {
+    "rna_type", "name", "levels", "show_viewport", "show_in_editmode", "show_on_cage", "show_expanded",
+    "show_only_control_edges", "is_active", "is_override_data", "persistent_uid", "execution_time", "use_pin_to_last",
+}
+
+# foreach_get property, dtype and width of every attribute type the cache carries
+ATTRIBUTE_LAYOUTS = {
+    'FLOAT': ("value", np.float32, 1),
+    'INT': ("value", np.int32, 1),
+    'INT8': ("value", np.int32, 1),
+    'BOOLEAN': ("value", bool, 1),
+    'FLOAT2': ("vector", np.float32, 2),
+    'INT32_2D': ("value", np.int32, 2),
+    'FLOAT_VECTOR': ("vector", np.float32, 3),
+    'FLOAT_COLOR': ("color", np.float32, 4),
+    'BYTE_COLOR': ("color", np.float32, 4),
+    'QUATERNION': ("value", np.float32, 4),
+}
+
+# Whether the evaluated mesh of an object only depends on its own data and modifier settings
+def is_cacheable(obj):
+    if obj.mode == 'EDIT' or obj.data.shape_keys is not None:
+        return False
+    if not any(mod.type == 'SUBSURF' and mod.show_render for mod in obj.modifiers):
+        return False
+    for mod in obj.modifiers:
+        # Geometry nodes and particles can depend on time and on other objects
+        if mod.type in {'NODES', 'PARTICLE_SYSTEM'}:
+            return False
+        for prop in mod.bl_rna.properties:
+            if prop.type == 'POINTER' and isinstance(getattr(mod, prop.identifier), bpy.types.Object):
+                return False
+    return True
+
+# The settings of a struct as a list, IDs it points to are followed depth levels deep
+def rna_signature(struct, depth, skip=()):
+    values = []
+    for prop in struct.bl_rna.properties:
+        identifier = prop.identifier
+        if identifier in skip or prop.type == 'COLLECTION':
+            continue
+        if getattr(prop, "is_array", False) and prop.array_length == 0:
+            # Dynamic arrays such as image pixels
+            continue
+        value = getattr(struct, identifier)
+        if prop.type == 'POINTER':
+            if isinstance(value, bpy.types.ID):
+                value = id_signature(value, depth - 1)
+            elif value is not None and depth > 0:
+                value = rna_signature(value, depth - 1, {"rna_type"})
+            else:
+                continue
+        elif prop.type == 'ENUM' and prop.is_enum_flag:
+            value = tuple(sorted(value))
+        elif getattr(prop, "is_array", False):
+            value = tuple(value)
+        values.append((identifier, value))
+    return values
+
+# Name and contents of an ID a modifier reads, e.g. a displace texture and its image
+def id_signature(id_block, depth):
+    values = [type(id_block).__name__, id_block.name]
+    if depth >= 0:
+        # The generic ID properties change with users and selection, not with the contents
+        skip = {prop.identifier for prop in bpy.types.ID.bl_rna.properties}
+        values.append(rna_signature(id_block, depth, skip))
+    if isinstance(id_block, bpy.types.Image):
+        path = bpy.path.abspath(id_block.filepath, library=id_block.library)
+        try:
+            values.append(os.path.getmtime(path))
+        except OSError:
+            values.append(None)
+        values.append(id_block.is_dirty)
+    return values
+
+# The render relevant settings of a modifier as a string
+def modifier_signature(mod):
+    return repr([mod.type, rna_signature(mod, 1, MESH_CACHE_SKIP_PROPS)])
+
+# Generic attributes of a mesh, leaving out positions and Blender's internal ones
+def mesh_attributes(mesh):
+    """Return a list of (name, domain, data type, values)"""
+    attributes = []
+    for attribute in mesh.attributes:
+        layout = ATTRIBUTE_LAYOUTS.get(attribute.data_type)
+        if layout is None or attribute.name == "position" or attribute.name.startswith("."):
+            continue
+        prop, dtype, width = layout
+        values = np.empty(len(attribute.data) * width, dtype=dtype)
+        attribute.data.foreach_get(prop, values)
+        attributes.append((attribute.name, attribute.domain, attribute.data_type,
+                           values.reshape(-1, width) if width > 1 else values))
+    return attributes
+
+# Corner normals of a mesh with custom normals, None otherwise
+def custom_corner_normals(mesh):
+    if not mesh.has_custom_normals:
+        return None
+    values = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+    if hasattr(mesh, "corner_normals"):
+        mesh.corner_normals.foreach_get("vector", values)
+    else:
+        mesh.calc_normals_split()
+        mesh.loops.foreach_get("normal", values)
+    return values.reshape(-1, 3)
+
+# Indices of the vertex groups the render enabled modifiers of an object read
+def referenced_vertex_groups(obj):
+    names = set()
+    for mod in obj.modifiers:
+        if not mod.show_render:
+            continue
+        for prop in mod.bl_rna.properties:
+            if prop.type == 'STRING' and "vertex_group" in prop.identifier:
+                names.add(getattr(mod, prop.identifier))
+    return tuple(sorted(group.index for group in obj.vertex_groups if group.name in names))
+
+# Weights of some vertex groups as a (vertices, groups) array, 0 where a vertex isn't in a group
+def vertex_group_weights(mesh, groups):
+    # There is no foreach access to deform weights, gather the elements in one
+    # pass and leave the filtering and placement to numpy
+    elements = np.array([(vertex.index, element.group, element.weight)
+                         for vertex in mesh.vertices for element in vertex.groups], dtype=np.float64).reshape(-1, 3)
+    columns = np.full(max(groups) + 1, -1, dtype=np.int64)
+    columns[list(groups)] = np.arange(len(groups))
+    group_indices = elements[:, 1].astype(np.int64)
+    inside = group_indices < len(columns)
+    elements = elements[inside]
+    element_columns = columns[group_indices[inside]]
+    used = element_columns >= 0
+    weights = np.zeros((len(mesh.vertices), len(groups)), dtype=np.float32)
+    weights[elements[used, 0].astype(np.int64), element_columns[used]] = elements[used, 2]
+    return weights
+
+# Hash of the base mesh data the modifiers start from
+def mesh_digest(mesh, groups):
+    digest = hashlib.blake2b(digest_size=16)
+    
+    def update(values):
+        digest.update(np.int64(values.size).tobytes())
+        digest.update(np.ascontiguousarray(values).tobytes())
+    
+    for collection, attribute, dtype, size in (
+        (mesh.vertices, "co", np.float32, 3),
+        (mesh.edges, "vertices", np.int32, 2),
+        (mesh.loops, "vertex_index", np.int32, 1),
+        (mesh.polygons, "loop_total", np.int32, 1),
+    ):
+        values = np.empty(len(collection) * size, dtype=dtype)
+        collection.foreach_get(attribute, values)
+        update(values)
+    
+    # UV maps, colors, creases, sharp edges and faces, material indices
+    for name, domain, data_type, values in mesh_attributes(mesh):
+        digest.update(f"{name}:{domain}:{data_type}".encode())
+        update(values)
+    normals = custom_corner_normals(mesh)
+    if normals is not None:
+        update(normals)
+    
+    # Only the weights of groups a modifier reads, most rigged meshes have none
+    if groups:
+        update(vertex_group_weights(mesh, groups))
+    
+    digest.update(repr([material.name if material else None for material in mesh.materials]).encode())
+    return digest.hexdigest()
+
+# Cache key of every object, from its mesh and the modifiers that render
+def mesh_cache_keys(objects, digests=None):
+    """Return [(object, key)], digests are kept per mesh so shared meshes are hashed once"""
+    if digests is None:
+        digests = {}
+    keys = []
+    for obj in objects:
+        mesh = obj.data
+        groups = referenced_vertex_groups(obj)
+        digest = digests.get((mesh.session_uid, groups))
+        if digest is None:
+            digest = digests[mesh.session_uid, groups] = mesh_digest(mesh, groups)
+        key = hashlib.blake2b(digest_size=16)
+        key.update(f"{MESH_CACHE_VERSION}:{digest}".encode())
+        key.update(repr([obj.vertex_groups[index].name for index in groups]).encode())
+        for mod in obj.modifiers:
+            if mod.show_render:
+                key.update(modifier_signature(mod).encode())
+        keys.append((obj, key.hexdigest()))
+    return keys
+
+# Read the manifest of a cache directory, an empty one when there is none yet
+def read_mesh_cache_manifest(directory):
+    path = os.path.join(directory, MESH_CACHE_MANIFEST)
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        manifest = None
+    if manifest is None or manifest.get("version") != MESH_CACHE_VERSION:
+        return {"version": MESH_CACHE_VERSION, "meshes": {}, "objects": {}}
+    return manifest
+
+def write_mesh_cache_manifest(directory, manifest):
+    path = os.path.join(directory, MESH_CACHE_MANIFEST)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+def mesh_cache_path(directory, key, name):
+    return os.path.join(directory, f"{key}.{name}.npy")
+
+# Whether a key has a complete entry in the cache
+def mesh_cache_valid(directory, manifest, key):
+    entry = manifest["meshes"].get(key)
+    return entry is not None and all(os.path.exists(mesh_cache_path(directory, key, name)) for name in entry["arrays"])
+
+# Everything needed to rebuild an object's evaluated mesh
+def evaluated_mesh_arrays(obj, depsgraph):
+    """Return (arrays, info) for write_mesh_cache.
+    
+    Geometry is stored as vertices, edges, corner vertices and edges and
+    face sizes, every generic attribute (UV maps, colors, material indices,
+    sharp edges and faces, creases) as attribute<n> and custom normals as
+    custom_normals. normals holds the vertex normals for readers outside
+    Blender, which derives them again from the rest on reload.
+    """
+    evaluated = obj.evaluated_get(depsgraph)
+    mesh = evaluated.to_mesh()
+    try:
+        arrays = {}
+        for name, collection, attribute, dtype, size in (
+            ("vertices", mesh.vertices, "co", np.float32, 3),
+            ("normals", mesh.vertices, "normal", np.float32, 3),
+            ("edges", mesh.edges, "vertices", np.int32, 2),
+            ("corners", mesh.loops, "vertex_index", np.int32, 1),
+            ("corner_edges", mesh.loops, "edge_index", np.int32, 1),
+            ("face_sizes", mesh.polygons, "loop_total", np.int32, 1),
+        ):
+            values = np.empty(len(collection) * size, dtype=dtype)
+            collection.foreach_get(attribute, values)
+            arrays[name] = values.reshape(-1, size) if size > 1 else values
+        
+        attributes = []
+        for index, (name, domain, data_type, values) in enumerate(mesh_attributes(mesh)):
+            arrays[f"attribute{index}"] = values
+            attributes.append([name, domain, data_type])
+        normals = custom_corner_normals(mesh)
+        if normals is not None:
+            arrays["custom_normals"] = normals
+        
+        uv_layer = mesh.uv_layers.active
+        render_uv = next((layer.name for layer in mesh.uv_layers if layer.active_render), None)
+        colors = getattr(mesh, "color_attributes", None)
+        info = {
+            "attributes": attributes,
+            "uv_active": uv_layer.name if uv_layer is not None else None,
+            "uv_render": render_uv,
+            "color_active": colors.active_color_name if colors is not None else None,
+            "color_render": colors.default_color_name if colors is not None else None,
+        }
+    finally:
+        evaluated.to_mesh_clear()
+    return arrays, info
+
+# Write the arrays of one key as separate .npy files, which can be memory mapped
+def write_mesh_cache(directory, key, arrays, info):
+    """Return the manifest entry"""
+    for name, values in arrays.items():
+        np.save(mesh_cache_path(directory, key, name), values)
+    return dict(info, arrays=list(arrays), vertices=len(arrays["vertices"]), faces=len(arrays["face_sizes"]))
+
+# Memory map the arrays of one key
+def read_mesh_cache(directory, key, entry):
+    return {name: np.load(mesh_cache_path(directory, key, name), mmap_mode='r') for name in entry["arrays"]}
+
+def remove_mesh_cache(directory, key, entry):
+    for name in entry["arrays"]:
+        try:
+            os.remove(mesh_cache_path(directory, key, name))
+        except FileNotFoundError:
+            pass
+
+# Meshes built from the cache by key, found through their ID property since the name can be taken
+def cached_meshes():
+    return {mesh[MESH_CACHE_KEY_PROP]: mesh for mesh in bpy.data.meshes if MESH_CACHE_KEY_PROP in mesh}
+
+# A mesh datablock with the cached result of a key, reused while it exists
+def build_cached_mesh(key, entry, arrays, materials, built):
+    """Rebuild geometry, generic attributes, custom normals and the active UV
+    and color choices. Vertex group weights are baked into the modifier result
+    but not carried over, so shaders reading them as attributes see none.
+    built maps keys to the meshes from cached_meshes and gets the new one."""
+    mesh = built.get(key)
+    if mesh is not None:
+        return mesh
+    name = f"SubdCache.{key[:12]}"
+    
+    def flat(values):
+        return np.ascontiguousarray(values).ravel()
+    
+    sizes = np.ascontiguousarray(arrays["face_sizes"])
+    starts = np.zeros(len(sizes), dtype=np.int32)
+    np.cumsum(sizes[:-1], out=starts[1:])
+    
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(arrays["vertices"]))
+    mesh.vertices.foreach_set("co", flat(arrays["vertices"]))
+    mesh.edges.add(len(arrays["edges"]))
+    mesh.edges.foreach_set("vertices", flat(arrays["edges"]))
+    mesh.loops.add(len(arrays["corners"]))
+    mesh.loops.foreach_set("vertex_index", flat(arrays["corners"]))
+    mesh.loops.foreach_set("edge_index", flat(arrays["corner_edges"]))
+    mesh.polygons.add(len(sizes))
+    mesh.polygons.foreach_set("loop_start", starts)
+    
+    for index, (attribute_name, domain, data_type) in enumerate(entry["attributes"]):
+        attribute = mesh.attributes.get(attribute_name)
+        if attribute is not None and (attribute.domain != domain or attribute.data_type != data_type):
+            mesh.attributes.remove(attribute)
+            attribute = None
+        if attribute is None:
+            attribute = mesh.attributes.new(attribute_name, data_type, domain)
+        attribute.data.foreach_set(ATTRIBUTE_LAYOUTS[data_type][0], flat(arrays[f"attribute{index}"]))
+    
+    for material in materials:
+        mesh.materials.append(material)
+    mesh.update()
+    
+    if "custom_normals" in arrays:
+        if hasattr(mesh, "use_auto_smooth"):
+            mesh.use_auto_smooth = True
+        mesh.normals_split_custom_set(np.array(arrays["custom_normals"]))
+    
+    uv_layers = mesh.uv_layers
+    if entry["uv_active"] in uv_layers:
+        uv_layers.active = uv_layers[entry["uv_active"]]
+    if entry["uv_render"] in uv_layers:
+        uv_layers[entry["uv_render"]].active_render = True
+    colors = getattr(mesh, "color_attributes", None)
+    if colors is not None:
+        if entry["color_active"] in colors:
+            colors.active_color_name = entry["color_active"]
+        if entry["color_render"] in colors:
+            colors.default_color_name = entry["color_render"]
+    
+    mesh[MESH_CACHE_KEY_PROP] = key
+    built[key] = mesh
+    return mesh
+
+# Compare the targets against a cache directory
+def check_mesh_cache(objects, directory):
+    """Return (current, stale, missing, uncacheable) object counts"""
+    manifest = read_mesh_cache_manifest(directory)
+    cacheable = [obj for obj in objects if is_cacheable(obj)]
+    current = stale = 0
+    for obj, key in mesh_cache_keys(cacheable):
+        if mesh_cache_valid(directory, manifest, key):
+            current += 1
+        elif obj.name in manifest["objects"]:
+            stale += 1
+    return current, stale, len(cacheable) - current - stale, len(objects) - len(cacheable)
+
+# Last cache check per controller
+mesh_cache_status = {}
+
+# Swap exported meshes in for rendering
+class MeshCacheSwap:
+    """Renders targets from the mesh cache instead of subdividing them.
+    
+    Objects whose cache key still matches get the cached mesh, with their
+    modifiers turned off for rendering. The original meshes and modifiers
+    are recorded in a scene ID property, so the restore also works after a
+    crash, and the originals keep a fake user while they are swapped out so
+    a save in between doesn't drop them. The swap lasts for the whole render
+    job, applying again for the next frame of a sequence only turns the
+    modifiers off again, in case the render override turned them back on.
+    """
+    
+    def __init__(self):
+        self.objects = None
+    
+    def apply(self, scene):
+        if self.objects is not None:
+            for obj in self.objects:
+                for mod in obj.modifiers:
+                    if mod.show_render:
+                        mod.show_render = False
+            return
+        self.objects = []
+        if MESH_CACHE_STATE_KEY in scene:
+            return
+        
+        ownership = controller_registry.get(scene)
+        profile = profiler.begin("Mesh Cache Swap")
+        record = {}
+        visited = 0
+        digests = {}
+        built = None
+        for uid, controller in ownership.controllers.items():
+            props = controller.subdivision_control
+            if not props.use_mesh_cache:
+                continue
+            directory = bpy.path.abspath(props.mesh_cache_dir)
+            try:
+                manifest = read_mesh_cache_manifest(directory)
+            except (OSError, ValueError) as error:
+                logger.warning("Could not read the mesh cache of '%s': %s", controller.name, error)
+                continue
+            objects, offsets = ownership.get_owned(uid)
+            with profile.phase("hash"):
+                keys = mesh_cache_keys([obj for obj in objects if is_cacheable(obj)], digests)
+            visited += len(keys)
+            for obj, key in keys:
+                if not mesh_cache_valid(directory, manifest, key):
+                    continue
+                entry = manifest["meshes"][key]
+                if built is None:
+                    built = cached_meshes()
+                try:
+                    with profile.phase("load"):
+                        mesh = build_cached_mesh(key, entry, read_mesh_cache(directory, key, entry), obj.data.materials, built)
+                except (OSError, ValueError) as error:
+                    logger.warning("Could not load the cached mesh of '%s': %s", obj.name, error)
+                    continue
+                disabled = [mod.name for mod in obj.modifiers if mod.show_render]
+                original = obj.data
+                record[obj.name] = {"mesh": original.name, "modifiers": "\n".join(disabled),
+                                    "fake_user": not original.use_fake_user}
+                original.use_fake_user = True
+                obj.data = mesh
+                for mod in obj.modifiers:
+                    mod.show_render = False
+                self.objects.append(obj)
+        
+        if record:
+            scene[MESH_CACHE_STATE_KEY] = record
+        profile.count(visited=visited, modified=len(record), skipped=visited - len(record))
+        profiler.finish(profile)
+    
+    def restore(self, scene):
+        self.objects = None
+        record = scene.get(MESH_CACHE_STATE_KEY)
+        if record is None:
+            return
+        
+        missing = 0
+        for name, entry in record.items():
+            obj = bpy.data.objects.get(name)
+            mesh = bpy.data.meshes.get(entry["mesh"])
+            if obj is None or mesh is None:
+                missing += 1
+                continue
+            obj.data = mesh
+            if entry.get("fake_user"):
+                mesh.use_fake_user = False
+            for mod_name in filter(None, entry["modifiers"].split("\n")):
+                mod = obj.modifiers.get(mod_name)
+                if mod is not None:
+                    mod.show_render = True
+        del scene[MESH_CACHE_STATE_KEY]
+        if missing:
+            logger.warning("Could not restore the meshes of %d objects after rendering, they were removed or renamed", missing)
+
+mesh_cache_swap = MeshCacheSwap()
+
+# Modifier settings kept in a snapshot, presence is kept through the modifier names
+SNAPSHOT_FIELDS = ("levels", "render_levels", "show_only_control_edges", "quality", "show_viewport", "show_render")
+
+# Name of the snapshot taken automatically before modifiers are deleted
+DELETE_SNAPSHOT_NAME = "Before Delete"
+
+# Add a captured state to a controller's snapshots, replacing one with the same name
+def add_snapshot(props, name, state):
+    index = props.snapshots.find(name)
+    if index >= 0:
+        props.snapshots.remove(index)
+    item = props.snapshots.add()
+    item.name = name
+    item.object_count = len(state["objects"])
+    item.created = time.strftime("%Y-%m-%d %H:%M")
+    store_subsurf_state(item, "state", state)
+    props.active_snapshot_index = len(props.snapshots) - 1
+    return item
+
+# A captured modifier state of a controller's targets, the arrays live in its "state" ID property
+class SubdivisionSnapshotItem(bpy.types.PropertyGroup):
+    object_count: IntProperty(
+        name="Objects",
+        default=0
+    )
+    created: StringProperty(
+        name="Created",
+        default=""
+    )
+
+# Modifier settings a quality profile bundles
+PROFILE_FIELDS = (
+    "levels",
+    "render_levels",
+    "quality",
+    "uv_smooth",
+    "boundary_smooth",
+    "use_limit_surface",
+    "use_creases",
+    "show_only_control_edges",
+)
+
+# Profiles new controllers start with
+DEFAULT_PROFILES = (
+    ("Draft", {"levels": 0, "render_levels": 1, "quality": 1, "uv_smooth": 'PRESERVE_BOUNDARIES',
+               "boundary_smooth": 'ALL', "use_limit_surface": False, "use_creases": True, "show_only_control_edges": True}),
+    ("Preview", {"levels": 1, "render_levels": 2, "quality": 3, "uv_smooth": 'PRESERVE_BOUNDARIES',
+                 "boundary_smooth": 'ALL', "use_limit_surface": True, "use_creases": True, "show_only_control_edges": True}),
+    ("Final", {"levels": 2, "render_levels": 3, "quality": 4, "uv_smooth": 'PRESERVE_CORNERS',
+               "boundary_smooth": 'ALL', "use_limit_surface": True, "use_creases": True, "show_only_control_edges": False}),
+)
+
+# The modifier settings of a profile
+def profile_settings(profile):
+    return {field: getattr(profile, field) for field in PROFILE_FIELDS}
+
+# Add a profile to a controller, starting from the controller settings when no values are given
+def add_profile(props, name, settings=None):
+    item = props.profiles.add()
+    item.name = name
+    if settings is None:
+        settings = controller_subsurf_settings(props)
+    for field, value in settings.items():
+        setattr(item, field, value)
+    return item
+
+# A named bundle of modifier settings, applied to all targets at once
+class SubdivisionProfileItem(bpy.types.PropertyGroup):
+    levels: IntProperty(
+        name="Viewport",
+        description="Subdivision level for viewport display",
+        min=0,
+        max=6,
+        default=1
+    )
+    render_levels: IntProperty(
+        name="Render",
+        description="Subdivision level for rendering",
+        min=0,
+        max=6,
+        default=2
+    )
+    quality: IntProperty(
+        name="Quality",
+        description="Accuracy of vertex positions, lower is faster",
+        min=1,
+        max=10,
+        default=3
+    )
+    uv_smooth: EnumProperty(
+        name="UV Smooth",
+        description="Controls how smoothing is applied to UVs",
+        items=(
+            ('NONE', "None", "UVs are not smoothed, boundaries are kept sharp"),
+            ('PRESERVE_CORNERS', "Keep Corners", "UVs are smoothed, corners on discontinuous boundary are kept sharp"),
+            ('PRESERVE_CORNERS_AND_JUNCTIONS', "Keep Corners, Junctions", "UVs are smoothed, corners and junctions are kept sharp"),
+            ('PRESERVE_CORNERS_JUNCTIONS_AND_CONCAVE', "Keep Corners, Junctions, Concave", "UVs are smoothed, corners, junctions and concave corners are kept sharp"),
+            ('PRESERVE_BOUNDARIES', "Keep Boundaries", "UVs are smoothed, boundaries are kept sharp"),
+            ('SMOOTH_ALL', "All", "UVs and boundaries are smoothed"),
+        ),
+        default='PRESERVE_BOUNDARIES'
+    )
+    boundary_smooth: EnumProperty(
+        name="Boundary Smooth",
+        description="Controls how open boundaries are smoothed",
+        items=(
+            ('PRESERVE_CORNERS', "Keep Corners", "Smooth boundaries, but corners are kept sharp"),
+            ('ALL', "All", "Smooth boundaries, including corners"),
+        ),
+        default='ALL'
+    )
+    use_limit_surface: BoolProperty(
+        name="Use Limit Surface",
+        description="Place vertices at the surface that would be produced with infinite subdivision",
+        default=True
+    )
+    use_creases: BoolProperty(
+        name="Use Creases",
+        description="Use mesh crease information to sharpen edges or corners",
+        default=True
+    )
+    show_only_control_edges: BoolProperty(
+        name="Optimize Display",
+        description="Display only control edges in the viewport",
+        default=False
+    )
+
+# One entry of a controller's target list
+class SubdivisionTargetItem(bpy.types.PropertyGroup):
+    target_type: EnumProperty(
+        name="Type",
+        description="Whether this entry points at a collection or an object",
+        items=(
+            ('COLLECTION', "Collection", "All meshes in the collection and its child collections", 'OUTLINER_COLLECTION', 0),
+            ('OBJECT', "Object", "The object and all of its child meshes", 'OBJECT_DATA', 1),
+            ('PATTERN', "Pattern", "Meshes whose names match a pattern, optionally inside matching collections", 'SORTALPHA', 2),
+            ('RULE', "Rule", "Meshes with more faces than a limit, a material or a custom property", 'FILTER', 3),
+        ),
+        default='COLLECTION'
+    )
+    pattern: StringProperty(
+        name="Pattern",
+        description="Object name pattern, e.g. *_hi, prefix collection names with / to search inside them, e.g. Props/Chair* (wildcards only)",
+        default=""
+    )
+    pattern_syntax: EnumProperty(
+        name="Syntax",
+        items=(
+            ('GLOB', "Glob", "Shell style wildcards, * and ? and [abc]"),
+            ('REGEX', "Regex", "Python regular expressions, matching anywhere in the name"),
+        ),
+        default='GLOB'
+    )
+    rule_type: EnumProperty(
+        name="Rule",
+        items=(
+            ('FACES', "Faces", "Meshes with more base faces than the limit"),
+            ('MATERIAL', "Material", "Meshes using the material"),
+            ('PROPERTY', "Property", "Objects with the custom property, optionally with the given value"),
+        ),
+        default='FACES'
+    )
+    rule_faces: IntProperty(
+        name="More Than",
+        description="Face count a mesh has to exceed",
+        min=0,
+        default=1000
+    )
+    rule_material: PointerProperty(
+        name="Material",
+        type=bpy.types.Material
+    )
+    rule_property: StringProperty(
+        name="Property",
+        description="Name of the custom object property",
+        default=""
+    )
+    rule_value: StringProperty(
+        name="Value",
+        description="Only objects whose property has this value, leave empty for any value",
+        default=""
+    )
+    collection: PointerProperty(
+        name="Collection",
+        type=bpy.types.Collection
+    )
+    object: PointerProperty(
+        name="Object",
+        type=bpy.types.Object
+    )
+    mode: EnumProperty(
+        name="Mode",
+        description="Add this entry's objects to the targets or remove them",
+        items=(
+            ('INCLUDE', "Include", "Control the objects of this entry", 'ADD', 0),
+            ('EXCLUDE', "Exclude", "Leave the objects of this entry alone", 'REMOVE', 1),
+        ),
+        default='INCLUDE'
+    )
+    level_offset: IntProperty(
+        name="Offset",
+        description="Added to the controller levels for the objects of this entry",
+        min=-6,
+        max=6,
+        default=0
+    )
+    
+    @property
+    def target(self):
+        """The collection or object of ID entries, None for patterns and rules"""
+        if self.target_type == 'COLLECTION':
+            return self.collection
+        if self.target_type == 'OBJECT':
+            return self.object
+        return None
+    
+    @property
+    def label(self):
+        if self.target_type == 'PATTERN':
+            return self.pattern
+        if self.target_type == 'RULE':
+            if self.rule_type == 'FACES':
+                return f"faces > {self.rule_faces}"
+            if self.rule_type == 'MATERIAL':
+                return f"material {self.rule_material.name if self.rule_material else ''}"
+            return f"{self.rule_property} = {self.rule_value}" if self.rule_value else self.rule_property
+        target = self.target
+        return target.name if target is not None else ""
+
+# Property group for subdivision control properties
+class SubdivisionControlProperties(bpy.types.PropertyGroup):
+    subdivision_levels: IntProperty(
+        name="Viewport",
+        description="Subdivision level for viewport display",
+        min=0,
+        max=6,
+        default=1,
+        update=schedule_live_update
+    )
+    subdivision_render_levels: IntProperty(
+        name="Render",
+        description="Subdivision level for rendering",
+        min=0,
+        max=6,
+        default=2,
+        update=schedule_live_update
+    )
+    subdivision_object: StringProperty(
+        name="",
+        description="Legacy comma separated targets, moved into the target list when the file is loaded",
+        default=""
+    )
+    targets: CollectionProperty(
+        name="Targets",
+        type=SubdivisionTargetItem
+    )
+    active_target_index: IntProperty(
+        name="Active Target",
+        default=0
+    )
+    profiles: CollectionProperty(
+        name="Profiles",
+        type=SubdivisionProfileItem
+    )
+    active_profile_index: IntProperty(
+        name="Active Profile",
+        default=0
+    )
+    current_profile: StringProperty(
+        name="Current Profile",
+        description="The profile applied last",
+        default=""
+    )
+    snapshots: CollectionProperty(
+        name="Snapshots",
+        type=SubdivisionSnapshotItem
+    )
+    active_snapshot_index: IntProperty(
+        name="Active Snapshot",
+        default=0
+    )
+    priority: IntProperty(
+        name="Priority",
+        description="Controllers with a higher priority win objects that several controllers target",
+        default=0
+    )
+    cap_dense_meshes: BoolProperty(
+        name="Keep Dense Meshes Unsubdivided",
+        description="Write viewport level 0 to targets with more base faces than the dense mesh limit of the preferences",
+        default=False
+    )
+    show_only_control_edges: bpy.props.BoolProperty(
+        name="Optimize Display",
+        description="Display only control edges in the viewport",
+        default=False,
+        update=schedule_live_update
+    )
+    live_link: BoolProperty(
+        name="Live Link",
+        description="Push level changes to the targets automatically, without pressing Update",
+        default=False,
+        update=schedule_live_update
+    )
+    use_lod: BoolProperty(
+        name="Screen Size LOD",
+        description="Pick each object's level from its size on screen as seen from the scene camera",
+        default=False
+    )
+    lod_min_level: IntProperty(
+        name="Min Level",
+        description="Render level for objects at or below the minimum pixel size",
+        min=0,
+        max=6,
+        default=0
+    )
+    lod_max_level: IntProperty(
+        name="Max Level",
+        description="Render level for objects at or above the maximum pixel size",
+        min=0,
+        max=6,
+        default=3
+    )
+    lod_min_pixels: FloatProperty(
+        name="Min Pixels",
+        description="On-screen size in pixels that gets the minimum level",
+        min=1.0,
+        default=32.0
+    )
+    lod_max_pixels: FloatProperty(
+        name="Max Pixels",
+        description="On-screen size in pixels that gets the maximum level",
+        min=1.0,
+        default=1024.0
+    )
+    budget_type: EnumProperty(
+        name="Budget",
+        description="What the budget limits",
+        items=(
+            ('FACES', "Faces", "Limit the total evaluated face count"),
+            ('MEMORY', "Memory", "Limit the estimated evaluated mesh memory"),
+        ),
+        default='FACES'
+    )
+    budget_faces: IntProperty(
+        name="Max Faces",
+        description="Total evaluated faces allowed for all targets",
+        min=0,
+        default=20000000
+    )
+    budget_memory: FloatProperty(
+        name="Max Memory (GB)",
+        description="Estimated evaluated mesh memory allowed for all targets",
+        min=0.0,
+        default=8.0
+    )
+    budget_levels: EnumProperty(
+        name="Fit",
+        description="Which levels the solver lowers",
+        items=(
+            ('RENDER', "Render", "Fit the render levels"),
+            ('VIEWPORT', "Viewport", "Fit the viewport levels"),
+        ),
+        default='RENDER'
+    )
+    lod_per_frame: BoolProperty(
+        name="Update Every Frame",
+        description="Re-evaluate the levels on every frame change, for animated cameras",
+        default=False
+    )
+    use_render_override: BoolProperty(
+        name="Render Override",
+        description="Push the override render level onto the targets while rendering and restore the previous settings afterwards",
+        default=False
+    )
+    render_override_levels: IntProperty(
+        name="Render Level",
+        description="Render level the targets get for the duration of a render",
+        min=0,
+        max=6,
+        default=3
+    )
+    use_mesh_cache: BoolProperty(
+        name="Render From Cache",
+        description="Render targets from their exported evaluated mesh when its cache key still matches, instead of subdividing them",
+        default=False
+    )
+    mesh_cache_dir: StringProperty(
+        name="Cache Directory",
+        description="Directory the evaluated meshes of the targets are exported to",
+        subtype='DIR_PATH',
+        default="//subd_cache/"
+    )
+    use_culling: BoolProperty(
+        name="Viewport Culling",
+        description="Drop viewport subdivision of targets that can't be seen, and restore it when they come back into view",
+        default=False,
+        update=culling_changed
+    )
+    culling_source: EnumProperty(
+        name="Frustum",
+        description="Whose view decides what is visible",
+        items=(
+            ('VIEW', "3D View", "The largest 3D view of the first window"),
+            ('CAMERA', "Camera", "The scene camera"),
+        ),
+        default='VIEW',
+        update=culling_changed
+    )
+    culling_action: EnumProperty(
+        name="Culled",
+        description="What happens to the modifiers of culled targets",
+        items=(
+            ('DISABLE', "Disable", "Turn the modifier off in the viewport"),
+            ('LEVEL_ZERO', "Level 0", "Set the viewport level to 0"),
+        ),
+        default='DISABLE',
+        update=culling_changed
+    )
+    culling_margin: FloatProperty(
+        name="Margin",
+        description="Grow the frustum sideways by this fraction so objects are restored before they enter the view",
+        min=0.0,
+        max=2.0,
+        default=0.1,
+        subtype='FACTOR',
+        update=culling_changed
+    )
+    culling_hidden: BoolProperty(
+        name="Cull Hidden",
+        description="Also cull targets that are hidden or excluded from the view layer",
+        default=True,
+        update=culling_changed
+    )
+    culling_occluders: PointerProperty(
+        name="Occluders",
+        description="Meshes whose bounding boxes are solid, targets fully behind one of them are culled",
+        type=bpy.types.Collection,
+        update=culling_changed
+    )
+
+# Operator to create a subdivision controller
+class OBJECT_OT_create_subdivision_controller(bpy.types.Operator):
+    """Create a subdivision controller object for selected objects"""
+    bl_idname = "object.create_subdivision_controller"
+    bl_label = "Create Subdivision Controller"
+    bl_description = "Create a controller object to manage subdivision levels"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    def execute(self, context):
+        # Create a new empty object
+        control_obj = bpy.data.objects.new("SubdController", None)
+        
+        # Set the display type to PLAIN_AXES
+        control_obj.empty_display_type = 'PLAIN_AXES'
+        control_obj.empty_display_size = 1.0
+        
+        # Link to scene collection
+        bpy.context.scene.collection.objects.link(control_obj)
+        
+        # Make the object active
+        context.view_layer.objects.active = control_obj
+        control_obj.select_set(True)
+        
+        # Set initial property values
+        control_obj.subdivision_control.subdivision_levels = 1
+        control_obj.subdivision_control.subdivision_render_levels = 2
+        control_obj.subdivision_control.subdivision_object = ''
+        for name, settings in DEFAULT_PROFILES:
+            add_profile(control_obj.subdivision_control, name, settings)
+        
+        self.report({'INFO'}, f"Created subdivision controller")
+        return {'FINISHED'}
+
+# Shared execution for the operators that work through target objects
+class TargetBatchOperator:
+    """Runs an operator's items in one go, or in time-boxed chunks from a modal timer.
+    
+    Subclasses implement prepare() returning the items to process (None to
+    cancel), process_items() for a slice of them and report_result(). Items
+    are never split between chunks, so cancelling with Esc leaves a
+    consistent partial state that is undone as a single step.
+    """
+    
+    def execute(self, context):
+        items = self._prepare(context)
+        if items is None:
+            return {'CANCELLED'}
+        self._process(items)
+        self._complete(context, len(items), len(items))
+        return {'FINISHED'}
+    
+    def invoke(self, context, event):
+        prefs = get_addon_preferences()
+        if prefs is None or not prefs.use_chunked_processing:
+            return self.execute(context)
+        
+        items = self._prepare(context)
+        if items is None:
+            return {'CANCELLED'}
+        if len(items) <= CHUNK_STEP:
+            self._process(items)
+            self._complete(context, len(items), len(items))
+            return {'FINISHED'}
+        
+        self._items = items
+        self._done = 0
+        self._chunk_time = prefs.chunk_time_ms / 1000
+        
+        wm = context.window_manager
+        wm.progress_begin(0, len(items))
+        self._timer = wm.event_timer_add(0.001, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+    
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            return self._finish(context)
+        
+        # Let the user keep navigating the viewport, any timer tick processes a chunk
+        if event.type != 'TIMER':
+            if event.type in {'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE', 'TRACKPADPAN', 'TRACKPADZOOM'}:
+                return {'PASS_THROUGH'}
+            return {'RUNNING_MODAL'}
+        
+        total = len(self._items)
+        deadline = time.perf_counter() + self._chunk_time
+        while self._done < total and time.perf_counter() < deadline:
+            end = min(self._done + CHUNK_STEP, total)
+            self._process(self._items[self._done:end])
+            self._done = end
+        
+        context.window_manager.progress_update(self._done)
+        context.workspace.status_text_set(f"{self.bl_label}: {self._done}/{total} (Esc to cancel)")
+        
+        if self._done >= total:
+            return self._finish(context)
+        return {'RUNNING_MODAL'}
+    
+    def _finish(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+        
+        # Finished even when cancelled, so the processed part becomes one undo step
+        self._complete(context, self._done, len(self._items))
+        self._items = None
+        return {'FINISHED'}
+    
+    def _prepare(self, context):
+        self.profile = profiler.begin(self.bl_label, context.object)
+        with self.profile.phase("resolve"):
+            return self.prepare(context)
+    
+    def _process(self, items):
+        with self.profile.phase("write"):
+            self.process_items(items)
+    
+    def _complete(self, context, done, total):
+        self.profile.count(processed=done)
+        profiler.finish(self.profile, context)
+        self.report_result(done, total)
+    
+    def get_targets(self, context):
+        props = context.object.subdivision_control
+        if not props.targets:
+            self.report({'ERROR'}, "No target collections or objects specified")
+            return None
+        
+        objects, self.offsets = get_controller_objects(props)
+        visited = target_index.count_controller_visits(props)
+        locked = target_index.get_controller_locked(props)
+        self.profile.count(visited=visited, deduplicated=visited - len(objects), locked=len(locked))
+        if locked:
+            self.report({'WARNING'}, f"{len(locked)} linked objects can't be changed: {describe_locked(locked)}")
+        return objects
+    
+    def report_cancelled(self, done, total):
+        if done < total:
+            self.report({'WARNING'}, f"Cancelled after {done} of {total} items")
+            return True
+        return False
+
+# Operator to update subdivision levels
+class OBJECT_OT_update_subdivision_levels(TargetBatchOperator, bpy.types.Operator):
+    """Update subdivision levels for all objects"""
+    bl_idname = "object.update_subdivision_levels"
+    bl_label = "Update Subdivision Levels"
+    bl_description = "Update subdivision levels for all objects in the specified collections or objects"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    def prepare(self, context):
+        props = context.object.subdivision_control
+        
+        # Find objects through the shared target index
+        objects_to_update = self.get_targets(context)
+        if objects_to_update is None:
+            return None
+        
+        self.changed = self.skipped = 0
+        
+        # Levels are worked out up front, the chunks only write them
+        if props.use_lod:
+            assignments = lod_assignments(context.scene, props, objects_to_update, self.offsets)
+            if assignments is None:
+                self.report({'ERROR'}, "Screen size LOD needs a scene camera")
+            return assignments
+        
+        return controller_assignments(props, objects_to_update, self.offsets)
+    
+    def process_items(self, assignments):
+        # Only write to modifiers whose values differ
+        changed, skipped, missing = write_subsurf_settings(assignments)
+        self.changed += changed
+        self.skipped += skipped
+        self.profile.count(modified=changed, skipped=skipped + missing)
+    
+    def report_result(self, done, total):
+        if self.report_cancelled(done, total):
+            return
+        if self.changed + self.skipped == 0:
+            self.report({'WARNING'}, f"No objects with subdivision modifiers found in specified targets")
+        else:
+            self.report({'INFO'}, f"Updated subdivision levels for {self.changed} objects ({self.skipped} already up to date)")
+
+# Operator to update every controller of the scene in one pass
+class OBJECT_OT_update_all_subdivision_controllers(TargetBatchOperator, bpy.types.Operator):
+    """Update subdivision levels for the objects of every controller in the scene"""
+    bl_idname = "object.update_all_subdivision_controllers"
+    bl_label = "Update All Controllers"
+    bl_description = "Update every controller's objects, objects targeted by several controllers get the settings of their owner"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def prepare(self, context):
+        ownership = controller_registry.get(context.scene)
+        self.changed = self.skipped = 0
+
+        # Every object has one owner, so the owned sets never overlap
+        assignments = []
+        without_camera = []
+        for uid, controller in ownership.controllers.items():
+            props = controller.subdivision_control
+            objects, offsets = ownership.get_owned(uid)
+            if not objects:
+                continue
+            if props.use_lod:
+                lod = lod_assignments(context.scene, props, objects, offsets)
+                if lod is None:
+                    without_camera.append(controller.name)
+                    continue
+                assignments.extend(lod)
+            else:
+                assignments.extend(controller_assignments(props, objects, offsets))
+
+        if without_camera:
+            self.report({'WARNING'}, f"Screen size LOD needs a scene camera, skipped: {', '.join(without_camera)}")
+        self.controller_count = len(ownership.controllers)
+        self.profile.count(visited=len(assignments))
+        return assignments
+
+    def process_items(self, assignments):
+        changed, skipped, missing = write_subsurf_settings(assignments)
+        self.changed += changed
+        self.skipped += skipped
+        self.profile.count(modified=changed, skipped=skipped + missing)
+
+    def report_result(self, done, total):
+        if self.report_cancelled(done, total):
+            return
+        self.report({'INFO'}, f"Updated {self.changed} objects from {self.controller_count} controllers ({self.skipped} already up to date)")
+
+# Operator to switch the targets to a quality profile
+class OBJECT_OT_apply_subdivision_profile(TargetBatchOperator, bpy.types.Operator):
+    """Apply a quality profile to all target objects"""
+    bl_idname = "object.apply_subdivision_profile"
+    bl_label = "Apply Profile"
+    bl_description = "Write all settings of the profile to the subdivision modifiers of the targets"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    index: IntProperty(
+        name="Profile",
+        description="Index of the profile to apply, the active one when negative",
+        default=-1
+    )
+    
+    @classmethod
+    def poll(cls, context):
+        return context.object and len(context.object.subdivision_control.profiles) > 0
+    
+    def prepare(self, context):
+        props = context.object.subdivision_control
+        index = props.active_profile_index if self.index < 0 else self.index
+        if not 0 <= index < len(props.profiles):
+            self.report({'ERROR'}, "No such profile")
+            return None
+        profile = props.profiles[index]
+        
+        objects = self.get_targets(context)
+        if objects is None:
+            return None
+        
+        # The controller shows the levels of the profile from now on
+        settings = profile_settings(profile)
+        props.subdivision_levels = profile.levels
+        props.subdivision_render_levels = profile.render_levels
+        props.show_only_control_edges = profile.show_only_control_edges
+        props.current_profile = profile.name
+        self.profile_name = profile.name
+        self.changed = self.skipped = 0
+        
+        if props.use_lod:
+            assignments = lod_assignments(context.scene, props, objects, self.offsets)
+            if assignments is None:
+                self.report({'ERROR'}, "Screen size LOD needs a scene camera")
+                return None
+            return [(obj, dict(settings, **lod)) for obj, lod in assignments]
+        return controller_assignments(props, objects, self.offsets, settings)
+    
+    def process_items(self, assignments):
+        changed, skipped, missing = write_subsurf_settings(assignments)
+        self.changed += changed
+        self.skipped += skipped
+        self.profile.count(modified=changed, skipped=skipped + missing)
+    
+    def report_result(self, done, total):
+        if self.report_cancelled(done, total):
+            return
+        self.report({'INFO'}, f"Applied '{self.profile_name}' to {self.changed} objects ({self.skipped} already up to date)")
+
+# Operator to add a quality profile
+class OBJECT_OT_add_subdivision_profile(bpy.types.Operator):
+    """Add a quality profile from the current controller settings"""
+    bl_idname = "object.add_subdivision_profile"
+    bl_label = "Add Profile"
+    bl_description = "Add a profile with the current controller levels, or the Draft, Preview and Final defaults"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    use_defaults: BoolProperty(
+        name="Defaults",
+        description="Add the Draft, Preview and Final profiles",
+        default=False
+    )
+    
+    def execute(self, context):
+        props = context.object.subdivision_control
+        if self.use_defaults:
+            for name, settings in DEFAULT_PROFILES:
+                add_profile(props, name, settings)
+        else:
+            add_profile(props, f"Profile {len(props.profiles) + 1}")
+        props.active_profile_index = len(props.profiles) - 1
+        return {'FINISHED'}
+
+# Operator to remove the active quality profile
+class OBJECT_OT_remove_subdivision_profile(bpy.types.Operator):
+    """Remove the active quality profile"""
+    bl_idname = "object.remove_subdivision_profile"
+    bl_label = "Remove Profile"
+    bl_description = "Remove the active profile"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    @classmethod
+    def poll(cls, context):
+        return context.object and len(context.object.subdivision_control.profiles) > 0
+    
+    def execute(self, context):
+        props = context.object.subdivision_control
+        props.profiles.remove(props.active_profile_index)
+        props.active_profile_index = min(props.active_profile_index, len(props.profiles) - 1)
+        return {'FINISHED'}
+
+# Operator to add subdivision modifiers to objects without them
+class OBJECT_OT_add_subdivision_modifiers(TargetBatchOperator, bpy.types.Operator):
+    """Add subdivision modifiers to objects that don't have them"""
+    bl_idname = "object.add_subdivision_modifiers"
+    bl_label = "Add Missing Modifiers"
+    bl_description = "Add subdivision modifiers to objects that don't have them"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    def prepare(self, context):
+        self.added = self.skipped = 0
+        objects = self.get_targets(context)
+        if objects is None:
+            return None
+        
+        # New modifiers get the controller settings with the entry offsets
+        return controller_assignments(context.object.subdivision_control, objects, self.offsets)
+    
+    def process_items(self, assignments):
+        added, skipped = add_subsurf_modifiers(assignments)
+        self.added += added
+        self.skipped += skipped
+        self.profile.count(modified=added, skipped=skipped)
+    
+    def report_result(self, done, total):
+        if self.report_cancelled(done, total):
+            return
+        if self.added == 0:
+            self.report({'INFO'}, "All objects already have subdivision modifiers")
+        else:
+            self.report({'INFO'}, f"Added subdivision modifiers to {self.added} objects ({self.skipped} already had one)")
+        
+# Operator to delete subdivision modifiers
+class OBJECT_OT_delete_subdivision_modifiers(TargetBatchOperator, bpy.types.Operator):
+    """Delete subdivision modifiers from target objects"""
+    bl_idname = "object.delete_subdivision_modifiers"
+    bl_label = "Delete Subdivision Modifiers"
+    bl_description = "Remove subdivision modifiers from all objects in the specified targets"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    def prepare(self, context):
+        self.deleted = 0
+        objects = self.get_targets(context)
+        if objects is None:
+            return None
+        
+        # Cheaper to get back than replaying the undo stack on large scenes
+        with self.profile.phase("snapshot"):
+            state = capture_subsurf_state(objects, SNAPSHOT_FIELDS, with_missing=True)
+            # Nothing left to delete, keep the snapshot that can bring the last deleted ones back
+            if any(state["modifiers"]):
+                add_snapshot(context.object.subdivision_control, DELETE_SNAPSHOT_NAME, state)
+        return objects
+    
+    def process_items(self, objects):
+        deleted = remove_subsurf_modifiers(objects)
+        self.deleted += deleted
+        self.profile.count(modified=deleted)
+    
+    def report_result(self, done, total):
+        if self.report_cancelled(done, total):
+            return
+        if self.deleted == 0:
+            self.report({'INFO'}, "No subdivision modifiers found to delete")
+        else:
+            self.report({'INFO'}, f"Deleted {self.deleted} subdivision modifiers, restore them from the '{DELETE_SNAPSHOT_NAME}' snapshot")
+
+# Shared part of the shade smooth/flat operators, items are mesh datablocks
+class ShadeTargetsOperator(TargetBatchOperator):
+    smooth = True
+    
+    def prepare(self, context):
+        objects_to_process = self.get_targets(context)
+        if objects_to_process is None:
+            return None
+        
+        # Shared meshes are only shaded once
+        self.count, meshes, self.locked = collect_meshes(objects_to_process)
+        self.profile.count(deduplicated=self.count - len(meshes) - len(self.locked), locked=len(self.locked))
+        self.changed = 0
+        return meshes
+    
+    def process_items(self, meshes):
+        changed = sum(1 for mesh in meshes if set_mesh_smooth(mesh, self.smooth))
+        self.changed += changed
+        self.profile.count(modified=changed, skipped=len(meshes) - changed)
+    
+    def report_result(self, done, total):
+        if self.report_cancelled(done, total):
+            return
+        mode = "smooth" if self.smooth else "flat"
+        if self.locked:
+            self.report({'WARNING'}, f"{len(self.locked)} objects use linked meshes that can't be shaded: {describe_locked(self.locked)}")
+        self.report({'INFO'}, f"Set {self.count} objects to shade {mode} ({self.changed} meshes changed, {total - self.changed} already {mode})")
+
+# shade_smooth operators        
+class OBJECT_OT_shade_smooth_objects(ShadeTargetsOperator, bpy.types.Operator):
+    """Set shading to smooth for all target objects"""
+    bl_idname = "object.shade_smooth_objects"
+    bl_label = "Shade Smooth Objects"
+    bl_description = "Set all target objects to shade smooth"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    smooth = True
+
+# shade_flat operators  
+class OBJECT_OT_shade_flat_objects(ShadeTargetsOperator, bpy.types.Operator):
+    """Set shading to flat for all target objects"""
+    bl_idname = "object.shade_flat_objects"
+    bl_label = "Shade Flat Objects"
+    bl_description = "Set all target objects to shade flat"
     bl_options = {'REGISTER', 'UNDO'}
     
-    def execute(self, context):
-        # Create a new empty object
-        control_obj = bpy.data.objects.new("SubdController", None)
+    smooth = False
         
-        # Set the display type to PLAIN_AXES
-        control_obj.empty_display_type = 'PLAIN_AXES'
-        control_obj.empty_display_size = 1.0
+# Operator to add selected objects to target list
+class OBJECT_OT_add_targets_from_selection(bpy.types.Operator):
+    """Add selected objects and active collection to target list"""
+    bl_idname = "object.add_targets_from_selection"
+    bl_label = "Add Targets From Selection"
+    bl_description = "Add all selected objects and active collection to target list"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    def execute(self, context):
+        control_obj = context.object
+        props = control_obj.subdivision_control
         
-        # Link to scene collection
-        bpy.context.scene.collection.objects.link(control_obj)
+        # Get Selected Outliner Items, without the controller itself
+        lSelected = [item for item in get_selected_outliner_items() if item != control_obj]
+        if not lSelected:
+            self.report({'WARNING'}, "Nothing selected in the Outliner")
+            return {'CANCELLED'}
         
-        # Make the object active
-        context.view_layer.objects.active = control_obj
-        control_obj.select_set(True)
+        added = sum(1 for item in lSelected if add_target_item(props, item) is not None)
+        props.active_target_index = len(props.targets) - 1
         
-        # Set initial property values
-        control_obj.subdivision_control.subdivision_levels = 1
-        control_obj.subdivision_control.subdivision_render_levels = 2
-        control_obj.subdivision_control.subdivision_object = ''
+        self.report({'INFO'}, f"Added {added} items to targets")
+        return {'FINISHED'}
+
+# Operator to add an empty entry to the target list
+class OBJECT_OT_add_subdivision_target(bpy.types.Operator):
+    """Add an empty entry to the target list"""
+    bl_idname = "object.add_subdivision_target"
+    bl_label = "Add Target"
+    bl_description = "Add an entry to the target list"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    def execute(self, context):
+        props = context.object.subdivision_control
+        props.targets.add()
+        props.active_target_index = len(props.targets) - 1
+        return {'FINISHED'}
+
+# Operator to remove the active entry from the target list
+class OBJECT_OT_remove_subdivision_target(bpy.types.Operator):
+    """Remove the active entry from the target list"""
+    bl_idname = "object.remove_subdivision_target"
+    bl_label = "Remove Target"
+    bl_description = "Remove the active entry from the target list"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    @classmethod
+    def poll(cls, context):
+        return context.object and len(context.object.subdivision_control.targets) > 0
+    
+    def execute(self, context):
+        props = context.object.subdivision_control
+        props.targets.remove(props.active_target_index)
+        props.active_target_index = min(props.active_target_index, len(props.targets) - 1)
+        return {'FINISHED'}
+
+# Operator to move legacy comma separated targets into the target list
+class OBJECT_OT_migrate_subdivision_targets(bpy.types.Operator):
+    """Move the legacy comma separated targets into the target list"""
+    bl_idname = "object.migrate_subdivision_targets"
+    bl_label = "Migrate Targets"
+    bl_description = "Look up the legacy target names again and move the ones that exist into the target list"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    def execute(self, context):
+        props = context.object.subdivision_control
+        migrated = migrate_target_string(props)
         
-        self.report({'INFO'}, f"Created subdivision controller")
+        if props.subdivision_object:
+            self.report({'WARNING'}, f"Migrated {migrated} targets, not found: {props.subdivision_object}")
+        else:
+            self.report({'INFO'}, f"Migrated {migrated} targets")
         return {'FINISHED'}
 
-# Operator to update subdivision levels
-class OBJECT_OT_update_subdivision_levels(bpy.types.Operator):
-    """Update subdivision levels for all objects"""
-    bl_idname = "object.update_subdivision_levels"
-    bl_label = "Update Subdivision Levels"
-    bl_description = "Update subdivision levels for all objects in the specified collections or objects"
+# Operator to capture the modifier state of the targets
+class OBJECT_OT_capture_subdivision_snapshot(bpy.types.Operator):
+    """Capture the subdivision modifier state of all targets"""
+    bl_idname = "object.capture_subdivision_snapshot"
+    bl_label = "Capture Snapshot"
+    bl_description = "Store levels, display settings and modifier presence of all targets so they can be restored later"
     bl_options = {'REGISTER', 'UNDO'}
     
+    name: StringProperty(
+        name="Name",
+        description="Snapshot name, a snapshot with the same name is replaced",
+        default=""
+    )
+    
     def execute(self, context):
         control_obj = context.object
         props = control_obj.subdivision_control
-        
-        # Get the current subdivision levels
-        viewport_level = props.subdivision_levels
-        render_level = props.subdivision_render_levels
-        only_control_edges = props.show_only_control_edges
-        
-        # Get the target collection or object name
-        targets_str = props.subdivision_object
-        if not targets_str:
+        if not props.targets:
             self.report({'ERROR'}, "No target collections or objects specified")
             return {'CANCELLED'}
         
-        # Split the targets string by commas
-        target_names = [name.strip() for name in targets_str.split(',')]
+        profile = profiler.begin(self.bl_label, control_obj)
+        with profile.phase("resolve"):
+            objects, offsets = get_controller_objects(props)
+        with profile.phase("capture"):
+            state = capture_subsurf_state(objects, SNAPSHOT_FIELDS, with_missing=True)
+            item = add_snapshot(props, self.name or f"Snapshot {len(props.snapshots) + 1}", state)
+        profile.count(visited=len(objects))
+        profiler.finish(profile)
         
-        # Find objects to update based on all target names
-        objects_to_update = []
-        for target_name in target_names:
-            objects_to_update.extend(get_objects_from_target(target_name))
+        self.report({'INFO'}, f"Captured {item.object_count} objects into '{item.name}'")
+        return {'FINISHED'}
+
+# Shared lookup of the active snapshot
+class SnapshotOperator:
+    
+    @classmethod
+    def poll(cls, context):
+        if not context.object:
+            return False
+        props = context.object.subdivision_control
+        return 0 <= props.active_snapshot_index < len(props.snapshots)
+    
+    def active_snapshot(self, context):
+        props = context.object.subdivision_control
+        return props.snapshots[props.active_snapshot_index]
+
+# Operator to write the active snapshot back to the targets
+class OBJECT_OT_restore_subdivision_snapshot(SnapshotOperator, bpy.types.Operator):
+    """Restore the modifier state of the active snapshot"""
+    bl_idname = "object.restore_subdivision_snapshot"
+    bl_label = "Restore Snapshot"
+    bl_description = "Write the captured settings back, re-adding deleted modifiers and removing ones added since"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    def execute(self, context):
+        item = self.active_snapshot(context)
         
-        # Update subdivision modifiers for all found objects
-        updated_count = 0
-        for obj in objects_to_update:
-            for mod in obj.modifiers:
-                if mod.type == 'SUBSURF':
-                    mod.levels = viewport_level
-                    mod.render_levels = render_level
-                    mod.show_only_control_edges = only_control_edges
-                    updated_count += 1
-                    break
+        profile = profiler.begin(self.bl_label, context.object)
+        with profile.phase("write"):
+            changed, missing = restore_subsurf_state(load_subsurf_state(item, "state"), recreate=True)
+        profile.count(visited=item.object_count, modified=changed, skipped=item.object_count - changed)
+        profiler.finish(profile, context)
         
-        if updated_count == 0:
-            self.report({'WARNING'}, f"No objects with subdivision modifiers found in specified targets")
+        if missing:
+            self.report({'WARNING'}, f"Restored {changed} objects from '{item.name}', {missing} objects not found")
         else:
-            self.report({'INFO'}, f"Updated subdivision levels for {updated_count} objects")
-        
+            self.report({'INFO'}, f"Restored {changed} objects from '{item.name}'")
         return {'FINISHED'}
-        
-# Operator to add subdivision modifiers to objects without them
-class OBJECT_OT_add_subdivision_modifiers(bpy.types.Operator):
-    """Add subdivision modifiers to objects that don't have them"""
-    bl_idname = "object.add_subdivision_modifiers"
-    bl_label = "Add Missing Modifiers"
-    bl_description = "Add subdivision modifiers to objects that don't have them"
+
+# Operator to delete the active snapshot
+class OBJECT_OT_remove_subdivision_snapshot(SnapshotOperator, bpy.types.Operator):
+    """Delete the active snapshot"""
+    bl_idname = "object.remove_subdivision_snapshot"
+    bl_label = "Remove Snapshot"
+    bl_description = "Delete the active snapshot"
     bl_options = {'REGISTER', 'UNDO'}
     
     def execute(self, context):
-        control_obj = context.object
-        props = control_obj.subdivision_control
-        
-        # Get the target collection or object names
-        targets_str = props.subdivision_object
-        if not targets_str:
-            self.report({'ERROR'}, "No target collections or objects specified")
-            return {'CANCELLED'}
+        props = context.object.subdivision_control
+        props.snapshots.remove(props.active_snapshot_index)
+        props.active_snapshot_index = min(props.active_snapshot_index, len(props.snapshots) - 1)
+        return {'FINISHED'}
+
+# Operator to compare the active snapshot with the scene
+class OBJECT_OT_diff_subdivision_snapshot(SnapshotOperator, bpy.types.Operator):
+    """Compare the active snapshot with the current modifiers"""
+    bl_idname = "object.diff_subdivision_snapshot"
+    bl_label = "Compare Snapshot"
+    bl_description = "Count the objects whose modifier settings changed since the snapshot was taken"
+    
+    def execute(self, context):
+        item = self.active_snapshot(context)
+        diff = diff_subsurf_state(load_subsurf_state(item, "state"))
         
-        # Get the current subdivision levels
-        viewport_level = props.subdivision_levels
-        render_level = props.subdivision_render_levels
-        only_control_edges = props.show_only_control_edges
+        if diff["objects"] == 0 and diff["missing"] == 0:
+            self.report({'INFO'}, f"The scene matches '{item.name}'")
+            return {'FINISHED'}
         
-        # Split the targets string by commas
-        target_names = [name.strip() for name in targets_str.split(',')]
+        fields = ", ".join(f"{field} {count}" for field, count in diff["fields"].items() if count)
+        details = f" ({fields})" if fields else ""
+        self.report({'INFO'}, f"{diff['objects']} objects differ from '{item.name}'{details}, "
+                              f"{diff['presence']} gained or lost the modifier, {diff['missing']} not found")
+        return {'FINISHED'}
+
+# Operator to save the active snapshot to a file
+class OBJECT_OT_export_subdivision_snapshot(SnapshotOperator, bpy.types.Operator):
+    """Save the active snapshot as JSON or a binary .npz file"""
+    bl_idname = "object.export_subdivision_snapshot"
+    bl_label = "Export Snapshot"
+    bl_description = "Save the active snapshot to a .json file, or a compact binary .npz file"
+    
+    filepath: StringProperty(subtype='FILE_PATH')
+    filter_glob: StringProperty(default="*.json;*.npz", options={'HIDDEN'})
+    
+    def invoke(self, context, event):
+        self.filepath = bpy.path.clean_name(self.active_snapshot(context).name) + ".json"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+    
+    def execute(self, context):
+        item = self.active_snapshot(context)
+        path = bpy.path.abspath(self.filepath)
+        if not path.lower().endswith((".json", ".npz")):
+            path += ".json"
+        try:
+            write_state_file(path, load_subsurf_state(item, "state"))
+        except OSError as error:
+            self.report({'ERROR'}, f"Could not write the snapshot: {error}")
+            return {'CANCELLED'}
         
-        # Find objects to process based on all target names
-        objects_to_process = []
-        for target_name in target_names:
-            objects_to_process.extend(get_objects_from_target(target_name))
+        self.report({'INFO'}, f"Exported '{item.name}' to {path}")
+        return {'FINISHED'}
+
+# Operator to load a snapshot file into the controller
+class OBJECT_OT_import_subdivision_snapshot(bpy.types.Operator):
+    """Load a snapshot from a JSON or .npz file"""
+    bl_idname = "object.import_subdivision_snapshot"
+    bl_label = "Import Snapshot"
+    bl_description = "Add a snapshot saved with Export Snapshot to this controller"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    filepath: StringProperty(subtype='FILE_PATH')
+    filter_glob: StringProperty(default="*.json;*.npz", options={'HIDDEN'})
+    
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+    
+    def execute(self, context):
+        path = bpy.path.abspath(self.filepath)
+        try:
+            state = read_state_file(path)
+        except (OSError, ValueError, KeyError) as error:
+            self.report({'ERROR'}, f"Could not read the snapshot: {error}")
+            return {'CANCELLED'}
         
-        # Add subdivision modifiers to objects that don't have them
-        added_count = 0
-        for obj in objects_to_process:
-            # Check if the object already has a subdivision modifier
-            has_subd = False
-            for mod in obj.modifiers:
-                if mod.type == 'SUBSURF':
-                    has_subd = True
-                    break
-            
-            # If it doesn't have a subdivision modifier, add one
-            if not has_subd:
-                mod = obj.modifiers.new(name="Subdivision", type='SUBSURF')
-                mod.levels = viewport_level
-                mod.render_levels = render_level
-                mod.show_only_control_edges = only_control_edges
-                added_count += 1
-        
-        if added_count == 0:
-            self.report({'INFO'}, "All objects already have subdivision modifiers")
-        else:
-            self.report({'INFO'}, f"Added subdivision modifiers to {added_count} objects")
+        unknown = set(state["fields"]) - set(SNAPSHOT_FIELDS)
+        if unknown:
+            self.report({'ERROR'}, f"Unknown settings in the snapshot: {', '.join(sorted(unknown))}")
+            return {'CANCELLED'}
         
+        name = bpy.path.display_name_from_filepath(path)
+        item = add_snapshot(context.object.subdivision_control, name, state)
+        self.report({'INFO'}, f"Imported {item.object_count} objects into '{item.name}'")
         return {'FINISHED'}
+
+# Shared part of the driver binding operators, items are (object, bind, offset) tuples
+class DriverBindingOperator(TargetBatchOperator):
+    
+    def process_items(self, items):
+        modified = 0
+        for obj, bind, offset in items:
+            if bind:
+                changed = bind_subsurf_drivers(obj, self.controller, offset)
+                self.bound += changed
+            else:
+                changed = unbind_subsurf_drivers(obj, self.controller)
+                self.unbound += changed
+            modified += changed
+        self.profile.count(modified=modified, skipped=len(items) - modified)
+    
+    def report_result(self, done, total):
+        if self.report_cancelled(done, total):
+            return
+        self.report({'INFO'}, f"Bound {self.bound} objects, unbound {self.unbound} objects")
+    
+    def start(self, context):
+        self.controller = context.object
+        self.bound = self.unbound = 0
+    
+    def bind_items(self, objects):
+        offsets = self.offsets or (0,) * len(objects)
+        return [(obj, True, offset) for obj, offset in zip(objects, offsets)]
+
+# Operator to drive target modifiers from the controller
+class OBJECT_OT_bind_subdivision_drivers(DriverBindingOperator, bpy.types.Operator):
+    """Drive the subdivision modifiers of all targets from this controller"""
+    bl_idname = "object.bind_subdivision_drivers"
+    bl_label = "Bind Drivers"
+    bl_description = "Add drivers so target modifiers follow the controller levels without pressing Update"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    def prepare(self, context):
+        self.start(context)
+        objects = self.get_targets(context)
+        if objects is None:
+            return None
+        return self.bind_items(objects)
+
+# Operator to remove the controller drivers
+class OBJECT_OT_unbind_subdivision_drivers(DriverBindingOperator, bpy.types.Operator):
+    """Remove the drivers this controller added to target modifiers"""
+    bl_idname = "object.unbind_subdivision_drivers"
+    bl_label = "Unbind Drivers"
+    bl_description = "Remove the drivers that link target modifiers to this controller"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    def prepare(self, context):
+        self.start(context)
+        return [(obj, False, 0) for obj in get_driver_bound_objects(self.controller)]
+
+# Operator to bring the drivers in line with the current targets
+class OBJECT_OT_rebind_subdivision_drivers(DriverBindingOperator, bpy.types.Operator):
+    """Bind new targets and unbind objects that are no longer targeted"""
+    bl_idname = "object.rebind_subdivision_drivers"
+    bl_label = "Rebind Drivers"
+    bl_description = "Bind drivers on new targets and remove them from objects that are no longer targets"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    def prepare(self, context):
+        self.start(context)
+        objects = self.get_targets(context)
+        if objects is None:
+            return None
         
-# Operator to delete subdivision modifiers
-class OBJECT_OT_delete_subdivision_modifiers(bpy.types.Operator):
-    """Delete subdivision modifiers from target objects"""
-    bl_idname = "object.delete_subdivision_modifiers"
-    bl_label = "Delete Subdivision Modifiers"
-    bl_description = "Remove subdivision modifiers from all objects in the specified targets"
+        targeted = {obj.session_uid for obj in objects}
+        removed = [obj for obj in get_driver_bound_objects(self.controller) if obj.session_uid not in targeted]
+        return [(obj, False, 0) for obj in removed] + self.bind_items(objects)
+
+# Operator to lower levels until the targets fit a polygon or memory budget
+class OBJECT_OT_fit_subdivision_budget(bpy.types.Operator):
+    """Pick per-object levels that keep all targets under the budget"""
+    bl_idname = "object.fit_subdivision_budget"
+    bl_label = "Fit to Budget"
+    bl_description = "Lower subdivision levels, heaviest objects first, until the estimated total fits the budget"
     bl_options = {'REGISTER', 'UNDO'}
     
     def execute(self, context):
         control_obj = context.object
         props = control_obj.subdivision_control
         
-        # Get the target collection or object names
-        targets_str = props.subdivision_object
-        if not targets_str:
+        if not props.targets:
             self.report({'ERROR'}, "No target collections or objects specified")
             return {'CANCELLED'}
         
-        # Split the targets string by commas
-        target_names = [name.strip() for name in targets_str.split(',')]
+        profile = profiler.begin(self.bl_label, control_obj)
+        with profile.phase("resolve"):
+            objects, offsets, counts = target_statistics.base_counts(props)
+        if not objects:
+            self.report({'WARNING'}, "No mesh objects found in specified targets")
+            return {'CANCELLED'}
         
-        # Find objects to process based on all target names
-        objects_to_process = []
-        for target_name in target_names:
-            objects_to_process.extend(get_objects_from_target(target_name))
+        # Only objects with a subdivision modifier can be lowered
+        fit_render = props.budget_levels == 'RENDER'
+        controller_level = props.subdivision_render_levels if fit_render else props.subdivision_levels
+        max_levels = controller_levels(controller_level, counts, offsets)
         
-        # Delete subdivision modifiers from objects
-        deleted_count = 0
-        for obj in objects_to_process:
-            # Find and remove any subdivision modifiers
-            for mod in obj.modifiers:
-                if mod.type == 'SUBSURF':
-                    obj.modifiers.remove(mod)
-                    deleted_count += 1
+        use_memory = props.budget_type == 'MEMORY'
+        budget = props.budget_memory * 1024 ** 3 if use_memory else props.budget_faces
+        with profile.phase("solve"):
+            levels = fit_levels_to_budget(counts, max_levels, budget, use_memory)
         
-        if deleted_count == 0:
-            self.report({'INFO'}, "No subdivision modifiers found to delete")
+        # Viewport never goes above render when fitting render levels
+        if fit_render:
+            viewport_levels = np.minimum(levels, controller_levels(props.subdivision_levels, counts, offsets))
+            assignments = [
+                (obj, {"render_levels": level, "levels": viewport})
+                for obj, level, viewport in zip(objects, levels.tolist(), viewport_levels.tolist())
+            ]
         else:
-            self.report({'INFO'}, f"Deleted {deleted_count} subdivision modifiers")
+            assignments = [(obj, {"levels": level}) for obj, level in zip(objects, levels.tolist())]
+        assignments = cap_dense_assignments(props, assignments)
+        with profile.phase("write"):
+            changed, skipped, missing = write_subsurf_settings(assignments)
+        profile.count(visited=len(objects), modified=changed, skipped=skipped + missing)
+        profiler.finish(profile, context)
         
+        lowered = int((levels < max_levels).sum())
+        vertices, faces, memory = estimate_subdivided_counts(counts, levels)
+        self.report({'INFO'}, f"Lowered {lowered} objects, {changed} changed: "
+                              f"{format_count(faces.sum())} faces, {format_memory(memory.sum())}")
         return {'FINISHED'}
 
-# shade_smooth operators        
-class OBJECT_OT_shade_smooth_objects(bpy.types.Operator):
-    """Set shading to smooth for all target objects"""
-    bl_idname = "object.shade_smooth_objects"
-    bl_label = "Shade Smooth Objects"
-    bl_description = "Set all target objects to shade smooth"
-    bl_options = {'REGISTER', 'UNDO'}
+# The cache directory of a controller, None when a relative path can't be resolved
+def mesh_cache_directory(props):
+    if props.mesh_cache_dir.startswith("//") and not bpy.data.filepath:
+        return None
+    return bpy.path.abspath(props.mesh_cache_dir)
+
+# Operator to write the render level result of the targets to the mesh cache
+class OBJECT_OT_export_subdivision_cache(bpy.types.Operator):
+    """Write the evaluated render meshes of the targets to the cache directory"""
+    bl_idname = "object.export_subdivision_cache"
+    bl_label = "Export Mesh Cache"
+    bl_description = "Evaluate the targets at their render level and save the meshes as .npy files, unchanged entries are kept"
     
     def execute(self, context):
         control_obj = context.object
         props = control_obj.subdivision_control
-        
-        # Get the target objects
-        targets_str = props.subdivision_object
-        if not targets_str:
+        if not props.targets:
             self.report({'ERROR'}, "No target collections or objects specified")
             return {'CANCELLED'}
+        directory = mesh_cache_directory(props)
+        if directory is None:
+            self.report({'ERROR'}, "Save the file first or use an absolute cache directory")
+            return {'CANCELLED'}
+        
+        profile = profiler.begin(self.bl_label, control_obj)
+        with profile.phase("resolve"):
+            objects, offsets = get_controller_objects(props)
         
-        # Split the targets string by commas
-        target_names = [name.strip() for name in targets_str.split(',')]
+        # Evaluate with the levels a render would use
+        override = None
+        if props.use_render_override:
+            override = capture_subsurf_state(objects, RENDER_STATE_FIELDS)
+            write_subsurf_settings(controller_assignments(props, objects, offsets, render_override_settings(props)))
+        try:
+            cacheable = [obj for obj in objects if is_cacheable(obj)]
+            with profile.phase("hash"):
+                keys = mesh_cache_keys(cacheable)
+            try:
+                os.makedirs(directory, exist_ok=True)
+                manifest = read_mesh_cache_manifest(directory)
+            except (OSError, ValueError) as error:
+                self.report({'ERROR'}, f"Could not read the mesh cache: {error}")
+                return {'CANCELLED'}
+            
+            # One object per key is evaluated, shared meshes with the same stack are stored once
+            pending = {}
+            for obj, key in keys:
+                if not mesh_cache_valid(directory, manifest, key):
+                    pending.setdefault(key, obj)
+            written = self.write_pending(context, directory, manifest, pending, profile)
+        finally:
+            if override is not None:
+                restore_subsurf_state(override)
+        if written is None:
+            return {'CANCELLED'}
         
-        # Find objects to process
-        objects_to_process = []
-        for target_name in target_names:
-            objects_to_process.extend(get_objects_from_target(target_name))
+        # Point the objects at their new keys and drop entries nothing uses any more
+        for obj, key in keys:
+            if key in manifest["meshes"]:
+                manifest["objects"][obj.name] = key
+        used = set(manifest["objects"].values())
+        removed = 0
+        for key in [key for key in manifest["meshes"] if key not in used]:
+            remove_mesh_cache(directory, key, manifest["meshes"].pop(key))
+            removed += 1
+        write_mesh_cache_manifest(directory, manifest)
         
-        # Set shade smooth for all objects
-        count = 0
-        for obj in objects_to_process:
-            if obj.type == 'MESH':
-                for polygon in obj.data.polygons:
-                    polygon.use_smooth = True
-                count += 1
+        profile.count(visited=len(objects), modified=written, skipped=len(objects) - len(cacheable))
+        profiler.finish(profile)
+        mesh_cache_status[control_obj.session_uid] = check_mesh_cache(objects, directory)
         
-        self.report({'INFO'}, f"Set {count} objects to shade smooth")
+        reused = len({key for obj, key in keys}) - len(pending)
+        self.report({'INFO'}, f"Wrote {written} meshes for {len(keys)} objects, {reused} unchanged, "
+                              f"{len(objects) - len(cacheable)} can't be cached, {removed} stale removed")
         return {'FINISHED'}
+    
+    def write_pending(self, context, directory, manifest, pending, profile):
+        """Evaluate and write the pending keys, returns the number written or None on errors"""
+        if not pending:
+            return 0
+        
+        # The viewport evaluation stands in for the render one
+        saved = []
+        for obj in pending.values():
+            for mod in obj.modifiers:
+                saved.append((mod, mod.show_viewport, mod.levels if mod.type == 'SUBSURF' else None))
+                mod.show_viewport = mod.show_render
+                if mod.type == 'SUBSURF':
+                    mod.levels = mod.render_levels
+        written = 0
+        try:
+            with profile.phase("evaluate"):
+                depsgraph = context.evaluated_depsgraph_get()
+            for key, obj in pending.items():
+                if not obj.evaluated_get(depsgraph).is_evaluated:
+                    # Not part of the view layer, there is nothing to evaluate
+                    continue
+                with profile.phase("evaluate"):
+                    arrays, info = evaluated_mesh_arrays(obj, depsgraph)
+                with profile.phase("write"):
+                    manifest["meshes"][key] = write_mesh_cache(directory, key, arrays, info)
+                written += 1
+        except OSError as error:
+            self.report({'ERROR'}, f"Could not write the mesh cache: {error}")
+            return None
+        finally:
+            for mod, show_viewport, levels in saved:
+                mod.show_viewport = show_viewport
+                if levels is not None:
+                    mod.levels = levels
+        return written
 
-# shade_flat operators  
-class OBJECT_OT_shade_flat_objects(bpy.types.Operator):
-    """Set shading to flat for all target objects"""
-    bl_idname = "object.shade_flat_objects"
-    bl_label = "Shade Flat Objects"
-    bl_description = "Set all target objects to shade flat"
-    bl_options = {'REGISTER', 'UNDO'}
+# Operator to compare the targets against the mesh cache
+class OBJECT_OT_check_subdivision_cache(bpy.types.Operator):
+    """Reload the cache manifest and find targets whose entry is stale"""
+    bl_idname = "object.check_subdivision_cache"
+    bl_label = "Check Mesh Cache"
+    bl_description = "Compare the cache keys of the targets with the exported ones"
     
     def execute(self, context):
         control_obj = context.object
         props = control_obj.subdivision_control
+        directory = mesh_cache_directory(props)
+        if directory is None:
+            self.report({'ERROR'}, "Save the file first or use an absolute cache directory")
+            return {'CANCELLED'}
         
-        # Get the target objects
-        targets_str = props.subdivision_object
-        if not targets_str:
-            self.report({'ERROR'}, "No target collections or objects specified")
+        profile = profiler.begin(self.bl_label, control_obj)
+        with profile.phase("resolve"):
+            objects, offsets = get_controller_objects(props)
+        try:
+            with profile.phase("hash"):
+                status = check_mesh_cache(objects, directory)
+        except (OSError, ValueError) as error:
+            self.report({'ERROR'}, f"Could not read the mesh cache: {error}")
             return {'CANCELLED'}
+        profile.count(visited=len(objects))
+        profiler.finish(profile)
+        mesh_cache_status[control_obj.session_uid] = status
         
-        # Split the targets string by commas
-        target_names = [name.strip() for name in targets_str.split(',')]
+        current, stale, missing, uncacheable = status
+        self.report({'WARNING'} if stale or missing else {'INFO'},
+                    f"Mesh cache: {current} current, {stale} stale, {missing} missing, {uncacheable} can't be cached")
+        return {'FINISHED'}
+
+# Operator to look for modifier stack cost problems
+class OBJECT_OT_analyze_subdivision_stacks(bpy.types.Operator):
+    """Find modifier stacks of the targets that waste evaluation time"""
+    bl_idname = "object.analyze_subdivision_stacks"
+    bl_label = "Analyze Stacks"
+    bl_description = "Find subdivision before expensive modifiers, several subdivision modifiers and subdivided dense meshes"
+    
+    def execute(self, context):
+        control_obj = context.object
+        props = control_obj.subdivision_control
+        if not props.targets:
+            self.report({'ERROR'}, "No target collections or objects specified")
+            return {'CANCELLED'}
         
-        # Find objects to process
-        objects_to_process = []
-        for target_name in target_names:
-            objects_to_process.extend(get_objects_from_target(target_name))
+        dense_faces = dense_face_limit()
         
-        # Set shade flat for all objects
-        count = 0
-        for obj in objects_to_process:
-            if obj.type == 'MESH':
-                for polygon in obj.data.polygons:
-                    polygon.use_smooth = False
-                count += 1
+        profile = profiler.begin(self.bl_label, control_obj)
+        with profile.phase("resolve"):
+            objects, offsets = get_controller_objects(props)
+        with profile.phase("analyze"):
+            findings = analyze_modifier_stacks(objects, dense_faces)
+        profile.count(visited=len(objects))
+        profiler.finish(profile)
+        stack_analysis[control_obj.session_uid] = findings
         
-        self.report({'INFO'}, f"Set {count} objects to shade flat")
+        if not findings:
+            self.report({'INFO'}, f"No stack problems found in {len(objects)} objects")
+        else:
+            kinds = ", ".join(f"{kind.lower()} {sum(1 for finding in findings if finding[1] == kind)}" for kind in STACK_FIX_ORDER)
+            self.report({'WARNING'}, f"Found {len(findings)} stack problems ({kinds}), worst {findings[0][2]:.1f}x")
         return {'FINISHED'}
-        
-# Operator to add selected objects to target list
-class OBJECT_OT_add_targets_from_selection(bpy.types.Operator):
-    """Add selected objects and active collection to target list"""
-    bl_idname = "object.add_targets_from_selection"
-    bl_label = "Add Targets From Selection"
-    bl_description = "Add all selected objects and active collection to target list"
+
+# Operator to fix the problems of the last analysis
+class OBJECT_OT_fix_subdivision_stacks(TargetBatchOperator, bpy.types.Operator):
+    """Reorder or simplify the flagged modifier stacks"""
+    bl_idname = "object.fix_subdivision_stacks"
+    bl_label = "Fix Stacks"
+    bl_description = "Apply the fix for the chosen kind of stack problem to every flagged target"
     bl_options = {'REGISTER', 'UNDO'}
     
-    def execute(self, context):
-        control_obj = context.object
-        props = control_obj.subdivision_control
+    kind: EnumProperty(
+        name="Problem",
+        items=(
+            ('ALL', "All", "Fix every flagged problem"),
+            ('ORDER', "Order", "Move subdivision below the expensive modifiers, this can change the result"),
+            ('MULTIPLE', "Multiple", "Keep the first subdivision modifier and remove the others"),
+            ('DENSE', "Dense", "Keep the viewport level of dense meshes at 0 from now on"),
+        ),
+        default='ALL'
+    )
+    
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and bool(stack_analysis.get(context.object.session_uid))
+    
+    def prepare(self, context):
+        self.controller_uid = context.object.session_uid
+        findings = stack_analysis.get(self.controller_uid, [])
+        self.fixed = 0
+        
+        # Dense meshes are capped through the controller, so later updates keep them at 0
+        if self.kind in {'ALL', 'DENSE'} and any(finding[1] == 'DENSE' for finding in findings):
+            context.object.subdivision_control.cap_dense_meshes = True
         
-        # Get Selected Outliner Items
-        lSelected = get_selected_outliner_items()
-        lSelected.pop() # Remove Last Item
+        # Remove extra subdivisions before moving, so only one has to move
+        items = []
+        for kind in STACK_FIX_ORDER:
+            if self.kind in {'ALL', kind}:
+                items.extend((obj, kind) for obj, finding_kind, multiplier, detail in findings if finding_kind == kind)
+        return items
+    
+    def process_items(self, items):
+        fixed = 0
+        for obj, kind in items:
+            try:
+                fixed += bool(STACK_FIXES[kind](obj))
+            except ReferenceError:
+                continue
+        self.fixed += fixed
+        self.profile.count(modified=fixed, skipped=len(items) - fixed)
+    
+    def report_result(self, done, total):
+        # The analysis no longer matches the stacks
+        stack_analysis.pop(self.controller_uid, None)
+        if self.report_cancelled(done, total):
+            return
+        self.report({'INFO'}, f"Fixed {self.fixed} of {total} stack problems, analyze again to check")
+
+# Operator to rebuild the cached targets and statistics
+class OBJECT_OT_refresh_subdivision_stats(bpy.types.Operator):
+    """Rebuild cached targets and statistics"""
+    bl_idname = "object.refresh_subdivision_stats"
+    bl_label = "Refresh Statistics"
+    bl_description = "Rebuild the cached targets and statistics, use this if the counts look out of date"
+    
+    def execute(self, context):
+        target_index.clear()
+        target_statistics.clear()
+        controller_registry.clear()
+        name_index.clear()
         
-        # Join back with commas
-        props.subdivision_object = convert_listtostring(lSelected)
+        # Redraw the properties editor so the new counts show up
+        if context.screen is not None:
+            for area in context.screen.areas:
+                if area.type == 'PROPERTIES':
+                    area.tag_redraw()
         
-        self.report({'INFO'}, f"Added {len(lSelected)} items to targets")
+        self.report({'INFO'}, "Refreshed target statistics")
         return {'FINISHED'}
 
+# List of a controller's targets
+class OBJECT_UL_subdivision_targets(bpy.types.UIList):
+    """Draws one target entry per row"""
+    
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        row.prop(item, "mode", text="", icon_only=True, emboss=False)
+        row.prop(item, "target_type", text="", icon_only=True)
+        if item.target_type == 'PATTERN':
+            row.prop(item, "pattern", text="")
+            row.prop(item, "pattern_syntax", text="")
+        elif item.target_type == 'RULE':
+            row.prop(item, "rule_type", text="")
+            if item.rule_type == 'FACES':
+                row.prop(item, "rule_faces", text="")
+            elif item.rule_type == 'MATERIAL':
+                row.prop(item, "rule_material", text="")
+            else:
+                row.prop(item, "rule_property", text="")
+                row.prop(item, "rule_value", text="")
+        else:
+            row.prop(item, "collection" if item.target_type == 'COLLECTION' else "object", text="")
+        sub = row.row(align=True)
+        sub.active = item.mode == 'INCLUDE'
+        sub.prop(item, "level_offset", text="")
+
+# List of a controller's quality profiles with a button to apply each
+class OBJECT_UL_subdivision_profiles(bpy.types.UIList):
+    """Draws one profile per row"""
+    
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        current = item.name == data.current_profile
+        row.prop(item, "name", text="", emboss=False, icon='CHECKMARK' if current else 'PRESET')
+        row.label(text=f"{item.levels} / {item.render_levels}")
+        row.operator("object.apply_subdivision_profile", text="", icon='PLAY').index = index
+
+# List of a controller's snapshots
+class OBJECT_UL_subdivision_snapshots(bpy.types.UIList):
+    """Draws one snapshot per row"""
+    
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row()
+        row.prop(item, "name", text="", emboss=False, icon='FILE_CACHE')
+        row.label(text=f"{item.object_count} objects, {item.created}")
+
 # Panel for subdivision controller properties
 class OBJECT_PT_subdivision_control(bpy.types.Panel):
     """Panel for controlling subdivision levels"""
@@ -432,24 +4336,26 @@ class OBJECT_PT_subdivision_control(bpy.types.Panel):
         box = layout.box()
         box.label(text="Subdivision Levels:")
         
-        # Simple row with manual scaling
-        split = box.split(factor=0.10, align=True)
-        split.label(text="Targets:")
-
-        row = split.row(align=True)
-        row.prop(props, "subdivision_object", text="")
-
-        # Add spacing before button (optional)
-        row.separator()
-
-        # Create a sub-row to stretch the button a bit
-        btn_row = row.row(align=True)
-        btn_row.scale_x = 1.5
-        btn_row.operator("object.add_targets_from_selection", text="", icon='EYEDROPPER')
+        # Target list with its buttons on the side
+        box.label(text="Targets:")
+        row = box.row()
+        row.template_list("OBJECT_UL_subdivision_targets", "", props, "targets", props, "active_target_index", rows=3)
+        col = row.column(align=True)
+        col.operator("object.add_subdivision_target", text="", icon='ADD')
+        col.operator("object.remove_subdivision_target", text="", icon='REMOVE')
+        col.separator()
+        col.operator("object.add_targets_from_selection", text="", icon='EYEDROPPER')
+        
+        # Names from old files that couldn't be found
+        if props.subdivision_object:
+            row = box.row()
+            row.label(text=f"Not found: {props.subdivision_object}", icon='ERROR')
+            row.operator("object.migrate_subdivision_targets", text="", icon='FILE_REFRESH')
         
         row = box.row()
         row.prop(props, "subdivision_levels")
         row.prop(props, "subdivision_render_levels")
+        box.prop(props, "priority")
         
         # Add checkbox for show_only_control_edges
         row = box.row()
@@ -463,6 +4369,108 @@ class OBJECT_PT_subdivision_control(bpy.types.Panel):
         # Add update button
         op_row = box.row()
         op_row.operator("object.update_subdivision_levels", text="Update All Objects", icon='IMPORT')
+        op_row.prop(props, "live_link", toggle=True, icon='LINKED')
+        box.operator("object.update_all_subdivision_controllers", icon='WORLD')
+        
+        # Driver binding
+        row = box.row(align=True)
+        row.label(text="Drivers:")
+        row.operator("object.bind_subdivision_drivers", text="Bind", icon='DRIVER')
+        row.operator("object.rebind_subdivision_drivers", text="Rebind", icon='FILE_REFRESH')
+        row.operator("object.unbind_subdivision_drivers", text="Unbind", icon='UNLINKED')
+        
+        # Quality profiles
+        profile_box = layout.box()
+        profile_box.label(text="Quality Profiles:")
+        row = profile_box.row()
+        row.template_list("OBJECT_UL_subdivision_profiles", "", props, "profiles", props, "active_profile_index", rows=3)
+        col = row.column(align=True)
+        col.operator("object.add_subdivision_profile", text="", icon='ADD').use_defaults = False
+        col.operator("object.remove_subdivision_profile", text="", icon='REMOVE')
+        if not props.profiles:
+            profile_box.operator("object.add_subdivision_profile", text="Add Draft, Preview and Final", icon='PRESET_NEW').use_defaults = True
+        elif 0 <= props.active_profile_index < len(props.profiles):
+            profile = props.profiles[props.active_profile_index]
+            col = profile_box.column(align=True)
+            row = col.row(align=True)
+            row.prop(profile, "levels")
+            row.prop(profile, "render_levels")
+            col.prop(profile, "quality")
+            col.prop(profile, "uv_smooth")
+            col.prop(profile, "boundary_smooth")
+            row = col.row(align=True)
+            row.prop(profile, "use_limit_surface")
+            row.prop(profile, "use_creases")
+            col.prop(profile, "show_only_control_edges")
+        
+        # Screen size LOD settings
+        lod_box = layout.box()
+        lod_box.prop(props, "use_lod")
+        if props.use_lod:
+            row = lod_box.row(align=True)
+            row.prop(props, "lod_min_level")
+            row.prop(props, "lod_max_level")
+            row = lod_box.row(align=True)
+            row.prop(props, "lod_min_pixels")
+            row.prop(props, "lod_max_pixels")
+            lod_box.prop(props, "lod_per_frame")
+        
+        # Render override settings
+        render_box = layout.box()
+        row = render_box.row()
+        row.prop(props, "use_render_override")
+        sub = row.row()
+        sub.active = props.use_render_override
+        sub.prop(props, "render_override_levels")
+        if RENDER_STATE_KEY in context.scene:
+            render_box.label(text="Render override is applied, settings are restored after the render", icon='RENDER_STILL')
+        
+        # Evaluated mesh cache
+        cache_box = layout.box()
+        cache_box.prop(props, "use_mesh_cache")
+        cache_box.prop(props, "mesh_cache_dir")
+        row = cache_box.row(align=True)
+        row.operator("object.export_subdivision_cache", icon='EXPORT')
+        row.operator("object.check_subdivision_cache", icon='FILE_REFRESH')
+        status = mesh_cache_status.get(obj.session_uid)
+        if status is not None:
+            current, stale, missing, uncacheable = status
+            cache_box.label(text=f"{current} current, {stale} stale, {missing} missing, {uncacheable} can't be cached",
+                            icon='ERROR' if stale or missing else 'CHECKMARK')
+        if MESH_CACHE_STATE_KEY in context.scene:
+            cache_box.label(text="Cached meshes are swapped in, the originals return after the render", icon='RENDER_STILL')
+        
+        # Viewport culling settings
+        culling_box = layout.box()
+        row = culling_box.row()
+        row.prop(props, "use_culling")
+        culled = view_culler.culled_count(obj.session_uid)
+        if culled is not None:
+            row.label(text=f"{culled[0]} of {culled[1]} culled")
+        if props.use_culling:
+            row = culling_box.row(align=True)
+            row.prop(props, "culling_source", text="")
+            row.prop(props, "culling_action", text="")
+            row = culling_box.row(align=True)
+            row.prop(props, "culling_margin")
+            row.prop(props, "culling_hidden")
+            culling_box.prop(props, "culling_occluders")
+        
+        # Predicted evaluated size and budget
+        if props.targets:
+            budget_box = layout.box()
+            budget_box.label(text="Polygon Budget:")
+            objects, offsets, counts = target_statistics.base_counts(props)
+            for label, level in (("Viewport", props.subdivision_levels), ("Render", props.subdivision_render_levels)):
+                vertices, faces, memory = estimate_subdivided_counts(counts, controller_levels(level, counts, offsets))
+                budget_box.label(text=f"{label}: {format_count(faces.sum())} faces, "
+                                      f"{format_count(vertices.sum())} verts, {format_memory(memory.sum())}")
+            row = budget_box.row(align=True)
+            row.prop(props, "budget_type", text="")
+            row.prop(props, "budget_memory" if props.budget_type == 'MEMORY' else "budget_faces", text="")
+            row = budget_box.row(align=True)
+            row.prop(props, "budget_levels", expand=True)
+            row.operator("object.fit_subdivision_budget", icon='MOD_DECIM')
         
         # Add shade smooth/flat buttons
         smooth_box = layout.box()
@@ -471,53 +4479,261 @@ class OBJECT_PT_subdivision_control(bpy.types.Panel):
         row.operator("object.shade_smooth_objects", text="Shade Smooth", icon='SMOOTHCURVE')
         row.operator("object.shade_flat_objects", text="Shade Flat", icon='SHARPCURVE')
         
+        # Modifier stack cost problems
+        header, body = layout.panel("subd_controller_stack_analysis", default_closed=True)
+        header.label(text="Stack Analysis")
+        if body is not None:
+            findings = stack_analysis.get(obj.session_uid)
+            body.operator("object.analyze_subdivision_stacks", icon='VIEWZOOM')
+            body.prop(props, "cap_dense_meshes")
+            if findings is not None and not findings:
+                body.label(text="No problems found", icon='CHECKMARK')
+            elif findings:
+                labels = {'ORDER': "Before expensive modifiers", 'MULTIPLE': "Several subdivisions", 'DENSE': "Dense meshes"}
+                for kind in STACK_FIX_ORDER:
+                    kind_findings = [finding for finding in findings if finding[1] == kind]
+                    if not kind_findings:
+                        continue
+                    row = body.row()
+                    row.label(text=f"{labels[kind]}: {len(kind_findings)}, up to {kind_findings[0][2]:.1f}x", icon='ERROR')
+                    row.operator("object.fix_subdivision_stacks", text="Fix").kind = kind
+                col = body.column(align=True)
+                for finding_obj, kind, multiplier, detail in findings[:5]:
+                    try:
+                        col.label(text=f"'{finding_obj.name}': {detail} ({multiplier:.1f}x)")
+                    except ReferenceError:
+                        continue
+                body.operator("object.fix_subdivision_stacks", text="Fix All").kind = 'ALL'
+        
+        # Captured modifier states
+        header, body = layout.panel("subd_controller_snapshots", default_closed=True)
+        header.label(text=f"Snapshots ({len(props.snapshots)})")
+        if body is not None:
+            row = body.row()
+            row.template_list("OBJECT_UL_subdivision_snapshots", "", props, "snapshots", props, "active_snapshot_index", rows=3)
+            col = row.column(align=True)
+            col.operator("object.capture_subdivision_snapshot", text="", icon='ADD')
+            col.operator("object.remove_subdivision_snapshot", text="", icon='REMOVE')
+            col.separator()
+            col.operator("object.import_subdivision_snapshot", text="", icon='IMPORT')
+            col.operator("object.export_subdivision_snapshot", text="", icon='EXPORT')
+            row = body.row(align=True)
+            row.operator("object.restore_subdivision_snapshot", icon='LOOP_BACK')
+            row.operator("object.diff_subdivision_snapshot", icon='ZOOM_ALL')
+        
         # Show statistics for all targets
-        targets_str = props.subdivision_object
-        if targets_str:
-            target_names = [name.strip() for name in targets_str.split(',')]
-            
+        if props.targets:
             # Create a box for the statistics
             stats_box = layout.box()
-            stats_box.label(text="Target Statistics:")
+            row = stats_box.row()
+            row.label(text="Target Statistics:")
+            row.operator("object.refresh_subdivision_stats", text="", icon='FILE_REFRESH', emboss=False)
             
             total_mesh_count = 0
             total_subd_count = 0
+            shadowed = controller_registry.get(context.scene).get_shadowed(obj.session_uid)
             
-            for target_name in target_names:
-                if target_name in bpy.data.collections:
-                    mesh_count, subd_count = count_collection_objects(bpy.data.collections[target_name])
-                    stats_box.label(text=f"'{target_name}': {mesh_count} mesh, {subd_count} subdivision", icon='GROUP')
-                    total_mesh_count += mesh_count
-                    total_subd_count += subd_count
-                    
-                elif target_name in bpy.data.objects:
-                    obj = bpy.data.objects[target_name]
-                    if obj.type == 'MESH':
-                        has_subd = any(mod.type == 'SUBSURF' for mod in obj.modifiers)
-                        stats_box.label(text=f"'{obj.name}': {'has' if has_subd else 'no'} subdivision", icon='OBJECT_DATA')
-                        total_mesh_count += 1
-                        if has_subd:
-                            total_subd_count += 1
-                            
-                    # Count children if it has any
-                    child_mesh_count = 0
-                    child_subd_count = 0
-                    for child in obj.children_recursive:
-                        if child.type == 'MESH':
-                            child_mesh_count += 1
-                            if any(mod.type == 'SUBSURF' for mod in child.modifiers):
-                                child_subd_count += 1
+            for index, item in enumerate(props.targets):
+                # Counts are precomputed, nothing is scanned here
+                stats = target_statistics.get_item(item)
+                if stats is None:
+                    if item.target_type == 'PATTERN' and item.pattern:
+                        stats_box.label(text=f"'{item.pattern}': invalid pattern", icon='ERROR')
+                    else:
+                        stats_box.label(text="Empty target entry", icon='ERROR')
+                    continue
+                
+                mesh_count, subd_count, root_has_subd = stats
+                target = item.target
+                if item.mode == 'EXCLUDE':
+                    stats_box.label(text=f"'{item.label}': {mesh_count} mesh excluded", icon='REMOVE')
+                    continue
+                total_mesh_count += mesh_count
+                total_subd_count += subd_count
+                
+                if target is None:
+                    stats_box.label(text=f"'{item.label}': {mesh_count} mesh, {subd_count} subdivision", icon='FILTER')
+                
+                elif isinstance(target, bpy.types.Collection):
+                    stats_box.label(text=f"'{target.name}': {mesh_count} mesh, {subd_count} subdivision", icon='GROUP')
                     
-                    if child_mesh_count > 0:
-                        stats_box.label(text=f"'{obj.name}': {child_mesh_count} mesh, {child_subd_count} subdivision", icon='OUTLINER')
-                        total_mesh_count += child_mesh_count
-                        total_subd_count += child_subd_count
                 else:
-                    stats_box.label(text=f"'{target_name}' not found", icon='ERROR')
+                    obj = target
+                    if root_has_subd is not None:
+                        stats_box.label(text=f"'{obj.name}': {'has' if root_has_subd else 'no'} subdivision", icon='OBJECT_DATA')
+                        mesh_count -= 1
+                        subd_count -= root_has_subd
+                    
+                    # Show children if it has any
+                    if mesh_count > 0:
+                        stats_box.label(text=f"'{obj.name}': {mesh_count} mesh, {subd_count} subdivision", icon='OUTLINER')
+                
+                # Objects another controller wins
+                for owner_name, count in shadowed.get(index, ()):
+                    stats_box.label(text=f"    {count} shadowed by '{owner_name}'", icon='ERROR')
             
             # Show totals
-            if len(target_names) > 1:
+            if len(props.targets) > 1:
                 stats_box.label(text=f"Total: {total_mesh_count} mesh, {total_subd_count} subdivision")
+            
+            # Shared meshes are shaded once, linked objects are left alone
+            owners, meshes = target_statistics.mesh_sharing(props)
+            if meshes < owners:
+                stats_box.label(text=f"{owners} objects share {meshes} meshes", icon='MESH_DATA')
+            locked = target_index.get_controller_locked(props)
+            if locked:
+                stats_box.label(text=f"{len(locked)} linked, can't be changed: {describe_locked(locked)}",
+                                icon='LIBRARY_DATA_DIRECT')
+        
+        # Timings of the last operations
+        header, body = layout.panel("subd_controller_performance", default_closed=True)
+        header.label(text="Performance")
+        if body is not None:
+            if not profiler.history:
+                body.label(text="No operations recorded yet")
+            for profile in profiler.history:
+                col = body.column(align=True)
+                col.label(text=f"{profile.operation}: {profile.total * 1000:.1f} ms", icon='TIME')
+                col.label(text="    " + ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in profile.phases.items()))
+                col.label(text="    " + ", ".join(f"{name} {value}" for name, value in profile.counts.items()))
+
+# Addon preferences
+class SubdivisionControllerPreferences(bpy.types.AddonPreferences):
+    bl_idname = __name__
+    
+    use_chunked_processing: BoolProperty(
+        name="Non-Blocking Processing",
+        description="Process large target sets in small chunks with a progress bar, press Esc to cancel",
+        default=True
+    )
+    chunk_time_ms: IntProperty(
+        name="Chunk Time (ms)",
+        description="How long each chunk may block the interface",
+        min=5,
+        max=1000,
+        default=50
+    )
+    profile_depsgraph: BoolProperty(
+        name="Profile Depsgraph",
+        description="Evaluate the scene right after each operation so its re-evaluation time is measured",
+        default=False
+    )
+    profile_log_path: StringProperty(
+        name="Profile Log",
+        description="Append every operation profile as a JSON line to this file, leave empty to disable",
+        subtype='FILE_PATH',
+        default=""
+    )
+    dense_mesh_faces: IntProperty(
+        name="Dense Mesh Faces",
+        description="Stack analysis flags subdivision on meshes with more base faces than this",
+        min=1,
+        default=DENSE_MESH_FACES
+    )
+    follow_geometry_instances: BoolProperty(
+        name="Follow Geometry Instances",
+        description="Include objects instanced by geometry nodes and particles in targets (evaluates the scene)",
+        default=False,
+        update=lambda self, context: subdivision_controller_reset()
+    )
+    debug_verify_index: BoolProperty(
+        name="Verify Target Index",
+        description="Check every cached target against a full rebuild (slow, for debugging)",
+        default=False
+    )
+    
+    def draw(self, context):
+        layout = self.layout
+        row = layout.row()
+        row.prop(self, "use_chunked_processing")
+        row.prop(self, "chunk_time_ms")
+        row = layout.row()
+        row.prop(self, "profile_depsgraph")
+        row.prop(self, "profile_log_path")
+        layout.prop(self, "dense_mesh_faces")
+        layout.prop(self, "follow_geometry_instances")
+        layout.prop(self, "debug_verify_index")
+
+# Keep the target index in sync with the scene
+@persistent
+def subdivision_controller_depsgraph_update(scene, depsgraph):
+    target_index.handle_depsgraph_update(depsgraph)
+    target_statistics.handle_depsgraph_update(depsgraph)
+    controller_registry.handle_depsgraph_update(depsgraph)
+    name_index.handle_depsgraph_update(depsgraph)
+    view_culler.handle_depsgraph_update(depsgraph)
+
+# Re-evaluate screen size LOD for animated cameras
+@persistent
+def subdivision_controller_frame_change(scene, depsgraph=None):
+    for controller in iter_controllers(scene):
+        props = controller.subdivision_control
+        if props.use_lod and props.lod_per_frame and props.targets:
+            # The render override owns the render levels during a render
+            if props.use_render_override and render_swap.assignments is not None:
+                continue
+            apply_lod(scene, props, *get_controller_objects(props, scene))
+
+# Push the render override before rendering
+@persistent
+def subdivision_controller_render_pre(scene, depsgraph=None):
+    render_swap.apply(scene)
+    mesh_cache_swap.apply(scene)
+
+# Restore the settings from before the render once the whole job is done,
+# render_post fires after every frame of an animation
+@persistent
+def subdivision_controller_render_restore(scene, depsgraph=None):
+    mesh_cache_swap.restore(scene)
+    render_swap.restore(scene)
+
+# Frame changes of an animation render come before that frame's render_pre.
+# Applying here too is a no-op unless something wrote other levels since the
+# last frame, and then the new frame is evaluated once with the override
+# instead of again after render_pre
+@persistent
+def subdivision_controller_render_frame(scene, depsgraph=None):
+    if bpy.app.is_job_running('RENDER'):
+        render_swap.apply(scene)
+        mesh_cache_swap.apply(scene)
+
+# A file saved while the override was applied, e.g. an autosave before a crash
+@persistent
+def subdivision_controller_render_recover(*args):
+    render_swap.assignments = None
+    mesh_cache_swap.objects = None
+    for scene in bpy.data.scenes:
+        if MESH_CACHE_STATE_KEY in scene and scene.library is None:
+            logger.info("Restoring the meshes swapped for an unfinished render in '%s'", scene.name)
+            mesh_cache_swap.restore(scene)
+        if RENDER_STATE_KEY in scene and scene.library is None:
+            logger.info("Restoring the settings from before an unfinished render in '%s'", scene.name)
+            render_swap.restore(scene)
+
+# Undo, redo and file loads invalidate every cached object reference
+@persistent
+def subdivision_controller_reset(*args):
+    target_index.clear()
+    target_statistics.clear()
+    controller_registry.clear()
+    view_culler.clear()
+    stack_analysis.clear()
+    mesh_cache_status.clear()
+    name_index.clear()
+
+# Move legacy target strings of every controller into the target lists
+@persistent
+def subdivision_controller_migrate(*args):
+    for obj in bpy.data.objects:
+        props = obj.subdivision_control
+        if props.subdivision_object and obj.library is None:
+            migrated = migrate_target_string(props)
+            logger.info("Migrated %d targets of '%s'", migrated, obj.name)
+
+# Resume viewport culling for files saved with it enabled
+@persistent
+def subdivision_controller_start_culling(*args):
+    start_view_culling()
 
 # Function to add the operator to the Object menu
 def add_subdivision_controller_menu(self, context):
@@ -525,14 +4741,43 @@ def add_subdivision_controller_menu(self, context):
 
 # Registration
 classes = (
+    SubdivisionControllerPreferences,
+    SubdivisionProfileItem,
+    SubdivisionSnapshotItem,
+    SubdivisionTargetItem,
     SubdivisionControlProperties,
     OBJECT_OT_create_subdivision_controller,
     OBJECT_OT_update_subdivision_levels,
+    OBJECT_OT_update_all_subdivision_controllers,
+    OBJECT_OT_apply_subdivision_profile,
+    OBJECT_OT_add_subdivision_profile,
+    OBJECT_OT_remove_subdivision_profile,
     OBJECT_OT_add_subdivision_modifiers,
     OBJECT_OT_delete_subdivision_modifiers,
     OBJECT_OT_add_targets_from_selection,
+    OBJECT_OT_add_subdivision_target,
+    OBJECT_OT_remove_subdivision_target,
+    OBJECT_OT_migrate_subdivision_targets,
+    OBJECT_OT_capture_subdivision_snapshot,
+    OBJECT_OT_restore_subdivision_snapshot,
+    OBJECT_OT_remove_subdivision_snapshot,
+    OBJECT_OT_diff_subdivision_snapshot,
+    OBJECT_OT_export_subdivision_snapshot,
+    OBJECT_OT_import_subdivision_snapshot,
+    OBJECT_OT_export_subdivision_cache,
+    OBJECT_OT_check_subdivision_cache,
     OBJECT_OT_shade_smooth_objects,
     OBJECT_OT_shade_flat_objects,
+    OBJECT_OT_bind_subdivision_drivers,
+    OBJECT_OT_unbind_subdivision_drivers,
+    OBJECT_OT_rebind_subdivision_drivers,
+    OBJECT_OT_fit_subdivision_budget,
+    OBJECT_OT_analyze_subdivision_stacks,
+    OBJECT_OT_fix_subdivision_stacks,
+    OBJECT_OT_refresh_subdivision_stats,
+    OBJECT_UL_subdivision_targets,
+    OBJECT_UL_subdivision_profiles,
+    OBJECT_UL_subdivision_snapshots,
     OBJECT_PT_subdivision_control,
 )
 
@@ -545,8 +4790,53 @@ def register():
     
     # Add to the Add menu instead of Object menu
     bpy.types.VIEW3D_MT_add.append(add_subdivision_controller_menu)
+    
+    # Handlers for the target index
+    bpy.app.handlers.depsgraph_update_post.append(subdivision_controller_depsgraph_update)
+    bpy.app.handlers.frame_change_post.append(subdivision_controller_frame_change)
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        handlers.append(subdivision_controller_reset)
+    
+    # Old files keep their targets in a string, move them into the target list
+    bpy.app.handlers.load_post.append(subdivision_controller_migrate)
+    bpy.app.timers.register(subdivision_controller_migrate, first_interval=0.0)
+    
+    # Render override swap, recovering files saved in the middle of a render
+    bpy.app.handlers.render_pre.append(subdivision_controller_render_pre)
+    for handlers in (bpy.app.handlers.render_cancel, bpy.app.handlers.render_complete):
+        handlers.append(subdivision_controller_render_restore)
+    bpy.app.handlers.frame_change_pre.append(subdivision_controller_render_frame)
+    bpy.app.handlers.load_post.append(subdivision_controller_render_recover)
+    
+    # Viewport culling runs from a timer while a controller uses it
+    bpy.app.handlers.load_post.append(subdivision_controller_start_culling)
+    start_view_culling()
 
 def unregister():
+    # Remove the handlers
+    bpy.app.handlers.depsgraph_update_post.remove(subdivision_controller_depsgraph_update)
+    bpy.app.handlers.frame_change_post.remove(subdivision_controller_frame_change)
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        handlers.remove(subdivision_controller_reset)
+    bpy.app.handlers.load_post.remove(subdivision_controller_migrate)
+    bpy.app.handlers.load_post.remove(subdivision_controller_start_culling)
+    bpy.app.handlers.render_pre.remove(subdivision_controller_render_pre)
+    for handlers in (bpy.app.handlers.render_cancel, bpy.app.handlers.render_complete):
+        handlers.remove(subdivision_controller_render_restore)
+    bpy.app.handlers.frame_change_pre.remove(subdivision_controller_render_frame)
+    bpy.app.handlers.load_post.remove(subdivision_controller_render_recover)
+    
+    # Give culled targets their subdivision back before the addon goes away
+    if bpy.app.timers.is_registered(update_view_culling):
+        bpy.app.timers.unregister(update_view_culling)
+    if bpy.context.scene is not None:
+        view_culler.restore_all(bpy.context.scene)
+    view_culler.clear()
+    target_index.clear()
+    target_statistics.clear()
+    controller_registry.clear()
+    name_index.clear()
+    
     # Remove from the Add menu
     bpy.types.VIEW3D_MT_add.remove(add_subdivision_controller_menu)
     
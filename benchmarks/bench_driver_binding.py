@@ -0,0 +1,72 @@
+"""Compare driver binding with the operator push path.
+
+Run in background Blender:
+
+    blender -b --factory-startup --python benchmarks/bench_driver_binding.py -- --sizes 1000 10000 50000
+
+Every size gets a fresh scene of cube meshes with a SUBSURF modifier.
+Both paths are timed from changing the controller level until the depsgraph
+has been updated, so the driver evaluation is included.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from common import build_scene, load_addon, script_args
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=3, help="level changes per path")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    return parser.parse_args(script_args())
+
+
+def time_levels(controller, repeat, push):
+    props = controller.subdivision_control
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        props.subdivision_levels = 1 + i % 2
+        if push:
+            with bpy.context.temp_override(object=controller, active_object=controller):
+                bpy.ops.object.update_subdivision_levels()
+        bpy.context.view_layer.update()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    args = parse_args()
+    addon = load_addon()
+    results = []
+    try:
+        for size in args.sizes:
+            controller = build_scene(addon, size)
+            push = time_levels(controller, args.repeat, push=True)
+            
+            with bpy.context.temp_override(object=controller, active_object=controller):
+                start = time.perf_counter()
+                bpy.ops.object.bind_subdivision_drivers()
+                bind = time.perf_counter() - start
+            bpy.context.view_layer.update()
+            driver = time_levels(controller, args.repeat, push=False)
+            
+            results.append({"objects": size, "push": push, "bind": bind, "driver": driver})
+            print(f"{size:>7} objects  push {push:8.3f}s  driver {driver:8.3f}s  (bind {bind:.3f}s)")
+    finally:
+        addon.unregister()
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+main()
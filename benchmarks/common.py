@@ -0,0 +1,113 @@
+"""Helpers shared by the benchmark scripts, which run inside background Blender."""
+
+import os
+import random
+import sys
+
+import bpy
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def script_args():
+    """Arguments after the -- separator of the Blender command line"""
+    return sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+
+def load_addon():
+    if REPO not in sys.path:
+        sys.path.insert(0, REPO)
+    import Subd_Controller_Addon as addon
+    if not hasattr(bpy.types.Object, "subdivision_control"):
+        addon.register()
+    return addon
+
+
+def clear_scene(addon):
+    # Remove the data directly, reloading the startup file would drop the addon
+    bpy.data.batch_remove([*bpy.data.objects, *bpy.data.meshes, *bpy.data.collections])
+    addon.subdivision_controller_reset()
+
+
+def build_scene(addon, count, collection_depth=1, parent_depth=1, shared_ratio=0.0,
+                subsurf_ratio=1.0, seed=0):
+    """Build a synthetic scene and return its controller.
+    
+    count meshes are spread over the leaves of a collection tree
+    collection_depth levels deep, parented in chains of parent_depth,
+    share their mesh datablock with probability shared_ratio and get a
+    SUBSURF modifier with probability subsurf_ratio.
+    """
+    clear_scene(addon)
+    rng = random.Random(seed)
+    scene = bpy.context.scene
+    
+    # Nested collections, two children per level
+    root = bpy.data.collections.new("BenchTargets")
+    scene.collection.children.link(root)
+    leaves = [root]
+    for depth in range(1, collection_depth):
+        parents, leaves = leaves, []
+        for parent in parents:
+            for i in range(2):
+                child = bpy.data.collections.new(f"{parent.name}_{i}")
+                parent.children.link(child)
+                leaves.append(child)
+    
+    shared = bpy.data.meshes.new("BenchShared")
+    shared.from_pydata(*cube_data())
+    
+    previous = None
+    for i in range(count):
+        if rng.random() < shared_ratio:
+            mesh = shared
+        else:
+            mesh = bpy.data.meshes.new(f"BenchMesh{i:06d}")
+            mesh.from_pydata(*cube_data())
+        obj = bpy.data.objects.new(f"Bench{i:06d}", mesh)
+        obj.location = (i % 100 * 3.0, i // 100 * 3.0, 0.0)
+        leaves[i % len(leaves)].objects.link(obj)
+        
+        # Parenting chains
+        if previous is not None and i % parent_depth:
+            obj.parent = previous
+        previous = obj
+        
+        if rng.random() < subsurf_ratio:
+            mod = obj.modifiers.new("Subdivision", 'SUBSURF')
+            mod.levels = 0
+            mod.render_levels = 0
+    
+    controller = bpy.data.objects.new("SubdController", None)
+    scene.collection.objects.link(controller)
+    addon.add_target_item(controller.subdivision_control, root)
+    bpy.context.view_layer.objects.active = controller
+    bpy.context.view_layer.update()
+    return controller
+
+
+def cube_data():
+    vertices = [(x, y, z) for x in (0, 1) for y in (0, 1) for z in (0, 1)]
+    faces = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+    return vertices, [], faces
+
+
+class RecordingLayout:
+    """Stand-in for UILayout so panels can be drawn without a window"""
+    
+    def __getattr__(self, name):
+        return self._call
+    
+    def _call(self, *args, **kwargs):
+        return self
+    
+    def panel(self, *args, **kwargs):
+        return self, self
+    
+    def split(self, *args, **kwargs):
+        return self
+
+
+class DrawStub:
+    def __init__(self):
+        self.layout = RecordingLayout()
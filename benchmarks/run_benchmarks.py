@@ -0,0 +1,216 @@
+"""Benchmark target resolution, every operator and the panel draw.
+
+Run in background Blender:
+
+    blender -b --factory-startup --python benchmarks/run_benchmarks.py -- \\
+        --sizes 1000 10000 100000 --output results.json
+
+Compare against an earlier run and fail on regressions:
+
+    blender -b --factory-startup --python benchmarks/run_benchmarks.py -- \\
+        --sizes 1000 10000 --output new.json --baseline results.json --threshold 1.25
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from common import DrawStub, build_scene, load_addon, script_args
+
+# Operators that need an interactive editor or a file browser
+SKIP_OPERATORS = {
+    "object.add_targets_from_selection",
+    "object.export_subdivision_snapshot",
+    "object.import_subdivision_snapshot",
+    "object.export_subdivision_cache",
+}
+
+# Operators run in this order, so each one finds something to do
+OPERATOR_ORDER = (
+    "object.refresh_subdivision_stats",
+    "object.delete_subdivision_modifiers",
+    "object.add_subdivision_modifiers",
+    "object.update_subdivision_levels",
+    "object.fit_subdivision_budget",
+    "object.shade_flat_objects",
+    "object.shade_smooth_objects",
+    "object.bind_subdivision_drivers",
+    "object.rebind_subdivision_drivers",
+    "object.unbind_subdivision_drivers",
+    "object.capture_subdivision_snapshot",
+    "object.diff_subdivision_snapshot",
+    "object.restore_subdivision_snapshot",
+    "object.remove_subdivision_snapshot",
+)
+
+# Operators that change the controllers or their target lists, each one runs
+# last on a freshly built scene so the others all measure the same target set
+FRESH_SCENE_OPERATORS = (
+    "object.add_subdivision_target",
+    "object.remove_subdivision_target",
+    "object.migrate_subdivision_targets",
+    "object.create_subdivision_controller",
+)
+
+# Timings below this are noise and never count as regressions
+MIN_REGRESSION_SECONDS = 0.001
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--collection-depth", type=int, default=4)
+    parser.add_argument("--parent-depth", type=int, default=8)
+    parser.add_argument("--shared-ratio", type=float, default=0.5, help="share of objects using one mesh")
+    parser.add_argument("--subsurf-ratio", type=float, default=0.7, help="share of objects with SUBSURF")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per read-only measurement, the fastest counts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown factor reported as a regression")
+    return parser.parse_args(script_args())
+
+
+def best_of(repeat, function, setup=None):
+    timings = []
+    for i in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def operator_names(addon):
+    """Return (operators sharing one scene, operators that each get a fresh scene)"""
+    names = [cls.bl_idname for cls in addon.classes
+             if issubclass(cls, bpy.types.Operator) and cls.bl_idname not in SKIP_OPERATORS]
+    ordered = [name for name in OPERATOR_ORDER if name in names]
+    fresh = [name for name in FRESH_SCENE_OPERATORS if name in names]
+    return ordered + sorted(set(names) - set(ordered) - set(fresh)), fresh
+
+
+def run_operator(bl_idname, controller):
+    module, name = bl_idname.split(".")
+    operator = getattr(getattr(bpy.ops, module), name)
+    with bpy.context.temp_override(object=controller, active_object=controller):
+        operator()
+
+
+def build_benchmark_scene(addon, args, size):
+    return build_scene(addon, size, args.collection_depth, args.parent_depth,
+                       args.shared_ratio, args.subsurf_ratio, args.seed)
+
+
+def time_operator(name, controller, timings, errors):
+    start = time.perf_counter()
+    try:
+        run_operator(name, controller)
+    except Exception as error:
+        errors[name] = f"{type(error).__name__}: {error}"
+        return
+    timings[name] = time.perf_counter() - start
+
+
+def benchmark_scene(addon, args, size):
+    controller = build_benchmark_scene(addon, args, size)
+    root = controller.subdivision_control.targets[0].collection
+    target_name = root.name
+    chain_root = bpy.data.objects["Bench000000"]
+    timings = {}
+    errors = {}
+    
+    def clear_caches():
+        # Everything undo and file loads drop, including the name index and the culler
+        addon.subdivision_controller_reset()
+    
+    timings["get_objects_from_target.cold"] = best_of(
+        args.repeat, lambda: addon.get_objects_from_target(target_name), clear_caches)
+    timings["get_objects_from_target.warm"] = best_of(
+        args.repeat, lambda: addon.get_objects_from_target(target_name))
+    timings["get_objects_from_target.object.cold"] = best_of(
+        args.repeat, lambda: addon.get_objects_from_target(chain_root.name), clear_caches)
+    timings["count_collection_objects"] = best_of(
+        args.repeat, lambda: addon.count_collection_objects(root))
+    
+    # Draw into a recording layout, with and without warm caches
+    panel = addon.OBJECT_PT_subdivision_control
+    def draw():
+        with bpy.context.temp_override(object=controller, active_object=controller):
+            panel.draw(DrawStub(), bpy.context)
+    timings["panel.draw.cold"] = best_of(args.repeat, draw, clear_caches)
+    timings["panel.draw.warm"] = best_of(args.repeat, draw)
+    
+    shared, fresh = operator_names(addon)
+    for name in shared:
+        time_operator(name, controller, timings, errors)
+    for name in fresh:
+        time_operator(name, build_benchmark_scene(addon, args, size), timings, errors)
+    
+    return {
+        "objects": size,
+        "collection_depth": args.collection_depth,
+        "parent_depth": args.parent_depth,
+        "shared_ratio": args.shared_ratio,
+        "subsurf_ratio": args.subsurf_ratio,
+        "timings": timings,
+        "errors": errors,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Return a list of regressions against the baseline results"""
+    previous = {scene["objects"]: scene["timings"] for scene in baseline["scenes"]}
+    regressions = []
+    for scene in results["scenes"]:
+        old_timings = previous.get(scene["objects"], {})
+        for name, seconds in scene["timings"].items():
+            old = old_timings.get(name)
+            if old is None or seconds < MIN_REGRESSION_SECONDS:
+                continue
+            if seconds > old * threshold:
+                regressions.append({"objects": scene["objects"], "name": name,
+                                    "baseline": old, "current": seconds, "factor": seconds / max(old, 1e-9)})
+    return regressions
+
+
+def main():
+    args = parse_args()
+    addon = load_addon()
+    results = {"blender": bpy.app.version_string, "addon": list(addon.bl_info["version"]), "scenes": []}
+    
+    for size in args.sizes:
+        scene = benchmark_scene(addon, args, size)
+        results["scenes"].append(scene)
+        print(f"== {size} objects")
+        for name, seconds in scene["timings"].items():
+            print(f"  {name:<45} {seconds * 1000:10.2f} ms")
+        for name, error in scene["errors"].items():
+            print(f"  {name:<45} ERROR {error}")
+    
+    failed = False
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        results["regressions"] = compare(results, baseline, args.threshold)
+        for regression in results["regressions"]:
+            print(f"REGRESSION {regression['objects']} objects {regression['name']}: "
+                  f"{regression['baseline'] * 1000:.2f} ms -> {regression['current'] * 1000:.2f} ms "
+                  f"({regression['factor']:.2f}x)")
+        failed = bool(results["regressions"])
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    
+    if failed:
+        sys.exit(1)
+
+
+main()
@@ -0,0 +1,29 @@
+"""Tests run inside Blender's Python, e.g. blender -b --python-expr "import pytest; pytest.main(['tests'])"."""
+
+import os
+import sys
+
+import pytest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="session")
+def addon():
+    bpy = pytest.importorskip("bpy")
+    if REPO not in sys.path:
+        sys.path.insert(0, REPO)
+    import Subd_Controller_Addon as addon
+    if not hasattr(bpy.types.Object, "subdivision_control"):
+        addon.register()
+    return addon
+
+
+@pytest.fixture
+def clean_scene(addon):
+    bpy = pytest.importorskip("bpy")
+    # Remove the data directly, reloading the startup file would drop the addon
+    bpy.data.batch_remove([*bpy.data.objects, *bpy.data.meshes, *bpy.data.collections])
+    addon.subdivision_controller_reset()
+    yield bpy.context.scene
+    addon.subdivision_controller_reset()
@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+
+class FakeWindowManager:
+    def __init__(self):
+        self.progress = []
+        self.removed_timers = []
+        self.progress_ended = False
+
+    def progress_update(self, value):
+        self.progress.append(value)
+
+    def event_timer_remove(self, timer):
+        self.removed_timers.append(timer)
+
+    def progress_end(self):
+        self.progress_ended = True
+
+
+class FakeWorkspace:
+    def __init__(self):
+        self.status = "unset"
+
+    def status_text_set(self, text):
+        self.status = text
+
+
+def make_operator(addon, items):
+    class Operator(addon.TargetBatchOperator):
+        bl_label = "Test Batch"
+
+        def __init__(self):
+            self.processed = []
+            self.reports = []
+            self.result = None
+
+        def process_items(self, chunk):
+            self.processed.extend(chunk)
+
+        def report_result(self, done, total):
+            self.result = (done, total)
+
+        def report(self, kind, message):
+            self.reports.append((kind, message))
+
+    operator = Operator()
+    operator.profile = addon.profiler.begin(Operator.bl_label)
+    operator._items = items
+    operator._done = 0
+    operator._chunk_time = 10.0
+    operator._timer = object()
+    return operator
+
+
+def make_context():
+    return SimpleNamespace(window_manager=FakeWindowManager(), workspace=FakeWorkspace())
+
+
+def test_timer_event_without_timer_attribute_processes_chunks(addon):
+    items = list(range(addon.CHUNK_STEP * 3))
+    operator = make_operator(addon, items)
+    context = make_context()
+    timer = operator._timer
+
+    # Real events carry no reference to their timer, only type and value
+    result = operator.modal(context, SimpleNamespace(type='TIMER', value='NOTHING'))
+
+    assert result == {'FINISHED'}
+    assert operator.processed == items
+    assert operator.result == (len(items), len(items))
+    assert context.window_manager.removed_timers == [timer]
+    assert context.window_manager.progress_ended
+    assert context.workspace.status is None
+
+
+def test_other_events_keep_running_and_escape_cancels(addon):
+    operator = make_operator(addon, list(range(addon.CHUNK_STEP * 3)))
+    operator._chunk_time = 0.0
+    context = make_context()
+
+    assert operator.modal(context, SimpleNamespace(type='MOUSEMOVE', value='NOTHING')) == {'RUNNING_MODAL'}
+    assert operator.modal(context, SimpleNamespace(type='WHEELUPMOUSE', value='PRESS')) == {'PASS_THROUGH'}
+    assert operator.processed == []
+
+    assert operator.modal(context, SimpleNamespace(type='ESC', value='PRESS')) == {'FINISHED'}
+    assert operator.result == (0, addon.CHUNK_STEP * 3)
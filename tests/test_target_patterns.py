@@ -0,0 +1,67 @@
+import pytest
+
+
+def mesh_object(bpy, name, collection):
+    obj = bpy.data.objects.new(name, bpy.data.meshes.new(name))
+    collection.objects.link(obj)
+    return obj
+
+
+def test_rename_inside_collection_scoped_pattern(addon, clean_scene):
+    bpy = pytest.importorskip("bpy")
+    props_collection = bpy.data.collections.new("Props")
+    clean_scene.collection.children.link(props_collection)
+    chair = mesh_object(bpy, "Chair1", props_collection)
+    table = mesh_object(bpy, "Table1", props_collection)
+    controller = bpy.data.objects.new("Controller", None)
+    clean_scene.collection.objects.link(controller)
+
+    item = controller.subdivision_control.targets.add()
+    item.target_type = 'PATTERN'
+    item.pattern = "Props/Chair*"
+    bpy.context.view_layer.update()
+
+    # No plain pattern or rule has built the name index before this lookup
+    assert set(addon.target_index.get_item(item)) == {chair}
+
+    table.name = "Chair2"
+    bpy.context.view_layer.update()
+    assert set(addon.target_index.get_item(item)) == {chair, table}
+
+    chair.name = "Stool1"
+    bpy.context.view_layer.update()
+    assert set(addon.target_index.get_item(item)) == {table}
+
+
+def test_collection_rename_updates_scoped_pattern(addon, clean_scene):
+    bpy = pytest.importorskip("bpy")
+    props_collection = bpy.data.collections.new("Props")
+    clean_scene.collection.children.link(props_collection)
+    chair = mesh_object(bpy, "Chair1", props_collection)
+    controller = bpy.data.objects.new("Controller", None)
+    clean_scene.collection.objects.link(controller)
+
+    item = controller.subdivision_control.targets.add()
+    item.target_type = 'PATTERN'
+    item.pattern = "Furniture/Chair*"
+    bpy.context.view_layer.update()
+    assert addon.target_index.get_item(item) == ()
+
+    props_collection.name = "Furniture"
+    bpy.context.view_layer.update()
+    assert set(addon.target_index.get_item(item)) == {chair}
+
+
+def test_regex_pattern_keeps_slashes(addon, clean_scene):
+    bpy = pytest.importorskip("bpy")
+    shelf = mesh_object(bpy, "Shelf/Top", clean_scene.collection)
+    mesh_object(bpy, "Shelf", clean_scene.collection)
+    controller = bpy.data.objects.new("Controller", None)
+    clean_scene.collection.objects.link(controller)
+
+    item = controller.subdivision_control.targets.add()
+    item.target_type = 'PATTERN'
+    item.pattern_syntax = 'REGEX'
+    item.pattern = "^Shelf/T"
+    bpy.context.view_layer.update()
+    assert set(addon.target_index.get_item(item)) == {shelf}
@@ -0,0 +1,272 @@
+"""Apply Subdivision Controller operations to many .blend files.
+
+Inside Blender, process the open file (worker mode):
+
+    blender -b shot.blend --python tools/subd_controller_batch.py -- --operations add update
+
+Outside Blender, process a directory in parallel with background workers:
+
+    python tools/subd_controller_batch.py shots/ --blender /opt/blender/blender --jobs 8 \\
+        --operations add update shade_smooth --report summary.json
+
+Without --config every SubdController empty in every scene runs the given
+operations with its own settings. A JSON config can override controller
+settings and add targets that have no controller empty:
+
+    {
+        "operations": ["add", "update"],
+        "controllers": {"SubdController": {"subdivision_render_levels": 3}},
+        "targets": [{"targets": "Props, Table001", "subdivision_levels": 0}]
+    }
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+OPERATIONS = ("add", "update", "delete", "shade_smooth", "shade_flat")
+
+# Controller settings that can be set from a config
+SETTINGS = (
+    "subdivision_levels",
+    "subdivision_render_levels",
+    "priority",
+    "show_only_control_edges",
+    "use_lod",
+    "lod_min_level",
+    "lod_max_level",
+    "lod_min_pixels",
+    "lod_max_pixels",
+)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*", help=".blend files or directories (pool mode)")
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS, help="operations to run, in order")
+    parser.add_argument("--config", help="JSON config with operations, controller overrides and extra targets")
+    parser.add_argument("--no-save", action="store_true", help="don't save the processed files")
+    parser.add_argument("--blender", default="blender", help="Blender executable for the workers")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="parallel Blender workers")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds before a worker is killed")
+    parser.add_argument("--report", help="write a JSON summary to this path")
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def load_config(args):
+    config = {}
+    if args.config:
+        with open(args.config) as f:
+            config = json.load(f)
+    if args.operations:
+        config["operations"] = args.operations
+    config.setdefault("operations", ["update"])
+    unknown = set(config["operations"]) - set(OPERATIONS)
+    if unknown:
+        raise SystemExit(f"Unknown operations: {', '.join(sorted(unknown))}")
+    return config
+
+
+# Worker mode, runs inside Blender
+
+def load_addon():
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import Subd_Controller_Addon as addon
+    if not hasattr(bpy.types.Object, "subdivision_control"):
+        addon.register()
+    
+    # The file was loaded before the addon registered, and timers never run
+    # in background mode, so legacy target strings are migrated here
+    addon.subdivision_controller_migrate()
+    return addon
+
+
+def run_operations(addon, scene, props, objects, offsets, operations):
+    """Run the operations for one set of controller settings, return the counts per operation"""
+    settings = {
+        "levels": props["subdivision_levels"],
+        "render_levels": props["subdivision_render_levels"],
+        "show_only_control_edges": props["show_only_control_edges"],
+    }
+    # Offsets and the dense mesh cap both apply, config targets without a controller get neither
+    controller_assignments = addon.controller_assignments(props["controller"], objects, offsets, settings)
+    
+    results = {"objects": len(objects)}
+    for operation in operations:
+        if operation == "add":
+            added, skipped = addon.add_subsurf_modifiers(controller_assignments)
+            results[operation] = {"added": added, "skipped": skipped}
+        elif operation == "update":
+            if props["use_lod"]:
+                assignments = addon.lod_assignments(scene, props["controller"], objects, offsets)
+                if assignments is None:
+                    results[operation] = {"error": "Screen size LOD needs a scene camera"}
+                    continue
+            else:
+                assignments = controller_assignments
+            changed, skipped, missing = addon.write_subsurf_settings(assignments)
+            results[operation] = {"changed": changed, "skipped": skipped, "missing": missing}
+        elif operation == "delete":
+            results[operation] = {"deleted": addon.remove_subsurf_modifiers(objects)}
+        else:
+            count, changed, skipped, locked = addon.shade_objects(objects, smooth=operation == "shade_smooth")
+            results[operation] = {"objects": count, "changed": changed, "skipped": skipped, "locked": len(locked)}
+            if locked:
+                results[operation]["locked_sources"] = addon.describe_locked(locked)
+    return results
+
+
+def controller_settings(controller, overrides):
+    props = controller.subdivision_control
+    for name, value in overrides.items():
+        setattr(props, name, value)
+    settings = {name: getattr(props, name) for name in SETTINGS}
+    settings["controller"] = props
+    return settings
+
+
+def process_open_file(config):
+    addon = load_addon()
+    overrides = config.get("controllers", {})
+    report = []
+    
+    for scene in bpy.data.scenes:
+        for controller in addon.iter_controllers(scene):
+            settings = controller_settings(controller, overrides.get(controller.name, {}))
+            if not settings["controller"].targets:
+                report.append({"scene": scene.name, "controller": controller.name, "skipped": "no targets"})
+                continue
+            start = time.perf_counter()
+            objects, offsets = addon.get_controller_objects(settings["controller"], scene)
+            results = run_operations(addon, scene, settings, objects, offsets, config["operations"])
+            results.update(scene=scene.name, controller=controller.name, seconds=time.perf_counter() - start)
+            report.append(results)
+    
+    # Targets from the config run with the defaults of a new controller
+    scene = bpy.context.scene
+    for entry in config.get("targets", []):
+        settings = {name: prop.default for name, prop in
+                    bpy.types.SubdivisionControlProperties.bl_rna.properties.items() if name in SETTINGS}
+        settings.update(entry)
+        if settings.get("use_lod"):
+            raise SystemExit("Screen size LOD needs a controller empty")
+        settings["controller"] = None
+        start = time.perf_counter()
+        objects = addon.get_objects_from_targets(entry["targets"])
+        results = run_operations(addon, scene, settings, objects, None, config["operations"])
+        results.update(scene=scene.name, controller=None, targets=entry["targets"],
+                       seconds=time.perf_counter() - start)
+        report.append(results)
+    return report
+
+
+def worker_main(args):
+    config = load_config(args)
+    start = time.perf_counter()
+    result = {"file": bpy.data.filepath, "ok": True}
+    try:
+        result["controllers"] = process_open_file(config)
+        if not args.no_save:
+            bpy.ops.wm.save_mainfile()
+    except Exception as error:
+        result.update(ok=False, error=f"{type(error).__name__}: {error}")
+    result["seconds"] = time.perf_counter() - start
+    
+    if args.result:
+        with open(args.result, "w") as f:
+            json.dump(result, f)
+    else:
+        print(json.dumps(result, indent=2))
+    if not result["ok"]:
+        sys.exit(1)
+
+
+# Pool mode, runs outside Blender
+
+def find_blend_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(".blend"))
+        else:
+            files.append(path)
+    return files
+
+
+def run_worker(path, worker_args, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        result_path = os.path.join(tmp, "result.json")
+        command = [args.blender, "-b", "--factory-startup", path, "--python", os.path.abspath(__file__),
+                   "--", "--result", result_path, *worker_args]
+        start = time.perf_counter()
+        try:
+            process = subprocess.run(command, capture_output=True, text=True, timeout=args.timeout)
+        except subprocess.TimeoutExpired:
+            seconds = time.perf_counter() - start
+            return {"file": path, "ok": False, "error": "timed out", "seconds": seconds, "wall_seconds": seconds}
+        seconds = time.perf_counter() - start
+        
+        if os.path.exists(result_path):
+            with open(result_path) as f:
+                result = json.load(f)
+        else:
+            result = {"ok": False, "error": f"Blender exited with {process.returncode}: {process.stderr[-2000:]}"}
+        result.update(file=path, wall_seconds=seconds)
+        return result
+
+
+def pool_main(args):
+    files = find_blend_files(args.paths)
+    if not files:
+        raise SystemExit("No .blend files found")
+    
+    # Forward everything the workers need
+    worker_args = []
+    if args.operations:
+        worker_args += ["--operations", *args.operations]
+    if args.config:
+        worker_args += ["--config", os.path.abspath(args.config)]
+    if args.no_save:
+        worker_args.append("--no-save")
+    
+    start = time.perf_counter()
+    results = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(args.jobs, 1)) as pool:
+        futures = [pool.submit(run_worker, path, worker_args, args) for path in files]
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            results.append(result)
+            status = "ok" if result["ok"] else f"FAILED ({result.get('error')})"
+            print(f"[{len(results)}/{len(files)}] {result['file']}: {result['wall_seconds']:.1f}s {status}")
+    
+    results.sort(key=lambda result: result["file"])
+    summary = {
+        "files": results,
+        "succeeded": sum(result["ok"] for result in results),
+        "failed": sum(not result["ok"] for result in results),
+        "jobs": args.jobs,
+        "seconds": time.perf_counter() - start,
+    }
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(summary, f, indent=2)
+    print(f"Processed {len(results)} files in {summary['seconds']:.1f}s, {summary['failed']} failed")
+    return 1 if summary["failed"] else 0
+
+
+if bpy is not None:
+    worker_main(parse_args(sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []))
+elif __name__ == "__main__":
+    sys.exit(pool_main(parse_args(sys.argv[1:])))